@@ -1,5 +1,98 @@
-from django.contrib import admin
-from .models import Season, Tournament, Player, TournamentField, Result, Pick, UserSeasonStats
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import JsonResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from . import admin_jobs
+from .checks import local_cache
+from .models import (
+    Season, Tournament, Player, PlayerAlias, TournamentField, Result, Pick, UserSeasonStats,
+)
+
+
+# ─────────────────────────────────────────────
+# Changelists for large tables
+# ─────────────────────────────────────────────
+
+# Below this many (estimated) rows an exact COUNT(*) is cheap enough.
+EXACT_COUNT_BELOW = 100_000
+
+
+def _estimated_rows(model, using):
+    """The planner's row estimate for model's table, or None if the backend has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the unfiltered changelist's total from the table
+    statistics instead of a COUNT(*) over millions of rows. Filtered /
+    searched lists, small tables and backends without statistics still get
+    an exact count.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if isinstance(qs, QuerySet) and not qs.query.where:
+            estimate = _estimated_rows(qs.model, qs.db)
+            if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # no second COUNT(*) of the whole table when filtering
+    list_per_page = 50
+    ordering = ("-pk",)  # newest first, straight off the primary key (no join sort)
+
+
+class SeasonTournamentFilter(admin.SimpleListFilter):
+    """
+    Tournament filter that only lists the tournaments of the season being
+    filtered on (the active season by default), not every event ever played.
+    """
+    title = "tournament"
+    parameter_name = "tournament"
+    season_parameter = "season__id__exact"
+
+    def lookups(self, request, model_admin):
+        season_id = request.GET.get(self.season_parameter)
+        tournaments = Tournament.objects.order_by("start_date")
+        if season_id and season_id.isdigit():
+            tournaments = tournaments.filter(season_id=season_id)
+        else:
+            tournaments = tournaments.filter(season__is_active=True)
+        return [(str(pk), name) for pk, name in tournaments.values_list("pk", "name")]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(tournament_id=value)
+        return queryset
+
+
+class FieldTournamentFilter(SeasonTournamentFilter):
+    season_parameter = "tournament__season__id__exact"
 
 
 @admin.register(Season)
@@ -12,45 +105,123 @@ class SeasonAdmin(admin.ModelAdmin):
 class TournamentAdmin(admin.ModelAdmin):
     list_display = ("name", "season", "start_date", "end_date", "status", "is_major", "multiplier")
     list_filter = ("season", "status", "is_major")
+    list_select_related = ("season",)
     search_fields = ("name",)
+    actions = ["refresh_results", "recompute_earnings"]
+
+    def get_urls(self):
+        return [
+            path(
+                "jobs/<str:job_id>/",
+                self.admin_site.admin_view(self.job_status),
+                name="core_tournament_job",
+            ),
+        ] + super().get_urls()
+
+    def job_status(self, request, job_id):
+        """JSON progress of a scoring job (see admin_jobs.status)."""
+        job = admin_jobs.status(job_id)
+        if job is None:
+            error = "Unknown or expired job"
+            if local_cache():
+                error += "; the cache is per-process, so jobs started on another worker aren't visible (core.E001)"
+            return JsonResponse({"error": error}, status=404)
+        return JsonResponse(job)
+
+    def _start_job(self, request, queryset, kind):
+        tournaments = list(queryset.select_related("season"))
+        skipped = [t for t in tournaments if not t.pga_tournament_id]
+        tournaments = [t for t in tournaments if t.pga_tournament_id]
+        if skipped:
+            self.message_user(
+                request,
+                f"Skipped {len(skipped)} tournament(s) without a PGA tournament id.",
+                messages.WARNING,
+            )
+        if not tournaments:
+            return
+
+        job_id = admin_jobs.start(kind, tournaments)
+        url = reverse("admin:core_tournament_job", args=[job_id])
+        self.message_user(request, format_html(
+            '{} started for {} tournament(s); <a href="{}">progress and timings</a>.',
+            admin_jobs.KINDS[kind], len(tournaments), url,
+        ))
+        if local_cache():
+            self.message_user(
+                request,
+                "The cache is per-process (core.E001): job progress is only visible "
+                "from the worker that started it.",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Refresh results from ESPN and resync earnings")
+    def refresh_results(self, request, queryset):
+        self._start_job(request, queryset, "refresh")
+
+    @admin.action(description="Recompute earnings only")
+    def recompute_earnings(self, request, queryset):
+        self._start_job(request, queryset, "recompute")
+
+
+class PlayerAliasInline(admin.TabularInline):
+    model = PlayerAlias
+    extra = 1
+    fields = ("name", "normalized_name")
+    readonly_fields = ("normalized_name",)
 
 
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
     list_display = ("full_name", "country", "active")
     list_filter = ("active", "country")
-    search_fields = ("full_name", "first_name", "last_name")
+    search_fields = ("full_name", "first_name", "last_name", "aliases__name")
+    readonly_fields = ("normalized_name",)
+    inlines = [PlayerAliasInline]
+
 
+# Name searches on the big tables are case-insensitive prefix matches ("^":
+# UPPER(name) LIKE 'SCOTTIE%' on PostgreSQL), which the PrefixSearchIndex
+# name indexes can serve; icontains can't.
 
 @admin.register(TournamentField)
-class TournamentFieldAdmin(admin.ModelAdmin):
+class TournamentFieldAdmin(LargeTableAdmin):
     list_display = ("tournament", "player", "status", "tee_time")
-    list_filter = ("tournament", "status")
-    search_fields = ("player__full_name",)
+    list_filter = ("tournament__season", FieldTournamentFilter, "status")
+    list_select_related = ("tournament__season", "player")
+    autocomplete_fields = ("tournament", "player")
+    search_fields = ("^player__full_name",)
 
 
 @admin.register(Result)
-class ResultAdmin(admin.ModelAdmin):
+class ResultAdmin(LargeTableAdmin):
     list_display = ("tournament", "player", "position", "earnings", "made_cut")
-    list_filter = ("tournament", "made_cut")
-    search_fields = ("player__full_name",)
+    list_filter = ("season", SeasonTournamentFilter, "made_cut")
+    list_select_related = ("tournament__season", "player")
+    autocomplete_fields = ("tournament", "player")
+    search_fields = ("^player__full_name",)
 
 
 @admin.register(Pick)
-class PickAdmin(admin.ModelAdmin):
+class PickAdmin(LargeTableAdmin):
     list_display = (
         "user", "tournament", "primary_player", "backup_player",
         "active_player", "status", "reason", "earnings"
     )
-    list_filter = ("tournament", "status", "reason")
-    search_fields = ("user__username", "primary_player__full_name", "active_player__full_name")
+    list_filter = ("season", SeasonTournamentFilter, "status", "reason")
+    list_select_related = ("user", "tournament__season")
+    autocomplete_fields = ("user", "tournament")
+    search_fields = (
+        "^user__username", "^primary_player", "^active_player",
+    )
 
 
 @admin.register(UserSeasonStats)
-class UserSeasonStatsAdmin(admin.ModelAdmin):
+class UserSeasonStatsAdmin(LargeTableAdmin):
     list_display = (
         "user", "season", "total_earnings", "majors_earnings",
         "weeks_played", "weekly_wins", "top5_finishes"
     )
     list_filter = ("season",)
-    search_fields = ("user__username",)
+    list_select_related = ("user", "season")
+    search_fields = ("^user__username",)
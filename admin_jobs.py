@@ -0,0 +1,152 @@
+# core/admin_jobs.py
+"""
+Scoring jobs started from TournamentAdmin actions, run off the request thread.
+
+    refresh    fetch final results from ESPN and resync earnings
+               (ingest.backfill_results: concurrent fetches, serial writes)
+    recompute  recompute Pick.earnings from stored Results
+               (services.sync_tournament_earnings, one tournament at a time),
+               then rebuild UserSeasonStats of the seasons touched
+
+start() returns a job id right away and runs the job on a background thread
+(inline when ADMIN_JOBS_BACKGROUND is False, e.g. in tests). Progress lives in
+Django's cache, so any worker can answer status(job_id) as long as the cache
+is shared (checks.py, core.E001); the admin warns when it isn't:
+
+    {"id", "kind", "state": "running" | "done", "total", "done", "failed",
+     "started_at", "finished_at", "seconds", "reports": [per tournament]}
+
+Each report has tournament_id, tournament, seconds, error and the job's
+own numbers (rows / fetch_s / persist_s / created / updated for refresh,
+picks / changed for recompute, picks_changed for both).
+"""
+import logging
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .ingest import backfill_results
+from .services import rebuild_season_stats, sync_tournament_earnings
+
+
+logger = logging.getLogger(__name__)
+
+KINDS = {
+    "refresh": "Refresh results from ESPN + resync earnings",
+    "recompute": "Recompute earnings",
+}
+
+# Finished jobs stay visible this long.
+TTL = 24 * 60 * 60
+
+
+def _key(job_id) -> str:
+    return f"admin-job:{job_id}"
+
+
+def _background() -> bool:
+    return getattr(settings, "ADMIN_JOBS_BACKGROUND", True)
+
+
+def status(job_id):
+    return cache.get(_key(job_id))
+
+
+def _report(tournament, **fields):
+    report = {
+        "tournament_id": tournament.pk,
+        "tournament": str(tournament),
+        "seconds": 0.0,
+        "error": None,
+    }
+    report.update(fields)
+    return report
+
+
+def _refresh(tournaments, progress):
+    workers = getattr(settings, "ADMIN_JOBS_ESPN_WORKERS", 4)
+    rate = getattr(settings, "ADMIN_JOBS_ESPN_RATE", 2.0)
+
+    def forward(r):
+        t = r.pop("tournament")
+        progress(_report(t, seconds=round(r["fetch_s"] + r["persist_s"], 3), **r))
+
+    backfill_results(tournaments, workers=workers, rate=rate, progress=forward)
+
+
+def _recompute(tournaments, progress):
+    for t in tournaments:
+        started = time.perf_counter()
+        try:
+            summary = sync_tournament_earnings(t)
+        except Exception as exc:
+            logger.exception("recompute for %s failed", t)
+            report = _report(t, error=str(exc))
+        else:
+            report = _report(t, picks_changed=summary["changed"], **summary)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        progress(report)
+
+    # The action exists for picks edited some other way, so don't trust the
+    # existing stats rows: rebuild every season touched from Pick.
+    for season in {t.season_id: t.season for t in tournaments}.values():
+        rebuild_season_stats(season)
+
+
+RUNNERS = {"refresh": _refresh, "recompute": _recompute}
+
+
+def start(kind, tournaments) -> str:
+    """Start a job over tournaments; returns its id."""
+    runner = RUNNERS[kind]
+    tournaments = list(tournaments)
+    job_id = secrets.token_hex(6)
+    job = {
+        "id": job_id,
+        "kind": kind,
+        "state": "running",
+        "total": len(tournaments),
+        "done": 0,
+        "failed": 0,
+        "started_at": time.time(),
+        "finished_at": None,
+        "seconds": 0.0,
+        "reports": [],
+    }
+    cache.set(_key(job_id), job, timeout=TTL)
+    started = time.perf_counter()
+
+    def progress(report):
+        job["reports"].append(report)
+        job["done"] += 1
+        job["failed"] += bool(report["error"])
+        job["seconds"] = round(time.perf_counter() - started, 3)
+        cache.set(_key(job_id), job, timeout=TTL)
+
+    def run():
+        try:
+            runner(tournaments, progress)
+        except Exception:
+            logger.exception("admin job %s (%s) failed", job_id, kind)
+        finally:
+            job["state"] = "done"
+            job["finished_at"] = time.time()
+            job["seconds"] = round(time.perf_counter() - started, 3)
+            cache.set(_key(job_id), job, timeout=TTL)
+
+    if not _background():
+        run()
+        return job_id
+
+    def run_in_thread():
+        try:
+            run()
+        finally:
+            connection.close()
+
+    threading.Thread(target=run_in_thread, name=f"admin-job-{job_id}", daemon=True).start()
+    return job_id
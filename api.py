@@ -0,0 +1,209 @@
+# core/api.py
+"""
+Read-only JSON API (for the mobile wrapper and anything else that polls).
+
+    api/standings/                       season standings (ranked)
+    api/leaderboard/                     season leaderboard (as on the dashboard)
+    api/tournaments/<pk>/results/        a tournament's Results
+    api/tournaments/<pk>/picks/          a tournament's league picks
+
+Season endpoints take ?season=<id> (default: the active season).
+
+Every response carries an ETag built from the newest updated_at (and the row
+count, to notice deletes) of the rows it depends on: Pick for the season
+views and picks, Result for results. It also covers the Season / Tournament
+fields in the payload (name, dates, status) and the season_cache generation,
+which moves on every scoring write and stats rebuild (UserSeasonStats, for
+the leaderboard). A request with a matching If-None-Match gets a 304 after
+that one aggregate query, before any of the real work is done. There is no
+Last-Modified: a date alone can't notice a delete or a status change.
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+
+from . import season_cache
+from .models import Pick, Result, Season, Tournament
+from .services import season_leaderboard, season_standings
+
+
+def _season(request):
+    season_id = request.GET.get("season")
+    if season_id:
+        if not season_id.isdigit():
+            raise Http404("Bad season id")
+        return get_object_or_404(Season, pk=season_id)
+    return Season.objects.filter(is_active=True).order_by("-year").first()
+
+
+def _stamp(request, scope, kwargs):
+    """
+    {"etag", "obj"} for this request, computed once (both
+    validator callbacks of @condition and the view share it).
+    """
+    cached = getattr(request, "_api_stamp", None)
+    if cached is not None:
+        return cached
+
+    obj, rows, label = scope(request, **kwargs)
+    if rows is None:
+        last, count = None, 0
+    else:
+        agg = rows.order_by().aggregate(last=Max("updated_at"), n=Count("pk"))
+        last, count = agg["last"], agg["n"]
+
+    raw = f"{request.path}|{label}|{_version(obj)}|{count}|{last.isoformat() if last else ''}"
+    request._api_stamp = {
+        "etag": hashlib.md5(raw.encode("utf-8")).hexdigest(),
+        "obj": obj,
+    }
+    return request._api_stamp
+
+
+def _version(obj) -> str:
+    """The scope object's own payload fields plus its season's cache generation."""
+    if isinstance(obj, Season):
+        values = (obj.name, obj.year, season_cache.generation(obj.pk))
+    elif isinstance(obj, Tournament):
+        values = (
+            obj.name, obj.start_date, obj.end_date, obj.status,
+            season_cache.generation(obj.season_id),
+        )
+    else:
+        values = ()
+    return "|".join(str(v) for v in values)
+
+
+def _api_view(scope):
+    """login + GET only + ETag from scope(request, **kwargs)."""
+    def decorator(view):
+        def etag(request, **kwargs):
+            return _stamp(request, scope, kwargs)["etag"]
+
+        @wraps(view)
+        def wrapped(request, **kwargs):
+            response = view(request, _stamp(request, scope, kwargs)["obj"])
+            response["Cache-Control"] = "private, no-cache"  # always revalidate
+            return response
+
+        return login_required(require_GET(
+            condition(etag_func=etag)(wrapped)
+        ))
+    return decorator
+
+
+def _season_scope(request):
+    season = _season(request)
+    if season is None:
+        return None, None, "no-season"
+    return season, Pick.objects.filter(season=season), f"season-{season.pk}"
+
+
+def _results_scope(request, pk):
+    tournament = get_object_or_404(Tournament, pk=pk)
+    return tournament, Result.objects.filter(tournament=tournament), f"results-{pk}"
+
+
+def _picks_scope(request, pk):
+    tournament = get_object_or_404(Tournament, pk=pk)
+    return tournament, Pick.objects.filter(tournament=tournament), f"picks-{pk}"
+
+
+def _season_json(season):
+    return {"id": season.pk, "name": season.name, "year": season.year} if season else None
+
+
+@_api_view(_season_scope)
+def standings(request, season):
+    rows = []
+    if season:
+        rows = [
+            {
+                "rank": rank,
+                "username": r["user"].username,
+                "points": str(r["points"]),
+                "majors": str(r["majors"]),
+                "wins": r["wins"],
+                "top5": r["top5"],
+                "top10": r["top10"],
+                "cashes": r["cashes"],
+                "events": r["events"],
+            }
+            for rank, r in enumerate(season_standings(season), start=1)
+        ]
+    return JsonResponse({"season": _season_json(season), "standings": rows})
+
+
+@_api_view(_season_scope)
+def leaderboard(request, season):
+    rows = []
+    if season:
+        rows = [
+            {
+                "username": r["user__username"],
+                "total_earnings": str(r["total_earnings"]),
+                "majors_earnings": str(r["majors_earnings"]),
+                "weeks_played": r["weeks_played"],
+                "weekly_wins": r["weekly_wins"],
+            }
+            for r in season_leaderboard(season)
+        ]
+    return JsonResponse({"season": _season_json(season), "leaderboard": rows})
+
+
+def _tournament_json(tournament):
+    return {
+        "id": tournament.pk,
+        "name": tournament.name,
+        "start_date": tournament.start_date.isoformat(),
+        "end_date": tournament.end_date.isoformat(),
+        "status": tournament.status,
+    }
+
+
+@_api_view(_results_scope)
+def tournament_results(request, tournament):
+    rows = [
+        {
+            "player": r["player__full_name"],
+            "position": r["position"],
+            "earnings": str(r["earnings"]),
+            "made_cut": r["made_cut"],
+        }
+        for r in (
+            Result.objects
+            .filter(tournament=tournament)
+            .order_by("-earnings", "player__full_name")
+            .values("player__full_name", "position", "earnings", "made_cut")
+        )
+    ]
+    return JsonResponse({"tournament": _tournament_json(tournament), "results": rows})
+
+
+@_api_view(_picks_scope)
+def tournament_picks(request, tournament):
+    rows = [
+        {
+            "username": p["user__username"],
+            "primary_player": p["primary_player"],
+            "backup_player": p["backup_player"],
+            "active_player": p["active_player"],
+            "status": p["status"],
+            "earnings": str(p["earnings"]),
+        }
+        for p in (
+            Pick.objects
+            .filter(tournament=tournament)
+            .order_by("user__username")
+            .values(
+                "user__username", "primary_player", "backup_player",
+                "active_player", "status", "earnings",
+            )
+        )
+    ]
+    return JsonResponse({"tournament": _tournament_json(tournament), "picks": rows})
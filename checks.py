@@ -0,0 +1,43 @@
+# core/checks.py
+"""
+System checks for the settings the core app needs in production.
+
+The ingest worker, the management commands and every web worker share state
+through Django's cache: season_cache generations, the leaderboard cache,
+field choices, used golfers and admin job progress. With a per-process
+backend (LocMemCache, the default, or DummyCache) a write in one process is
+invisible to the others, so `manage.py check --deploy` rejects it:
+
+    core.E001  the default cache backend is per-process
+
+Single-process setups can silence it with SILENCED_SYSTEM_CHECKS.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+
+# Backends whose entries only exist in the process that wrote them.
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+def local_cache() -> bool:
+    """True if the default cache isn't shared between processes."""
+    return settings.CACHES.get("default", {}).get("BACKEND") in LOCAL_CACHE_BACKENDS
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if not local_cache():
+        return []
+    return [Error(
+        "The default cache backend is per-process.",
+        hint=(
+            "Configure a shared backend (Redis, Memcached, database) in CACHES['default'] so the "
+            "ingest worker, management commands and web workers see each other's cache writes."
+        ),
+        obj=settings.CACHES["default"]["BACKEND"],
+        id="core.E001",
+    )]
@@ -0,0 +1,158 @@
+# core/espn_client.py
+"""
+Shared HTTP client for ESPN page fetches.
+
+- one keep-alive requests.Session (connection pool) per process
+- conditional GETs: the ETag / Last-Modified of every page is remembered with
+  its parsed rows, and a 304 hands back those rows without re-parsing
+- per-host concurrency limit (ESPN_MAX_CONNECTIONS_PER_HOST, default 4)
+- jittered exponential retries on connection errors, 429 and 5xx
+  (ESPN_RETRIES, default 2)
+
+Timings are reported to the view metrics middleware.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .middleware import record_http
+
+
+USER_AGENT = "Mozilla/5.0"
+TIMEOUT = (3, 5)  # connect, read
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5  # seconds; doubled per attempt, jittered ±50%
+MEMO_SIZE = 128     # parsed pages kept for 304 revalidation
+
+
+class ESPNClient:
+    def __init__(self, max_per_host=None, retries=None):
+        self.max_per_host = max_per_host or getattr(settings, "ESPN_MAX_CONNECTIONS_PER_HOST", 4)
+        self.retries = getattr(settings, "ESPN_RETRIES", 2) if retries is None else retries
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        # (url, parser key) -> (etag, last_modified, parsed)
+        self._memo = OrderedDict()
+
+    def forget(self):
+        """Drop remembered validators / parsed pages (next fetch is a full GET)."""
+        with self._lock:
+            self._memo.clear()
+
+    def _limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return sem
+
+    def _sleep_backoff(self, attempt):
+        time.sleep(BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def get(self, url, headers=None):
+        """
+        GET with host limit + retries. Returns the Response (200 or 304);
+        raises requests.RequestException on failure.
+        """
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                with self._limit(url):
+                    resp = self.session.get(url, headers=headers, timeout=TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    if resp.status_code != 304:
+                        resp.raise_for_status()
+                    return resp
+            finally:
+                record_http(time.perf_counter() - started)
+
+            self._sleep_backoff(attempt)
+            attempt += 1
+
+    def get_parsed(self, url, parse):
+        """
+        parse(resp.text) for the page at url, revalidated with ETag /
+        If-Modified-Since: when ESPN answers 304 the previous result is
+        returned without downloading or parsing the page again.
+        """
+        key = (url, getattr(parse, "__qualname__", repr(parse)))
+        with self._lock:
+            memo = self._memo.get(key)
+
+        headers = {}
+        if memo:
+            etag, last_modified, _ = memo
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        resp = self.get(url, headers=headers)
+        if resp.status_code == 304 and memo:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+            return memo[2]
+
+        parsed = parse(resp.text)
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock:
+                self._memo[key] = (etag, last_modified, parsed)
+                self._memo.move_to_end(key)
+                while len(self._memo) > MEMO_SIZE:
+                    self._memo.popitem(last=False)
+        return parsed
+
+
+class RateLimiter:
+    """Thread-safe pacing: at most `rate` acquire() calls per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ESPNClient:
+    """Process-wide client (one connection pool for all ESPN fetches)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ESPNClient()
+    return _client
@@ -0,0 +1,134 @@
+# core/espn_parse.py
+"""
+Fast parsing of ESPN leaderboard pages.
+
+ESPN pages are several hundred KB of markup around the one table the
+scrapers read (table.Full__Table). Instead of building a tree for the whole
+page, we slice the table's markup out of the raw text and parse only that,
+with lxml when it is installed and html.parser otherwise. If the slice can't
+be found (markup changed), we fall back to a full BeautifulSoup parse.
+
+ESPN_PARSER setting: "auto" (default), "lxml" or "html.parser".
+"""
+import re
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # optional dependency
+    lxml_html = None
+
+
+TABLE_CLASS = "Full__Table"
+PLAYER_LINK_CLASS = "leaderboard_player_name"
+
+# text: the cell's text (same as bs4 get_text(strip=True))
+# player: text of an a.leaderboard_player_name inside the cell, or None
+Cell = namedtuple("Cell", ["text", "player"])
+
+_TABLE_OPEN = re.compile(r"<table\b", re.IGNORECASE)
+_TABLE_CLOSE = re.compile(r"</table\s*>", re.IGNORECASE)
+
+
+def backend() -> str:
+    """The parser actually used for the next call."""
+    wanted = getattr(settings, "ESPN_PARSER", "auto")
+    if wanted == "html.parser" or lxml_html is None:
+        return "html.parser"
+    return "lxml"
+
+
+def _table_start(html: str):
+    """Offset of the first <table> tag whose own markup names TABLE_CLASS, or -1."""
+    marker = html.find(TABLE_CLASS)
+    while marker != -1:
+        start = html.rfind("<table", 0, marker)
+        # The match must sit inside that table's opening tag, not in text or
+        # another element's attributes further on (an earlier nav table, say).
+        if start != -1 and html.find(">", start) > marker:
+            return start
+        marker = html.find(TABLE_CLASS, marker + 1)
+    return -1
+
+
+def extract_table(html: str):
+    """Markup of the first table.Full__Table in html, or None."""
+    start = _table_start(html)
+    if start == -1:
+        return None
+
+    # Walk forward to the matching </table>, allowing nested tables.
+    depth = 0
+    pos = start
+    while True:
+        opening = _TABLE_OPEN.search(html, pos)
+        closing = _TABLE_CLOSE.search(html, pos)
+        if closing is None:
+            return None
+        if opening is not None and opening.start() < closing.start():
+            depth += 1
+            pos = opening.end()
+            continue
+        depth -= 1
+        pos = closing.end()
+        if depth == 0:
+            return html[start:pos]
+
+
+def _rows_lxml(table_html):
+    """Rows of the sliced table, or None if its root isn't table.Full__Table."""
+    table = lxml_html.fragment_fromstring(table_html)
+    if table.tag != "table" or TABLE_CLASS not in (table.get("class") or "").split():
+        return None
+    rows = []
+    for tr in table.xpath("./tbody/tr"):
+        cells = []
+        for td in tr.xpath(".//td"):
+            link = td.xpath(f".//a[contains(concat(' ', normalize-space(@class), ' '), ' {PLAYER_LINK_CLASS} ')]")
+            player = "".join(s.strip() for s in link[0].itertext()) if link else None
+            cells.append(Cell("".join(s.strip() for s in td.itertext()), player))
+        rows.append(cells)
+    return rows
+
+
+def _rows_soup(table):
+    rows = []
+    for tr in table.select(":scope > tbody > tr"):
+        cells = []
+        for td in tr.find_all("td"):
+            link = td.select_one(f"a.{PLAYER_LINK_CLASS}")
+            cells.append(Cell(td.get_text(strip=True), link.get_text(strip=True) if link else None))
+        rows.append(cells)
+    return rows
+
+
+def table_rows(html: str):
+    """
+    Body rows of the page's table.Full__Table as lists of Cells
+    ([] when the page has no such table).
+    """
+    table_html = extract_table(html)
+
+    if table_html is not None:
+        if backend() == "lxml":
+            try:
+                rows = _rows_lxml(table_html)
+            except Exception:
+                rows = None
+            if rows is not None:
+                return rows
+            # not the table we want, or lxml choked: fall through to html.parser
+        table = BeautifulSoup(table_html, "html.parser").select_one(f"table.{TABLE_CLASS}")
+        if table is not None:
+            return _rows_soup(table)
+
+    # Slow path: the table couldn't be sliced out, parse the whole page.
+    table = BeautifulSoup(html, "html.parser").select_one(f"table.{TABLE_CLASS}")
+    return _rows_soup(table) if table is not None else []
+
+
+def cell_text(cells, idx) -> str:
+    return cells[idx].text if len(cells) > idx else ""
@@ -0,0 +1,171 @@
+# core/exports.py
+"""
+Streaming CSV / JSON-lines exports of season data (for payouts and analysis).
+
+    exports/picks/        one row per Pick
+    exports/results/      one row per Result
+    exports/standings/    ranked season standings (services.season_standings)
+
+Query string: ?season=<id> (default: the active season, "all" for every
+season) and ?format=csv (default) or jsonl. Staff only. The export_season
+management command writes the same streams to a file or stdout.
+
+Rows come from values() projections read with .iterator(chunk_size=...), one
+season at a time, and are encoded line by line into a generator, so memory
+stays flat whatever the number of rows or seasons.
+"""
+import csv
+import json
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .models import Pick, Result, Season
+from .services import season_standings
+
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+PICK_FIELDS = {
+    "season": "season__year",
+    "tournament_id": "tournament_id",
+    "tournament": "tournament__name",
+    "start_date": "tournament__start_date",
+    "username": "user__username",
+    "primary_player": "primary_player",
+    "backup_player": "backup_player",
+    "active_player": "active_player",
+    "status": "status",
+    "reason": "reason",
+    "earnings": "earnings",
+}
+
+RESULT_FIELDS = {
+    "season": "season__year",
+    "tournament_id": "tournament_id",
+    "tournament": "tournament__name",
+    "start_date": "tournament__start_date",
+    "player": "player__full_name",
+    "position": "position",
+    "earnings": "earnings",
+    "made_cut": "made_cut",
+}
+
+STANDINGS_FIELDS = (
+    "season", "rank", "username", "points", "majors",
+    "wins", "top5", "top10", "cashes", "events",
+)
+
+
+def _projected(queryset, fields):
+    """Rows of queryset as dicts keyed by the export column names."""
+    columns = list(fields)
+    lookups = [fields[c] for c in columns]
+    for values in queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(columns, values))
+
+
+def _pick_rows(season):
+    return _projected(
+        Pick.objects.filter(season=season).order_by("tournament__start_date", "tournament_id", "user__username"),
+        PICK_FIELDS,
+    )
+
+
+def _result_rows(season):
+    return _projected(
+        Result.objects.filter(season=season).order_by("tournament__start_date", "tournament_id", "-earnings", "pk"),
+        RESULT_FIELDS,
+    )
+
+
+def _standings_rows(season):
+    # One row per user, already aggregated in SQL; small enough to hold.
+    for rank, r in enumerate(season_standings(season), start=1):
+        yield {
+            "season": season.year,
+            "rank": rank,
+            "username": r["user"].username,
+            **{f: r[f] for f in STANDINGS_FIELDS[3:]},
+        }
+
+
+DATASETS = {
+    "picks": (_pick_rows, tuple(PICK_FIELDS)),
+    "results": (_result_rows, tuple(RESULT_FIELDS)),
+    "standings": (_standings_rows, STANDINGS_FIELDS),
+}
+
+
+def rows(dataset, seasons):
+    """Export rows (dicts) of dataset for each season in turn."""
+    load, _ = DATASETS[dataset]
+    for season in seasons:
+        yield from load(season)
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows_, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows_:
+        yield writer.writerow([row[c] for c in columns])
+
+
+def _jsonl_lines(rows_):
+    for row in rows_:
+        yield json.dumps(row, default=str) + "\n"
+
+
+def stream(dataset, seasons, fmt="csv"):
+    """Generator of encoded text lines (CSV with a header row, or JSON lines)."""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset {dataset!r}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    data = rows(dataset, seasons)
+    if fmt == "jsonl":
+        return _jsonl_lines(data)
+    return _csv_lines(data, DATASETS[dataset][1])
+
+
+def _seasons(request):
+    season_id = request.GET.get("season")
+    if season_id == "all":
+        return Season.objects.order_by("year", "pk"), "all"
+    if season_id:
+        if not season_id.isdigit():
+            raise Http404("Bad season id")
+        seasons = Season.objects.filter(pk=season_id)
+    else:
+        seasons = Season.objects.filter(is_active=True).order_by("-year")[:1]
+    season = seasons.first()
+    if season is None:
+        raise Http404("No season")
+    return [season], str(season.year)
+
+
+@staff_member_required
+@require_GET
+def export(request, dataset):
+    fmt = request.GET.get("format", "csv")
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404("Unknown export")
+
+    seasons, label = _seasons(request)
+    response = StreamingHttpResponse(stream(dataset, seasons, fmt), content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{dataset}-{label}.{fmt}"'
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,175 @@
+# core/fake_espn.py
+"""
+Local stand-in for ESPN's golf leaderboard pages.
+
+Renders pages with the same table layout the scrapers in views.py expect and
+serves them from a throwaway HTTP server, so the ingest worker, the scrapers
+and the benchmarks can run offline:
+
+    with FakeESPNServer() as espn:
+        espn.set_page("401", render_final_page(rows))
+        with override_settings(ESPN_BASE_URL=espn.url):
+            ...
+"""
+import hashlib
+import html
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+PAGE_HEAD = (
+    "<!DOCTYPE html><html><head><title>Leaderboard - ESPN</title></head><body>"
+    "<nav class=\"global-nav\">{padding}</nav><main>"
+)
+PAGE_TAIL = "</main><footer>{padding}</footer></body></html>"
+
+# ESPN pages are a few hundred KB of markup around one table; pad to match.
+DEFAULT_PADDING_KB = 200
+
+
+def _padding(kb):
+    block = "<div class=\"nav-item\"><a href=\"#\">Link</a><span>x</span></div>"
+    return block * max(int(kb * 1024 / len(block)), 0)
+
+
+def _page(header, body_rows, padding_kb):
+    pad = _padding(padding_kb / 2)
+    th = "".join(f"<th>{html.escape(h)}</th>" for h in header)
+    trs = "".join(
+        "<tr class=\"Table__TR\">"
+        + "".join(f"<td class=\"Table__TD\">{cell}</td>" for cell in cells)
+        + "</tr>"
+        for cells in body_rows
+    )
+    return (
+        PAGE_HEAD.format(padding=pad)
+        + "<table class=\"Table Full__Table\">"
+        + f"<thead><tr>{th}</tr></thead><tbody>{trs}</tbody></table>"
+        + PAGE_TAIL.format(padding=pad)
+    )
+
+
+def _e(row, key):
+    return html.escape(str(row.get(key, "")))
+
+
+def render_field_page(rows, padding_kb=DEFAULT_PADDING_KB):
+    """rows: [{"player": ..., "tee_time": ...}] as returned by fetch_espn_leaderboard."""
+    return _page(
+        ["", "TEE TIME", "PLAYER"],
+        [["", _e(r, "tee_time"), _e(r, "player")] for r in rows],
+        padding_kb,
+    )
+
+
+def render_final_page(rows, padding_kb=DEFAULT_PADDING_KB):
+    """rows: fetch_espn_results-shaped dicts (Player, Pos, R1-R4, Total, Earnings)."""
+    return _page(
+        ["", "POS", "PLAYER", "SCORE", "R1", "R2", "R3", "R4", "TOT", "EARNINGS"],
+        [
+            ["", _e(r, "Pos"),
+             f"<a class=\"AnchorLink leaderboard_player_name\">{_e(r, 'Player')}</a>",
+             "", _e(r, "R1"), _e(r, "R2"), _e(r, "R3"), _e(r, "R4"),
+             _e(r, "Total"), _e(r, "Earnings")]
+            for r in rows
+        ],
+        padding_kb,
+    )
+
+
+def render_live_page(rows, padding_kb=DEFAULT_PADDING_KB):
+    """rows: fetch_current_leaderboard-shaped dicts (POS, PLAYER, SCORE, ...)."""
+    return _page(
+        ["", "POS", "", "PLAYER", "SCORE", "TODAY", "THRU", "R1", "R2", "R3", "R4", "TOT"],
+        [
+            ["", _e(r, "POS"), "",
+             f"<a class=\"AnchorLink leaderboard_player_name\">{_e(r, 'PLAYER')}</a>",
+             _e(r, "SCORE"), _e(r, "TODAY"), _e(r, "THRU"),
+             _e(r, "R1"), _e(r, "R2"), _e(r, "R3"), _e(r, "R4"), _e(r, "TOT")]
+            for r in rows
+        ],
+        padding_kb,
+    )
+
+
+class FakeESPNServer:
+    """
+    Serves /golf/leaderboard?tournamentId=<id> (field page) and
+    /golf/leaderboard/_/tournamentId/<id> (live / final page) from memory,
+    with ETags (answers If-None-Match with 304).
+    """
+
+    def __init__(self):
+        self.field_pages = {}
+        self.pages = {}
+        self.hits = []
+        self.not_modified = 0
+        self._server = None
+        self._thread = None
+
+    def set_field_page(self, tournament_id, body):
+        self.field_pages[str(tournament_id)] = body
+
+    def set_page(self, tournament_id, body):
+        self.pages[str(tournament_id)] = body
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _lookup(self, path):
+        parsed = urlparse(path)
+        if parsed.path.rstrip("/") == "/golf/leaderboard":
+            tid = (parse_qs(parsed.query).get("tournamentId") or [""])[0]
+            return self.field_pages.get(tid)
+        prefix = "/golf/leaderboard/_/tournamentId/"
+        if parsed.path.startswith(prefix):
+            return self.pages.get(parsed.path[len(prefix):].strip("/"))
+        return None
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.hits.append(self.path)
+                body = fake._lookup(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                etag = '"%s"' % hashlib.md5(data).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    fake.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
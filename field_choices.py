@@ -0,0 +1,54 @@
+# core/field_choices.py
+"""
+Golfer choices for a tournament's pick form, from the stored TournamentField.
+
+The ingest worker upserts each upcoming event's ESPN field into
+TournamentField (views._upsert_field_from_rows); make_picks and PickForm
+read the in-field golfers from here, one cache hit per request, instead of
+scraping ESPN on every GET and POST. Entries are dropped by the field upsert
+and by the TournamentField signals (admin edits, see signals.py).
+
+An empty field (not scraped yet) is never cached, so the golfers show up as
+soon as the worker stores them. Drops only reach other processes through a
+shared cache (checks.py, core.E001); on a per-process backend entries expire
+after LOCAL_TTL instead.
+"""
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .checks import local_cache
+from .models import TournamentField
+
+
+# Entries are rebuilt on the next read after any field change, so this only
+# bounds how long an idle tournament's list stays around.
+TTL = 24 * 60 * 60
+LOCAL_TTL = 60
+
+
+def _key(tournament_id) -> str:
+    return f"field-choices:{tournament_id}"
+
+
+def get(tournament) -> list:
+    """Names of the tournament's in-field golfers, alphabetical."""
+    key = _key(tournament.pk)
+    player_names = cache.get(key)
+    if player_names is None:
+        player_names = list(
+            TournamentField.objects
+            .filter(tournament=tournament, status="in_field")
+            .order_by("player__full_name")
+            .values_list("player__full_name", flat=True)
+        )
+        if player_names:
+            cache.set(key, player_names, timeout=LOCAL_TTL if local_cache() else TTL)
+    return player_names
+
+
+def invalidate(tournament_id):
+    """Drop the list now and again on commit, so a racing read can't re-cache the old field."""
+    key = _key(tournament_id)
+    cache.delete(key)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete(key))
@@ -1,11 +1,12 @@
 from django import forms
 from django.utils import timezone
+from . import field_choices, used_players
 from .models import Pick
 
 
 class PickForm(forms.ModelForm):
 
-    # These will be turned into dropdowns by assigning .choices in the view
+    # Dropdowns of the tournament's field (see __init__)
     primary_player = forms.ChoiceField(choices=[])
     backup_player = forms.ChoiceField(choices=[], required=False)
 
@@ -17,15 +18,22 @@ class PickForm(forms.ModelForm):
         # remove unused Player FK references
         self.user = kwargs.pop("user")
         self.tournament = kwargs.pop("tournament")
+        # make_picks passes the field minus used golfers; default is the whole stored field
+        player_names = kwargs.pop("player_names", None)
         super().__init__(*args, **kwargs)
 
         # Labels
         self.fields["primary_player"].label = "Primary golfer"
         self.fields["backup_player"].label = "Backup golfer (optional)"
 
-        # IMPORTANT:
-        # choices are assigned in the view (make_picks), NOT here anymore.
-        # Here they stay empty until the view fills them in.
+        # Choices come from the stored TournamentField (field_choices), never
+        # from a live scrape; loaded lazily, on render / validation.
+        def choices():
+            names = field_choices.get(self.tournament) if player_names is None else player_names
+            return [(name, name) for name in names]
+
+        self.fields["primary_player"].choices = choices
+        self.fields["backup_player"].choices = choices
 
     def clean(self):
         cleaned_data = super().clean()
@@ -40,28 +48,17 @@ class PickForm(forms.ModelForm):
         if primary and backup and primary == backup:
             raise forms.ValidationError("Primary and backup golfer must be different.")
 
-        # 3) No-repeat rule (string comparison now!)
-        if primary and self._player_used_this_season(primary):
-            raise forms.ValidationError(f"You've already used {primary} this season.")
-
-        if backup and self._player_used_this_season(backup):
-            raise forms.ValidationError(f"You've already used {backup} this season.")
-
-        return cleaned_data
+        # 3) No-repeat rule: both golfers checked against the cached index first,
+        #    then against the picks themselves (another worker's cache may be
+        #    the only one that saw the user's latest pick)
+        season_id = self.tournament.season_id
+        for fresh in (False, True):
+            used = used_players.get(self.user.pk, season_id, fresh=fresh)
 
-    def _player_used_this_season(self, name: str) -> bool:
-        """Check if user already used this golfer name during the season."""
+            if primary and used_players.is_used(used, primary, self.tournament):
+                raise forms.ValidationError(f"You've already used {primary} this season.")
 
-        season = self.tournament.season
+            if backup and used_players.is_used(used, backup, self.tournament):
+                raise forms.ValidationError(f"You've already used {backup} this season.")
 
-        qs = Pick.objects.filter(
-            user=self.user,
-            tournament__season=season,
-            active_player=name,   # name is a plain string now
-        )
-
-        # Exclude the current pick when editing
-        if self.instance and self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
-
-        return qs.exists()
+        return cleaned_data
@@ -0,0 +1,225 @@
+# core/ingest.py
+"""
+ESPN ingestion loop used by the ingest_espn management command.
+
+Moves Tournament.status along (services.sync_tournament_statuses) and locks
+the picks of tournaments past their pick_lock_datetime (services.lock_due_picks,
+substituting backups for WD/DQ primaries, after one last field scrape), then walks
+the tournaments of the active season(s) by status and:
+- in_progress: refreshes the live leaderboard every `live_interval` seconds
+               and stores it as a LeaderboardSnapshot when it changed
+- upcoming:    refreshes the field every `field_interval` seconds and stores
+               it in TournamentField, which the pick form reads
+               (only for events starting within `field_horizon_days`)
+- completed:   fetches final results, persisting Result + Pick.earnings, on
+               the field cadence until they stop changing: through
+               `final_grace_days` after end_date (a Monday finish is still
+               being played when the status flips), and while a golfer who
+               made the cut has no earnings yet (ESPN posts them late), up
+               to `final_earnings_days` after end_date
+
+Everything lands in the leaderboard cache / database, so views never have to
+scrape ESPN themselves. Expired snapshots are pruned every `prune_interval`.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from . import leaderboard_cache, snapshots
+from .espn_client import RateLimiter
+from .models import Tournament, Result
+from .services import lock_due_picks, sync_tournament_statuses
+
+
+logger = logging.getLogger(__name__)
+
+
+class IngestScheduler:
+    def __init__(self, live_interval=60, field_interval=6 * 60 * 60,
+                 field_horizon_days=10, final_grace_days=1, final_earnings_days=14,
+                 prune_interval=60 * 60, clock=time.monotonic):
+        self.live_interval = live_interval
+        self.field_interval = field_interval
+        self.field_horizon_days = field_horizon_days
+        self.final_grace_days = final_grace_days
+        self.final_earnings_days = final_earnings_days
+        self.prune_interval = prune_interval
+        self.clock = clock
+        self._next_due = {}  # (tournament_id, kind) -> clock() value
+        self._next_prune = 0
+
+    def _tournaments(self):
+        return (
+            Tournament.objects
+            .filter(season__is_active=True, status__in=["upcoming", "in_progress", "completed"])
+            .exclude(pga_tournament_id__isnull=True)
+            .exclude(pga_tournament_id="")
+            .annotate(
+                has_results=Exists(Result.objects.filter(tournament=OuterRef("pk"))),
+                missing_earnings=Exists(
+                    Result.objects.filter(tournament=OuterRef("pk"), made_cut=True, earnings=0)
+                ),
+            )
+            .select_related("season")
+        )
+
+    def _final_pending(self, tournament, today):
+        """Whether a completed tournament's stored results may still change."""
+        if not tournament.has_results:
+            return True
+        days_since = (today - tournament.end_date).days
+        if days_since <= self.final_grace_days:
+            return True
+        return tournament.missing_earnings and days_since <= self.final_earnings_days
+
+    def _due(self, tournament, kind, now):
+        return now >= self._next_due.get((tournament.pk, kind), 0)
+
+    def _schedule(self, tournament, kind, now, interval):
+        self._next_due[(tournament.pk, kind)] = now + interval
+
+    def plan(self):
+        """Return [(tournament, kind)] that are due right now."""
+        now = self.clock()
+        today = timezone.localdate()
+        horizon = today + timedelta(days=self.field_horizon_days)
+        jobs = []
+
+        for t in self._tournaments():
+            status = t.status
+            if status == "in_progress":
+                kind = "live"
+            elif status == "completed":
+                if not self._final_pending(t, today):
+                    continue
+                kind = "final"
+            elif t.start_date <= horizon:
+                kind = "field"
+            else:
+                continue
+
+            if self._due(t, kind, now):
+                jobs.append((t, kind))
+
+        return jobs
+
+    def run_once(self):
+        """Run every due job once; returns {kind: tournaments processed}."""
+        from .views import (
+            fetch_current_leaderboard, fetch_espn_leaderboard, fetch_espn_results,
+            refresh_field_before_lock,
+        )
+
+        done = {"live": 0, "field": 0, "final": 0}
+
+        try:
+            for status, n in sync_tournament_statuses().items():
+                logger.info("%d tournament(s) now %s", n, status)
+        except Exception:
+            logger.exception("tournament status sync failed")
+
+        try:
+            for t, summary in lock_due_picks(before_lock=refresh_field_before_lock):
+                logger.info(
+                    "locked %d pick(s) for %s (%d backup, %d void)",
+                    summary["locked"], t, summary["substituted"], summary["void"],
+                )
+        except Exception:
+            logger.exception("pick lock failed")
+
+        for t, kind in self.plan():
+            started = self.clock()
+            try:
+                if kind == "live":
+                    rows = fetch_current_leaderboard(t, refresh=True)
+                    snapshots.record(t, rows)
+                elif kind == "final":
+                    rows = fetch_espn_results(t, persist=True, refresh=True)
+                else:
+                    rows = fetch_espn_leaderboard(t, refresh=True, persist=True)
+            except Exception:
+                logger.exception("ingest %s for %s failed", kind, t)
+                rows = []
+
+            # Final results are refetched on the field cadence while pending.
+            interval = self.live_interval if kind == "live" else self.field_interval
+            self._schedule(t, kind, started, interval)
+            done[kind] += 1
+
+            logger.info(
+                "ingest %s %s: %d rows in %.2fs",
+                kind, t.pga_tournament_id, len(rows), self.clock() - started,
+            )
+
+        if self.clock() >= self._next_prune:
+            self._next_prune = self.clock() + self.prune_interval
+            try:
+                pruned = snapshots.prune()
+            except Exception:
+                logger.exception("snapshot pruning failed")
+            else:
+                if pruned:
+                    logger.info("pruned %d leaderboard snapshots", pruned)
+
+        return done
+
+    def run_forever(self, tick=5, stop=None):
+        """Loop until stop() returns True (never, by default)."""
+        while not (stop and stop()):
+            self.run_once()
+            time.sleep(tick)
+
+
+def backfill_results(tournaments, workers=4, rate=2.0, progress=None):
+    """
+    Refresh final results for many tournaments at once.
+
+    ESPN pages are fetched and parsed concurrently on a bounded thread pool,
+    paced to `rate` requests per second; each tournament is then persisted
+    (Result upsert + Pick.earnings / UserSeasonStats sync) on the calling
+    thread as soon as its page arrives, so database work stays serial.
+
+    progress(report) is called after every tournament. Returns one report
+    dict per tournament: tournament, rows, fetch_s, persist_s, error and the
+    _upsert_results_from_rows summary fields.
+    """
+    from .views import _scrape_espn_results, _upsert_results_from_rows
+
+    limiter = RateLimiter(rate)
+
+    def fetch(tournament):
+        limiter.acquire()
+        started = time.perf_counter()
+        rows = _scrape_espn_results(tournament, persist=False)
+        return rows, time.perf_counter() - started
+
+    reports = []
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="espn-backfill") as pool:
+        futures = {pool.submit(fetch, t): t for t in tournaments}
+
+        for future in as_completed(futures):
+            t = futures[future]
+            report = {"tournament": t, "rows": 0, "fetch_s": 0.0, "persist_s": 0.0, "error": None}
+            try:
+                rows, report["fetch_s"] = future.result()
+                report["rows"] = len(rows)
+                if not rows:
+                    report["error"] = "no rows from ESPN"
+                else:
+                    started = time.perf_counter()
+                    report.update(_upsert_results_from_rows(t, rows))
+                    report["persist_s"] = time.perf_counter() - started
+                    leaderboard_cache.put_rows(t, "final", rows)
+            except Exception as exc:
+                logger.exception("backfill for %s failed", t)
+                report["error"] = str(exc)
+
+            reports.append(report)
+            if progress:
+                progress(report)
+
+    return reports
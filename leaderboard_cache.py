@@ -0,0 +1,140 @@
+# core/leaderboard_cache.py
+"""
+Shared TTL cache for scraped ESPN leaderboard pages.
+
+Entries are keyed by pga_tournament_id + page kind ("field", "live", "final")
+and hold the parsed rows plus the time they were fetched. Stale entries are
+still served while a single background thread refreshes them, so a page view
+only waits on ESPN when nothing has been cached yet.
+
+Uses Django's cache framework, so the cache is shared between workers as soon
+as a shared backend (Redis, Memcached, DB) is configured.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds before an entry is considered stale, per page kind.
+DEFAULT_TTLS = {
+    "live": 30,
+    "field": 6 * 60 * 60,
+    "final": 3 * 24 * 60 * 60,
+}
+
+# Stale entries are kept this many TTLs before the cache backend drops them.
+STALE_FACTOR = 20
+
+# Failed cold fetches are remembered this long so ESPN outages don't stampede.
+EMPTY_TTL = 30
+
+# Upper bound on how long one refresh may hold the refresh lock.
+LOCK_TIMEOUT = 60
+
+_inflight = set()
+_inflight_lock = threading.Lock()
+
+
+def _ttl(kind: str) -> int:
+    overrides = getattr(settings, "ESPN_CACHE_TTLS", {}) or {}
+    return int(overrides.get(kind, DEFAULT_TTLS.get(kind, 60)))
+
+
+def _key(tournament, kind: str) -> str:
+    return f"espn:{kind}:{tournament.pga_tournament_id}"
+
+
+def _store(key: str, kind: str, rows):
+    ttl = _ttl(kind) if rows else EMPTY_TTL
+    entry = {"rows": rows, "fetched_at": time.time(), "ttl": ttl}
+    cache.set(key, entry, timeout=max(ttl * STALE_FACTOR, EMPTY_TTL))
+    return entry
+
+
+def _refresh(key: str, kind: str, loader):
+    try:
+        rows = loader()
+        if rows:
+            _store(key, kind, rows)
+        else:
+            # Keep serving whatever we had; try again on the next stale read.
+            logger.warning("ESPN refresh for %s returned no rows", key)
+    except Exception:
+        logger.exception("ESPN refresh for %s failed", key)
+    finally:
+        cache.delete(f"{key}:lock")
+        with _inflight_lock:
+            _inflight.discard(key)
+
+
+def _refresh_in_background(key: str, kind: str, loader):
+    with _inflight_lock:
+        if key in _inflight:
+            return
+        _inflight.add(key)
+
+    # Cross-process single flight: only one worker refreshes a given page.
+    if not cache.add(f"{key}:lock", 1, timeout=LOCK_TIMEOUT):
+        with _inflight_lock:
+            _inflight.discard(key)
+        return
+
+    def run():
+        try:
+            _refresh(key, kind, loader)
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, name=f"espn-refresh-{key}", daemon=True).start()
+
+
+def get_rows(tournament, kind: str, loader, refresh: bool = False):
+    """
+    Return cached rows for (tournament, kind), calling loader() to fill them.
+
+    - cold cache: loader() runs inline and its rows are cached
+    - fresh entry: returned as is
+    - stale entry: returned as is while one background thread refreshes it
+    - refresh=True: loader() runs inline and replaces the entry
+    """
+    if not tournament.pga_tournament_id:
+        return []
+
+    key = _key(tournament, kind)
+    entry = None if refresh else cache.get(key)
+
+    if entry is None:
+        rows = loader()
+        if rows or not refresh:
+            _store(key, kind, rows)
+        return rows
+
+    if time.time() - entry["fetched_at"] >= entry["ttl"]:
+        _refresh_in_background(key, kind, loader)
+
+    return entry["rows"]
+
+
+def put_rows(tournament, kind: str, rows):
+    """Store freshly fetched rows (e.g. from a backfill) as the current entry."""
+    if tournament.pga_tournament_id and rows:
+        _store(_key(tournament, kind), kind, rows)
+
+
+def peek_rows(tournament, kind: str):
+    """Cached rows for (tournament, kind) without ever fetching, or None."""
+    if not tournament.pga_tournament_id:
+        return None
+    entry = cache.get(_key(tournament, kind))
+    return entry["rows"] if entry else None
+
+
+def invalidate(tournament, kind: str = None):
+    kinds = [kind] if kind else list(DEFAULT_TTLS)
+    cache.delete_many([_key(tournament, k) for k in kinds])
@@ -0,0 +1,307 @@
+# core/live_stream.py
+"""
+Server-Sent Events for live leaderboards.
+
+Every worker process keeps one Channel per in-progress tournament that has
+listeners. A single background thread per channel polls the live rows (the
+leaderboard cache, so ESPN itself is still hit at most once per TTL) every
+LIVE_STREAM_POLL_INTERVAL seconds and publishes only the rows whose POS,
+SCORE, TODAY or THRU changed, each with the pool members who picked that
+golfer. Connected clients just wait on the channel and write those deltas
+out, so a thousand open pages cost one poll, not a thousand page renders.
+
+Wire format (one stream per tournament):
+
+    id: <channel epoch>:<seq>
+    event: snapshot | delta
+    data: {"seq": n, "rows": [{"PLAYER", "POS", "SCORE", "TODAY", "THRU",
+           "picked_by": [usernames]}], "removed": [player names]}
+
+A client reconnecting with Last-Event-ID gets the deltas it missed, or a
+fresh snapshot when they are no longer in the backlog.
+
+Each open stream holds a worker thread until it ends (MAX_STREAM_SECONDS,
+then EventSource reconnects and resumes). Serve the endpoint from a threaded
+(gunicorn --worker-class gthread) or async worker, never a plain sync pool,
+and keep LIVE_STREAM_MAX_CLIENTS (streams per process, default 10) below the
+threads per process. Past the cap open_stream() returns None and the view
+answers 503 with Retry-After; pages then poll leaderboard_changes instead.
+"""
+import json
+import logging
+import secrets
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection
+
+from . import leaderboard_cache, names
+from .models import Pick
+
+
+logger = logging.getLogger(__name__)
+
+DELTA_FIELDS = ("POS", "SCORE", "TODAY", "THRU")
+
+BACKLOG = 50               # deltas kept for reconnecting clients
+HEARTBEAT = 15             # seconds between keep-alive comments
+MAX_STREAM_SECONDS = 120   # streams end (and EventSource reconnects) after this
+DEFAULT_MAX_CLIENTS = 10   # concurrent streams per process
+PICKS_MAX_AGE = 5 * 60     # seconds before a channel reloads the tournament's picks
+
+
+def _poll_interval() -> float:
+    return float(getattr(settings, "LIVE_STREAM_POLL_INTERVAL", 10))
+
+
+def _max_clients() -> int:
+    return int(getattr(settings, "LIVE_STREAM_MAX_CLIENTS", DEFAULT_MAX_CLIENTS))
+
+
+def _load_live_rows(tournament):
+    from .views import _inline_fetch_enabled, fetch_current_leaderboard
+
+    if _inline_fetch_enabled():
+        return fetch_current_leaderboard(tournament)
+    return leaderboard_cache.peek_rows(tournament, "live") or []
+
+
+class Channel:
+    """Live board state + delta backlog for one tournament."""
+
+    def __init__(self, tournament, loader=_load_live_rows, clock=time.monotonic):
+        self.tournament = tournament
+        self.loader = loader
+        self.clock = clock
+        self.epoch = secrets.token_hex(4)
+        self.seq = 0
+        self.rows = {}  # PLAYER -> (POS, SCORE, TODAY, THRU), in ESPN order
+        self.deltas = deque(maxlen=BACKLOG)
+        self.listeners = 0
+        self.cond = threading.Condition()
+        self._pickers = None
+        self._pickers_loaded_at = 0.0
+
+    def pickers(self):
+        """{names.key(golfer): [usernames]} for the tournament's picks."""
+        if self._pickers is None or self.clock() - self._pickers_loaded_at >= PICKS_MAX_AGE:
+            pickers = {}
+            picks = (
+                Pick.objects
+                .filter(tournament=self.tournament)
+                .exclude(active_player__isnull=True)
+                .exclude(active_player="")
+                .order_by("user__username")
+                .values_list("active_player", "user__username")
+            )
+            for name, username in picks:
+                pickers.setdefault(names.key(name), []).append(username)
+            self._pickers, self._pickers_loaded_at = pickers, self.clock()
+        return self._pickers
+
+    def _row(self, player, values, pickers):
+        row = {"PLAYER": player, **dict(zip(DELTA_FIELDS, values))}
+        row["picked_by"] = pickers.get(names.key(player), [])
+        return row
+
+    def poll(self):
+        """Load the board once and publish what changed; returns the delta or None."""
+        current = {}
+        for r in self.loader(self.tournament):
+            player = r.get("PLAYER")
+            if player:
+                current[player] = tuple(r.get(f, "") for f in DELTA_FIELDS)
+
+        # An empty board means the cache / ESPN had nothing; keep the last one.
+        if not current:
+            return None
+
+        changed = [p for p, values in current.items() if self.rows.get(p) != values]
+        removed = [p for p in self.rows if p not in current]
+        if not changed and not removed:
+            return None
+
+        pickers = self.pickers()
+        delta = {
+            "rows": [self._row(p, current[p], pickers) for p in changed],
+            "removed": removed,
+        }
+        with self.cond:
+            self.rows = current
+            self.seq += 1
+            delta["seq"] = self.seq
+            self.deltas.append(delta)
+            self.cond.notify_all()
+        return delta
+
+    def snapshot(self):
+        pickers = self.pickers()
+        with self.cond:
+            rows = [self._row(p, values, pickers) for p, values in self.rows.items()]
+            return {"seq": self.seq, "rows": rows, "removed": []}
+
+    def since(self, seq):
+        """Deltas after seq, or None when the backlog no longer reaches back to it."""
+        with self.cond:
+            if seq == self.seq:
+                return []
+            pending = [d for d in self.deltas if d["seq"] > seq]
+            if not pending or pending[0]["seq"] != seq + 1:
+                return None
+            return pending
+
+    def wait(self, seq, timeout):
+        """Block until a delta after seq is published (or timeout)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != seq, timeout=timeout)
+
+
+class LiveHub:
+    """Process-wide registry of Channels, one polling thread each."""
+
+    def __init__(self, loader=_load_live_rows, background=True):
+        self.loader = loader
+        self.background = background
+        self._channels = {}
+        self._lock = threading.Lock()
+        self.streams = 0
+
+    def reserve(self) -> bool:
+        """Take one of the process's stream slots; False when all are in use."""
+        with self._lock:
+            if self.streams >= _max_clients():
+                return False
+            self.streams += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.streams -= 1
+
+    def subscribe(self, tournament) -> Channel:
+        with self._lock:
+            channel = self._channels.get(tournament.pk)
+            is_new = channel is None
+            if is_new:
+                channel = self._channels[tournament.pk] = Channel(tournament, self.loader)
+            channel.listeners += 1
+
+        if is_new:
+            # First listener: load the board now so its snapshot isn't empty.
+            try:
+                channel.poll()
+            except Exception:
+                logger.exception("live poll for %s failed", tournament)
+            if self.background:
+                threading.Thread(
+                    target=self._run, args=(channel,),
+                    name=f"live-{tournament.pk}", daemon=True,
+                ).start()
+        return channel
+
+    def unsubscribe(self, channel):
+        with self._lock:
+            channel.listeners -= 1
+            if not self.background and channel.listeners <= 0:
+                self._channels.pop(channel.tournament.pk, None)
+
+    def _run(self, channel):
+        try:
+            while True:
+                time.sleep(_poll_interval())
+                with self._lock:
+                    if channel.listeners <= 0:
+                        self._channels.pop(channel.tournament.pk, None)
+                        return
+                try:
+                    channel.poll()
+                except Exception:
+                    logger.exception("live poll for %s failed", channel.tournament)
+        finally:
+            connection.close()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub() -> LiveHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = LiveHub()
+    return _hub
+
+
+def _event(kind, channel, data):
+    return f"id: {channel.epoch}:{data['seq']}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+
+def _resume_seq(channel, last_event_id):
+    """seq to resume after, if last_event_id came from this channel."""
+    epoch, _, seq = (last_event_id or "").partition(":")
+    if epoch != channel.epoch or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+class _ReservedStream:
+    """SSE messages that give their stream slot back when the response is closed."""
+
+    def __init__(self, messages, release):
+        self._messages = messages
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return self._messages
+
+    def close(self):
+        # Called by the WSGI server even if the stream never started iterating.
+        try:
+            self._messages.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+def open_stream(tournament, last_event_id=None, hub=None, max_seconds=MAX_STREAM_SECONDS):
+    """stream() holding one of the LIVE_STREAM_MAX_CLIENTS slots until closed, or None if none is free."""
+    hub = hub or get_hub()
+    if not hub.reserve():
+        return None
+    return _ReservedStream(stream(tournament, last_event_id, hub, max_seconds), hub.release)
+
+
+def stream(tournament, last_event_id=None, hub=None, max_seconds=MAX_STREAM_SECONDS):
+    """Generator of SSE messages for StreamingHttpResponse."""
+    hub = hub or get_hub()
+    channel = hub.subscribe(tournament)
+    try:
+        seq = _resume_seq(channel, last_event_id)
+        pending = channel.since(seq) if seq is not None else None
+        deadline = time.monotonic() + max_seconds
+
+        while True:
+            if pending is None:
+                snap = channel.snapshot()
+                seq = snap["seq"]
+                yield _event("snapshot", channel, snap)
+            elif pending:
+                for delta in pending:
+                    seq = delta["seq"]
+                    yield _event("delta", channel, delta)
+            else:
+                yield ": keep-alive\n\n"
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            channel.wait(seq, min(HEARTBEAT, remaining))
+            pending = channel.since(seq)
+    finally:
+        hub.unsubscribe(channel)
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ingest import backfill_results
+from core.models import Season, Tournament
+from core.services import sync_tournament_statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetch final results from ESPN for a whole season (or given tournaments) "
+        "concurrently, then persist Results and resync Pick earnings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tournament_ids", nargs="*", type=int,
+                            help="Tournament ids (default: completed events of the season).")
+        parser.add_argument("--season", type=int, help="Season id (default: active season).")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent ESPN fetches.")
+        parser.add_argument("--rate", type=float, default=2.0,
+                            help="Max ESPN requests per second (0 = unlimited).")
+
+    def handle(self, *args, **opts):
+        if opts["tournament_ids"]:
+            tournaments = list(
+                Tournament.objects
+                .filter(pk__in=opts["tournament_ids"])
+                .select_related("season")
+            )
+            missing = set(opts["tournament_ids"]) - {t.pk for t in tournaments}
+            if missing:
+                raise CommandError(f"Unknown tournament ids: {sorted(missing)}")
+        else:
+            seasons = Season.objects.filter(pk=opts["season"]) if opts["season"] else \
+                Season.objects.filter(is_active=True).order_by("-year")[:1]
+            season = seasons.first()
+            if season is None:
+                raise CommandError("No season found.")
+            sync_tournament_statuses()
+            tournaments = list(Tournament.objects.filter(season=season).completed().select_related("season"))
+
+        tournaments = [t for t in tournaments if t.pga_tournament_id]
+        if not tournaments:
+            self.stdout.write("Nothing to backfill.")
+            return
+
+        self.stdout.write(
+            f"Backfilling {len(tournaments)} tournaments "
+            f"({opts['workers']} workers, {opts['rate'] or 'unlimited'} req/s)"
+        )
+        self.stdout.write(
+            f"{'tournament':<40} {'rows':>5} {'fetch s':>8} {'persist s':>9} "
+            f"{'new':>5} {'upd':>5} {'picks':>6}"
+        )
+
+        def progress(r):
+            if r["error"]:
+                self.stdout.write(self.style.WARNING(f"{str(r['tournament'])[:40]:<40} {r['error']}"))
+                return
+            self.stdout.write(
+                f"{str(r['tournament'])[:40]:<40} {r['rows']:>5} {r['fetch_s']:>8.2f} "
+                f"{r['persist_s']:>9.2f} {r['created']:>5} {r['updated']:>5} {r['picks_changed']:>6}"
+            )
+
+        started = time.perf_counter()
+        reports = backfill_results(tournaments, workers=opts["workers"], rate=opts["rate"], progress=progress)
+        failed = sum(1 for r in reports if r["error"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {len(reports) - failed} ok, {failed} failed in {time.perf_counter() - started:.1f}s"
+        ))
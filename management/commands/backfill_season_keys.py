@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.services import backfill_season_keys
+
+
+class Command(BaseCommand):
+    help = "Fill the denormalized Pick.season / Result.season from each row's tournament."
+
+    def handle(self, *args, **opts):
+        for model, n in backfill_season_keys().items():
+            self.stdout.write(f"{model}: {n} row(s) updated")
@@ -0,0 +1,158 @@
+import random
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import espn_client, espn_parse, views
+from core.fake_espn import FakeESPNServer
+from core.models import Pick, Result
+from core.services import rebuild_season_stats, season_standings, sync_tournament_earnings
+from core.synthetic import (
+    FIXTURE_KINDS, PAGE_TEMPLATE_SETTINGS, build_league, final_rows_for_field, load_espn_fixture,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark core views, services and ESPN scrapers against a synthetic "
+        "league in a throwaway test database (offline, synthetic ESPN fixtures)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument("--tournaments", type=int, default=40)
+        parser.add_argument("--field", type=int, default=150)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--parse-only", action="store_true",
+                            help="Only run the ESPN page parse benchmark (no database).")
+
+    def handle(self, *args, **opts):
+        if opts["parse_only"]:
+            self._run_parse(opts["repeat"])
+            return
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(TEMPLATES=PAGE_TEMPLATE_SETTINGS, ESPN_INLINE_FETCH=False):
+                self._run(opts)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    # ─────────────────────────────────────────────
+
+    def _measure(self, label, fn, repeat, setup=None):
+        timings = []
+        queries = 0
+        for _ in range(repeat):
+            if setup:
+                setup()
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                fn()
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = len(ctx.captured_queries)
+
+        self.stdout.write(
+            f"{label:<40} {statistics.median(timings):>10.1f} {min(timings):>10.1f} {queries:>8}"
+        )
+        return timings, queries
+
+    def _run(self, opts):
+        repeat = opts["repeat"]
+
+        started = time.perf_counter()
+        league = build_league(
+            users=opts["users"], tournaments=opts["tournaments"],
+            field_size=opts["field"], seed=opts["seed"],
+        )
+        self.stdout.write(
+            f"league: {len(league.users)} users x {len(league.tournaments)} tournaments x "
+            f"{opts['field']} field, {Pick.objects.count()} picks, {Result.objects.count()} results "
+            f"(built in {time.perf_counter() - started:.1f}s)\n"
+        )
+        self.stdout.write(f"{'benchmark':<40} {'median ms':>10} {'min ms':>10} {'queries':>8}")
+
+        rf = RequestFactory()
+        user = league.users[0]
+        completed = league.completed[-1]
+
+        def view(name, *args):
+            def call():
+                request = rf.get("/")
+                request.user = user
+                response = getattr(views, name)(request, *args)
+                assert response.status_code == 200, (name, response.status_code)
+            return call
+
+        self._measure("view dashboard", view("dashboard"), repeat)
+        self._measure("view standings", view("standings"), repeat)
+        self._measure("view my_picks", view("my_picks"), repeat)
+        self._measure("view tournament_results (final)", view("tournament_results", completed.pk), repeat)
+
+        rows = final_rows_for_field(league.fields[completed.pk], 9_000_000, random.Random(1))
+
+        def clear_results():
+            Result.objects.filter(tournament=completed).delete()
+
+        self._measure("upsert results (cold)", lambda: views._upsert_results_from_rows(completed, rows),
+                      repeat, setup=clear_results)
+        self._measure("upsert results (unchanged)", lambda: views._upsert_results_from_rows(completed, rows),
+                      repeat)
+        self._measure("sync_tournament_earnings (no-op)", lambda: sync_tournament_earnings(completed), repeat)
+        self._measure("season_standings", lambda: season_standings(league.season), repeat)
+        self._measure("rebuild_season_stats", lambda: rebuild_season_stats(league.season), repeat)
+
+        with FakeESPNServer() as espn, override_settings(ESPN_BASE_URL=espn.url):
+            tid = completed.pga_tournament_id
+            espn.set_field_page(tid, load_espn_fixture("field"))
+            espn.set_page(tid, load_espn_fixture("final"))
+            forget = espn_client.get_client().forget
+            self._measure("scrape field page", lambda: views._scrape_espn_leaderboard(completed),
+                          repeat, setup=forget)
+            self._measure("scrape final page", lambda: views._scrape_espn_results(completed),
+                          repeat, setup=forget)
+            espn.set_page(tid, load_espn_fixture("live"))
+            self._measure("scrape live page", lambda: views._scrape_current_leaderboard(completed),
+                          repeat, setup=forget)
+            self._measure("scrape live page (304 revalidation)",
+                          lambda: views._scrape_current_leaderboard(completed), repeat)
+
+        self.stdout.write("")
+        self._run_parse(repeat)
+
+    def _run_parse(self, repeat):
+        """Per-page CPU cost of parsing the synthetic ESPN fixtures, per strategy."""
+        def full_soup(html):
+            table = BeautifulSoup(html, "html.parser").select_one("table.Full__Table")
+            return [tr.find_all("td") for tr in table.select("tbody tr")]
+
+        def sliced(parser):
+            def parse(html):
+                with override_settings(ESPN_PARSER=parser):
+                    return espn_parse.table_rows(html)
+            return parse
+
+        strategies = [("full page bs4 (legacy)", full_soup), ("table slice html.parser", sliced("html.parser"))]
+        if espn_parse.lxml_html is not None:
+            strategies.append(("table slice lxml", sliced("lxml")))
+
+        self.stdout.write(f"{'parse':<40} {'median ms':>10} {'pages/s':>10} {'rows':>8}")
+        for kind in FIXTURE_KINDS:
+            html = load_espn_fixture(kind)
+            for label, parse in strategies:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = parse(html)
+                    timings.append(time.perf_counter() - started)
+                median = statistics.median(timings)
+                self.stdout.write(
+                    f"{kind + ': ' + label:<40} {median * 1000:>10.1f} {1 / median:>10.1f} {len(rows):>8}"
+                )
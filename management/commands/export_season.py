@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exports import DATASETS, FORMATS, stream
+from core.models import Season
+
+
+class Command(BaseCommand):
+    help = "Stream season picks, results or standings as CSV / JSON lines (active season by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument("--season", type=int, action="append",
+                            help="Season id (repeatable; default: active season).")
+        parser.add_argument("--all", action="store_true", help="Export every season.")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("-o", "--output", help="File to write (default: stdout).")
+
+    def handle(self, *args, **opts):
+        if opts["all"]:
+            seasons = Season.objects.order_by("year", "pk")
+        elif opts["season"]:
+            seasons = list(Season.objects.filter(pk__in=opts["season"]).order_by("year", "pk"))
+            missing = set(opts["season"]) - {s.pk for s in seasons}
+            if missing:
+                raise CommandError(f"Unknown season ids: {sorted(missing)}")
+        else:
+            seasons = Season.objects.filter(is_active=True).order_by("-year")[:1]
+
+        lines = stream(opts["dataset"], seasons, opts["format"])
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8", newline="") as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
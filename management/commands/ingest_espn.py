@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.ingest import IngestScheduler
+
+
+class Command(BaseCommand):
+    help = "Long-running ESPN ingestion worker (live leaderboards, fields, final results)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--live-interval", type=int, default=60,
+                            help="Seconds between live leaderboard polls.")
+        parser.add_argument("--field-interval", type=int, default=6 * 60 * 60,
+                            help="Seconds between field refreshes for upcoming events.")
+        parser.add_argument("--field-horizon-days", type=int, default=10,
+                            help="Only fetch fields for events starting within this many days.")
+        parser.add_argument("--final-grace-days", type=int, default=1,
+                            help="Refetch final results for this many days after an event ends.")
+        parser.add_argument("--final-earnings-days", type=int, default=14,
+                            help="Keep refetching while a golfer who made the cut has no "
+                                 "earnings, for up to this many days after an event ends.")
+        parser.add_argument("--tick", type=int, default=5,
+                            help="Seconds to sleep between scheduler passes.")
+        parser.add_argument("--once", action="store_true",
+                            help="Run a single pass and exit (cron / tests).")
+
+    def handle(self, *args, **opts):
+        scheduler = IngestScheduler(
+            live_interval=opts["live_interval"],
+            field_interval=opts["field_interval"],
+            field_horizon_days=opts["field_horizon_days"],
+            final_grace_days=opts["final_grace_days"],
+            final_earnings_days=opts["final_earnings_days"],
+        )
+
+        if opts["once"]:
+            done = scheduler.run_once()
+            self.stdout.write(
+                f"live={done['live']} field={done['field']} final={done['final']}"
+            )
+            return
+
+        self.stdout.write("ESPN ingest worker running (Ctrl+C to stop)")
+        try:
+            scheduler.run_forever(tick=opts["tick"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.services import lock_due_picks
+from core.views import refresh_field_before_lock
+
+
+class Command(BaseCommand):
+    help = "Lock picks of tournaments past their pick lock time (ingest_espn does this every pass)."
+
+    def handle(self, *args, **opts):
+        locked = lock_due_picks(before_lock=refresh_field_before_lock)
+        if not locked:
+            self.stdout.write("No picks due to lock.")
+        for t, summary in locked:
+            self.stdout.write(
+                f"{t}: {summary['locked']} locked, "
+                f"{summary['substituted']} backup substitutions, {summary['void']} void"
+            )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Player, PlayerAlias
+from core.names import normalize_name
+from core.services import duplicate_players, merge_duplicate_players
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill Player / PlayerAlias normalized_name, then merge Players whose "
+        "names normalize alike (the oldest is kept, the rest become aliases)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Don't merge: list duplicate Players and exit non-zero if there are any.",
+        )
+
+    def handle(self, *args, **opts):
+        for model, source in ((Player, "full_name"), (PlayerAlias, "name")):
+            stale = []
+            for obj in model.objects.only("id", source, "normalized_name").iterator():
+                normalized = normalize_name(getattr(obj, source))
+                if obj.normalized_name != normalized:
+                    obj.normalized_name = normalized
+                    stale.append(obj)
+            model.objects.bulk_update(stale, ["normalized_name"], batch_size=500)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {len(stale)} updated")
+
+        groups = duplicate_players()
+        if opts["check"]:
+            for rows in groups.values():
+                self.stdout.write(" / ".join(name for _, name in rows))
+            if groups:
+                raise CommandError(f"{len(groups)} groups of duplicate players")
+            return
+
+        for kept, others in merge_duplicate_players(groups).items():
+            self.stdout.write(f"{kept}: merged {', '.join(others)}")
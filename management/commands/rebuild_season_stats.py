@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Season
+from core.services import rebuild_season_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute UserSeasonStats from Pick earnings (active season by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--season", type=int, help="Season id (default: active seasons).")
+        parser.add_argument("--all", action="store_true", help="Rebuild every season.")
+
+    def handle(self, *args, **opts):
+        if opts["all"]:
+            seasons = Season.objects.all()
+        elif opts["season"]:
+            seasons = Season.objects.filter(pk=opts["season"])
+            if not seasons:
+                raise CommandError(f"No season with id {opts['season']}")
+        else:
+            seasons = Season.objects.filter(is_active=True)
+
+        for season in seasons:
+            n = rebuild_season_stats(season)
+            self.stdout.write(f"{season}: {n} user rows")
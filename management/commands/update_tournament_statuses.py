@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.services import sync_tournament_statuses
+
+
+class Command(BaseCommand):
+    help = "Move Tournament.status along from the dates (ingest_espn does this every pass)."
+
+    def handle(self, *args, **opts):
+        changed = sync_tournament_statuses()
+        if not changed:
+            self.stdout.write("All tournament statuses are current.")
+        for status, n in sorted(changed.items()):
+            self.stdout.write(f"{n} tournament(s) -> {status}")
@@ -0,0 +1,167 @@
+# core/middleware.py
+"""
+Per-view instrumentation for the core app.
+
+Enable with CORE_VIEW_METRICS = True and add
+"core.middleware.ViewMetricsMiddleware" to MIDDLEWARE. For every request that
+resolves to a core URL it records SQL query count, SQL time, outbound HTTP
+time (ESPN fetches, reported via record_http) and total latency, tagged with
+the URL name. Results go to the "core.metrics" logger and into in-process
+histograms served by the view_metrics endpoint.
+
+Requests over their query budget are logged as warnings:
+    CORE_QUERY_BUDGETS = {"dashboard": 5, "standings": 5}
+    CORE_DEFAULT_QUERY_BUDGET = 50
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger("core.metrics")
+
+# Latency histogram bucket upper bounds, in milliseconds.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+_current = contextvars.ContextVar("core_request_metrics", default=None)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "sql_seconds", "http_calls", "http_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.http_calls = 0
+        self.http_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # django.db execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - started
+
+
+def record_http(seconds: float):
+    """Attribute an outbound HTTP call to the current request, if measured."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.http_calls += 1
+        metrics.http_seconds += seconds
+
+
+def query_budget(url_name: str):
+    budgets = getattr(settings, "CORE_QUERY_BUDGETS", {}) or {}
+    return budgets.get(url_name, getattr(settings, "CORE_DEFAULT_QUERY_BUDGET", None))
+
+
+def _record(url_name, metrics, total_seconds):
+    total_ms = total_seconds * 1000
+    with _stats_lock:
+        s = _stats.setdefault(url_name, {
+            "requests": 0,
+            "over_budget": 0,
+            "queries_total": 0,
+            "queries_max": 0,
+            "sql_ms_total": 0.0,
+            "http_ms_total": 0.0,
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+            "latency_buckets": [0] * len(LATENCY_BUCKETS_MS),
+        })
+        s["requests"] += 1
+        s["queries_total"] += metrics.queries
+        s["queries_max"] = max(s["queries_max"], metrics.queries)
+        s["sql_ms_total"] += metrics.sql_seconds * 1000
+        s["http_ms_total"] += metrics.http_seconds * 1000
+        s["latency_ms_total"] += total_ms
+        s["latency_ms_max"] = max(s["latency_ms_max"], total_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if total_ms <= bound:
+                s["latency_buckets"][i] += 1
+                break
+
+        budget = query_budget(url_name)
+        over = budget is not None and metrics.queries > budget
+        if over:
+            s["over_budget"] += 1
+
+    return over, budget
+
+
+def snapshot():
+    """Copy of the in-process histograms, keyed by URL name."""
+    with _stats_lock:
+        data = {}
+        for name, s in _stats.items():
+            n = s["requests"] or 1
+            data[name] = {
+                **s,
+                "latency_buckets": dict(zip(
+                    [str(b) if b != float("inf") else "inf" for b in LATENCY_BUCKETS_MS],
+                    s["latency_buckets"],
+                )),
+                "queries_avg": s["queries_total"] / n,
+                "latency_ms_avg": s["latency_ms_total"] / n,
+                "query_budget": query_budget(name),
+            }
+        return data
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+class ViewMetricsMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "CORE_VIEW_METRICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        if match is None or match.namespace != "core":
+            return response
+
+        url_name = match.url_name
+        over, budget = _record(url_name, metrics, total)
+
+        line = (
+            "view=%s status=%s queries=%d sql_ms=%.1f http_calls=%d http_ms=%.1f total_ms=%.1f"
+        )
+        args = (
+            url_name, response.status_code, metrics.queries, metrics.sql_seconds * 1000,
+            metrics.http_calls, metrics.http_seconds * 1000, total * 1000,
+        )
+        if over:
+            logger.warning(line + " OVER QUERY BUDGET (%d)", *args, budget)
+        else:
+            logger.info(line, *args)
+
+        return response
@@ -1,12 +1,35 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import datetime, time
+from .names import normalize_name
 
 
 User = get_user_model()
 
 
+class PrefixSearchIndex(models.Index):
+    """
+    Index for the admin's case-insensitive prefix search ("^" in
+    search_fields, i.e. istartswith) on one CharField.
+
+    PostgreSQL compiles that to UPPER(x) LIKE 'X%', which only an UPPER(x)
+    varchar_pattern_ops index can serve under a normal collation. MySQL's
+    case-insensitive collations serve it from a plain index on the column,
+    which is also what other backends get.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor == "postgresql":
+            from django.contrib.postgres.indexes import OpClass
+
+            index = models.Index(OpClass(Upper(self.fields[0]), name="varchar_pattern_ops"), name=self.name)
+        else:
+            index = models.Index(fields=self.fields, name=self.name)
+        return index.create_sql(model, schema_editor, using=using, **kwargs)
+
+
 class Season(models.Model):
     name = models.CharField(max_length=100)  # e.g. "2026 Season"
     year = models.IntegerField()
@@ -21,6 +44,37 @@ class Season(models.Model):
         return f"{self.name} ({self.year})"
 
 
+class TournamentQuerySet(models.QuerySet):
+    """
+    Status lists read the stored, indexed `status` column; services.sync_tournament_statuses
+    (run by the ingest worker) keeps it equal to computed_status.
+    """
+
+    def with_computed_status(self, now=None):
+        """Annotate computed_status: status_auto evaluated in SQL ("cancelled" sticks)."""
+        now = now or timezone.now()
+        return self.annotate(computed_status=models.Case(
+            models.When(status="cancelled", then=models.Value("cancelled")),
+            models.When(pick_lock_datetime__gt=now, then=models.Value("upcoming")),
+            models.When(end_date__gte=timezone.localdate(now), then=models.Value("in_progress")),
+            default=models.Value("completed"),
+            output_field=models.CharField(),
+        ))
+
+    def stale_status(self, now=None):
+        """Tournaments whose stored status no longer matches computed_status."""
+        return self.with_computed_status(now).exclude(status=models.F("computed_status"))
+
+    def upcoming(self):
+        return self.filter(status="upcoming")
+
+    def in_progress(self):
+        return self.filter(status="in_progress")
+
+    def completed(self):
+        return self.filter(status="completed")
+
+
 class Tournament(models.Model):
     STATUS_CHOICES = [
         ("upcoming", "Upcoming"),
@@ -47,10 +101,14 @@ class Tournament(models.Model):
     )
     is_major = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="upcoming")
+
+    objects = TournamentQuerySet.as_manager()
+
     @property
     def status_auto(self):
         """
-        Compute status from dates:
+        Compute status from dates (TournamentQuerySet.with_computed_status is
+        the same rule in SQL):
         - upcoming: today < start_date
         - in_progress: start_date <= today <= end_date
         - completed: today > end_date
@@ -87,6 +145,10 @@ class Tournament(models.Model):
 
     class Meta:
         ordering = ["start_date", "name"]
+        indexes = [
+            models.Index(fields=["season", "status", "start_date"], name="core_tourn_season_status_idx"),
+            models.Index(fields=["status", "start_date"], name="core_tournament_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.season.year})"
@@ -100,15 +162,46 @@ class Player(models.Model):
     first_name = models.CharField(max_length=100, blank=True, null=True)
     last_name = models.CharField(max_length=100, blank=True, null=True)
     full_name = models.CharField(max_length=200, unique=True)
+    normalized_name = models.CharField(
+        max_length=200, blank=True, db_index=True, editable=False,
+        help_text="full_name accent-folded / suffix-stripped, for name matching."
+    )
     country = models.CharField(max_length=100, blank=True, null=True)
     active = models.BooleanField(default=True)
 
     class Meta:
         ordering = ["full_name"]
+        indexes = [
+            # admin prefix search on Result / TournamentField
+            PrefixSearchIndex(fields=["full_name"], name="core_player_prefix_idx"),
+        ]
 
     def __str__(self):
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.full_name)
+        super().save(*args, **kwargs)
+
+
+class PlayerAlias(models.Model):
+    """Another spelling of a Player's name (as seen on ESPN or in picks)."""
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="aliases")
+    name = models.CharField(max_length=200, unique=True)
+    normalized_name = models.CharField(max_length=200, db_index=True, editable=False)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "player aliases"
+
+    def __str__(self):
+        return f"{self.name} → {self.player}"
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        super().save(*args, **kwargs)
+
 
 class TournamentField(models.Model):
     STATUS_CHOICES = [
@@ -121,6 +214,10 @@ class TournamentField(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="tournament_entries")
     tee_time = models.DateTimeField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="in_field")
+    missed_scrapes = models.PositiveSmallIntegerField(
+        default=0, editable=False,
+        help_text="Consecutive ESPN field scrapes this golfer was missing from.",
+    )
 
     class Meta:
         unique_together = ("tournament", "player")
@@ -132,6 +229,11 @@ class TournamentField(models.Model):
 
 class Result(models.Model):
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="results")
+    # Denormalized tournament.season (set on save; bulk paths set it themselves).
+    season = models.ForeignKey(
+        Season, on_delete=models.CASCADE, related_name="results",
+        null=True, blank=True, editable=False,
+    )
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="results")
     position = models.CharField(
         max_length=10,
@@ -140,14 +242,22 @@ class Result(models.Model):
     earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     made_cut = models.BooleanField(default=False)
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("tournament", "player")
         ordering = ["tournament", "position"]
+        indexes = [
+            models.Index(fields=["tournament", "-earnings"], name="core_result_t_earnings_idx"),
+        ]
 
     def __str__(self):
         return f"{self.player} – {self.tournament} – {self.position} (${self.earnings})"
 
+    def save(self, *args, **kwargs):
+        self.season_id = self.tournament.season_id
+        super().save(*args, **kwargs)
+
 
 class Pick(models.Model):
     STATUS_CHOICES = [
@@ -164,6 +274,11 @@ class Pick(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="picks")
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="picks")
+    # Denormalized tournament.season (set on save; bulk paths set it themselves).
+    season = models.ForeignKey(
+        Season, on_delete=models.CASCADE, related_name="picks",
+        null=True, blank=True, editable=False,
+    )
 
     # ────────────────────────────────────────────────
     # CHANGED: Player names are now plain text fields
@@ -202,10 +317,23 @@ class Pick(models.Model):
     class Meta:
         unique_together = ("user", "tournament")  # one pick per user per tournament
         ordering = ["tournament__start_date", "user__username"]
+        indexes = [
+            # a user's season (my_picks, used golfers); (season, user) is its prefix
+            models.Index(fields=["season", "user", "active_player"], name="core_pick_season_user_idx"),
+            # per-tournament ranking (weekly winner, standings)
+            models.Index(fields=["tournament", "-earnings"], name="core_pick_t_earnings_idx"),
+            # admin prefix search
+            PrefixSearchIndex(fields=["primary_player"], name="core_pick_primary_prefix_idx"),
+            PrefixSearchIndex(fields=["active_player"], name="core_pick_active_prefix_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user} – {self.tournament} – {self.active_player or self.primary_player}"
 
+    def save(self, *args, **kwargs):
+        self.season_id = self.tournament.season_id
+        super().save(*args, **kwargs)
+
 
 class UserSeasonStats(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="season_stats")
@@ -216,10 +344,47 @@ class UserSeasonStats(models.Model):
     weeks_played = models.IntegerField(default=0)
     weekly_wins = models.IntegerField(default=0)
     top5_finishes = models.IntegerField(default=0)
+    top10_finishes = models.IntegerField(default=0)
+    cashes = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ("user", "season")
         ordering = ["-total_earnings"]
+        indexes = [
+            # standings order: points, wins, top5, top10
+            models.Index(
+                fields=["season", "-total_earnings", "-weekly_wins", "-top5_finishes", "-top10_finishes"],
+                name="core_stats_standings_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} – {self.season} – ${self.total_earnings}"
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    One poll of a tournament's live leaderboard (see core/snapshots.py).
+
+    rows holds the whole board, delta only what changed since the previous
+    snapshot; both are zlib-compressed JSON.
+    """
+
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="snapshots")
+    seq = models.PositiveIntegerField(help_text="1, 2, 3... per tournament.")
+    taken_at = models.DateTimeField(default=timezone.now)
+    digest = models.CharField(max_length=40, help_text="sha1 of the packed rows.")
+    rows = models.BinaryField()
+    delta = models.BinaryField()
+    row_count = models.PositiveIntegerField(default=0)
+    changed_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("tournament", "seq")
+        ordering = ["tournament", "-seq"]
+        indexes = [
+            models.Index(fields=["taken_at"], name="core_snapshot_taken_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tournament} #{self.seq} ({self.changed_count}/{self.row_count} changed)"
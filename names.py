@@ -0,0 +1,217 @@
+# core/names.py
+"""
+Golfer name matching.
+
+Picks store golfer names as plain text and ESPN spells the same golfer in
+more than one way ("Ludvig Åberg" / "Ludvig Aberg", "Davis Love III" /
+"Davis Love", "J.J. Spaun" / "JJ Spaun"). normalize_name() folds those into
+one key, which is stored on Player.normalized_name and PlayerAlias.
+
+The PlayerIndex maps normalized names (of Players and of their aliases) to
+Player ids. It is loaded in one query and kept in process memory; saving or
+deleting a Player / PlayerAlias resets it (see signals.py), and it reloads
+itself every MAX_AGE seconds to pick up writes from other processes.
+"""
+import re
+import threading
+import time
+import unicodedata
+
+from django.db import transaction
+from django.db.models import BooleanField, Value
+
+
+# Seconds before the in-process index is reloaded from the database.
+MAX_AGE = 5 * 60
+
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+
+# Dropped outright so "Sung-jae" == "Sungjae" and "O'Hair" == "OHair".
+_JOINERS = re.compile(r"[-'’`]")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, accent-folded, suffix-free form of a golfer's name."""
+    if not name:
+        return ""
+
+    folded = unicodedata.normalize("NFKD", name)
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    folded = folded.replace("ø", "o").replace("Ø", "o").replace("ß", "ss")
+    folded = _JOINERS.sub("", folded.lower())
+    tokens = _NON_WORD.sub(" ", folded).split()
+
+    while len(tokens) > 1 and tokens[-1] in SUFFIXES:
+        tokens.pop()
+
+    # "j j spaun" -> "jj spaun": runs of initials become one token.
+    merged, initials = [], ""
+    for token in tokens:
+        if len(token) == 1:
+            initials += token
+            continue
+        if initials:
+            merged.append(initials)
+            initials = ""
+        merged.append(token)
+    if initials:
+        merged.append(initials)
+    return " ".join(merged)
+
+
+class PlayerIndex:
+    """normalized name -> Player id, for Players and PlayerAliases."""
+
+    def __init__(self, max_age=MAX_AGE, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self._ids = None
+        self._canonical = None  # Player id -> Player.normalized_name
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._ids = self._canonical = None
+
+    def _load(self):
+        from .models import Player, PlayerAlias
+
+        rows = (
+            Player.objects.exclude(normalized_name="").order_by()
+            .values_list("normalized_name", "id", Value(False, output_field=BooleanField()))
+            .union(
+                PlayerAlias.objects.order_by().values_list(
+                    "normalized_name", "player_id", Value(True, output_field=BooleanField()),
+                ),
+                all=True,
+            )
+        )
+        ids, canonical, owners = {}, {}, {}
+        for normalized, player_id, is_alias in rows:
+            if is_alias:
+                ids.setdefault(normalized, player_id)
+                continue
+            canonical[player_id] = normalized
+            # A Player's own name wins over someone else's alias; between two
+            # Players with one name (until normalize_player_names merges them)
+            # the oldest wins, as it does there.
+            if player_id < owners.get(normalized, player_id + 1):
+                owners[normalized] = ids[normalized] = player_id
+        return ids, canonical
+
+    def reload(self):
+        ids, canonical = self._load()
+        with self._lock:
+            self._ids, self._canonical = ids, canonical
+            self._loaded_at = self.clock()
+        return ids, canonical
+
+    def _index(self):
+        with self._lock:
+            if self._ids is not None and self.clock() - self._loaded_at < self.max_age:
+                return self._ids, self._canonical
+        return self.reload()
+
+    def resolve(self, name: str):
+        """Player id for name, or None."""
+        return self._index()[0].get(normalize_name(name))
+
+    def resolve_many(self, names) -> dict:
+        """{name: player id} for the names that resolve."""
+        ids = self._index()[0]
+        resolved = {}
+        for name in names:
+            player_id = ids.get(normalize_name(name))
+            if player_id is not None:
+                resolved[name] = player_id
+        return resolved
+
+    def resolve_many_fresh(self, names) -> dict:
+        """
+        resolve_many, then the names it missed looked up in the database
+        (one Player and one PlayerAlias query): the index can be up to
+        max_age old, e.g. missing a Player another process just created.
+        Any hit resets the index so it reloads on the next lookup.
+        """
+        resolved = self.resolve_many(names)
+        missed = {}
+        for name in set(names) - set(resolved):
+            normalized = normalize_name(name)
+            if normalized:
+                missed.setdefault(normalized, []).append(name)
+        if not missed:
+            return resolved
+
+        from .models import Player, PlayerAlias
+
+        found = dict(
+            PlayerAlias.objects.filter(normalized_name__in=missed).order_by("-pk")
+            .values_list("normalized_name", "player_id")
+        )
+        # A Player's own name wins over an alias; the oldest Player over a newer one.
+        found.update(
+            Player.objects.filter(normalized_name__in=missed).order_by("-pk")
+            .values_list("normalized_name", "id")
+        )
+        for normalized, player_id in found.items():
+            for name in missed[normalized]:
+                resolved[name] = player_id
+        if found:
+            self.reset()
+        return resolved
+
+    def key(self, name: str) -> str:
+        """
+        Comparison key for a golfer name: the matched Player's normalized
+        name (so aliases compare equal), else the name's own normalized form.
+        """
+        normalized = normalize_name(name)
+        ids, canonical = self._index()
+        player_id = ids.get(normalized)
+        return canonical.get(player_id, normalized) if player_id is not None else normalized
+
+    def add(self, player_id, canonical_name, *aliases):
+        """
+        Remember a Player (and aliases) once the current transaction commits,
+        so a rolled-back ingest can't leave ids behind that don't exist.
+        """
+        def register():
+            with self._lock:
+                if self._ids is None:
+                    return
+                normalized = normalize_name(canonical_name)
+                self._canonical[player_id] = normalized
+                self._ids[normalized] = player_id
+                for alias in aliases:
+                    self._ids.setdefault(normalize_name(alias), player_id)
+
+        transaction.on_commit(register)
+
+
+index = PlayerIndex()
+
+
+def resolve(name: str):
+    return index.resolve(name)
+
+
+def resolve_many(names) -> dict:
+    return index.resolve_many(names)
+
+
+def resolve_many_fresh(names) -> dict:
+    return index.resolve_many_fresh(names)
+
+
+def key(name: str) -> str:
+    return index.key(name)
+
+
+def reset():
+    index.reset()
+
+
+def reload():
+    index.reload()
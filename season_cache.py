@@ -0,0 +1,83 @@
+# core/season_cache.py
+"""
+Season-wide aggregates cached until the season's data actually changes.
+
+Each season has a generation number in Django's cache. Pick / Result /
+Tournament saves and deletes bump it (signals.py), as do the bulk scoring
+paths that bypass signals (sync_tournament_earnings, the Result upsert,
+rebuild_season_stats). Aggregates are cached under keys that include the
+generation, so a bump makes every old entry unreachable at once; the timeout
+only exists to let the backend reclaim them.
+
+Bumps only reach other processes through a shared cache (see checks.py,
+core.E001). On a per-process backend entries expire after LOCAL_TIMEOUT
+instead, which bounds how long a bump made elsewhere (ingest worker,
+management commands) goes unseen.
+
+    rows = season_cache.get_or_set(season.pk, "standings", lambda: ...)
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .checks import local_cache
+
+
+DEFAULT_TIMEOUT = 7 * 24 * 60 * 60
+LOCAL_TIMEOUT = 60
+
+
+def _gen_key(season_id) -> str:
+    return f"season-gen:{season_id}"
+
+
+def _fresh_generation() -> int:
+    # Time-based, so a generation lost to eviction is never reused.
+    return int(time.time() * 1000)
+
+
+def generation(season_id) -> int:
+    key = _gen_key(season_id)
+    gen = cache.get(key)
+    if gen is None:
+        cache.add(key, _fresh_generation(), timeout=None)
+        gen = cache.get(key)
+    return gen
+
+
+def _incr(season_id):
+    key = _gen_key(season_id)
+    try:
+        cache.incr(key)
+    except ValueError:  # not set / evicted
+        cache.set(key, _fresh_generation(), timeout=None)
+
+
+def bump(season_id):
+    """
+    Invalidate everything cached for the season. Bumps now and again when
+    the surrounding transaction commits, so a read that raced the write
+    can't keep stale data under the new generation.
+    """
+    if not season_id:
+        return
+    _incr(season_id)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _incr(season_id))
+
+
+def _timeout() -> int:
+    default = LOCAL_TIMEOUT if local_cache() else DEFAULT_TIMEOUT
+    return getattr(settings, "SEASON_CACHE_TIMEOUT", default)
+
+
+def get_or_set(season_id, name: str, compute):
+    """compute() cached for the season's current generation."""
+    key = f"season:{season_id}:{generation(season_id)}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=_timeout())
+    return value
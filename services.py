@@ -1,52 +1,651 @@
 # core/services.py
 from decimal import Decimal
 
-from .models import Tournament, Pick, Result
+from django.db import connection, transaction
+from django.db.models import Case, Exists, F, FilteredRelation, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
+from . import field_choices, names, season_cache, used_players
+from .names import normalize_name
+from .models import (
+    Season, Tournament, TournamentField, Pick, Player, PlayerAlias, Result, UserSeasonStats,
+)
 
-def _norm(name: str) -> str:
-    return " ".join(name.strip().lower().split())
 
+def sync_tournament_earnings(tournament: Tournament, known_players=None):
+    """
+    Recompute Pick.earnings for a tournament from its Results.
 
-from decimal import Decimal
+    All new values are computed in memory and only the picks whose earnings
+    actually changed are written, with a single bulk_update. The picks are
+    re-read under select_for_update before writing, so concurrent syncs of
+    one tournament (ingest worker, admin job, backfill) serialise; the
+    affected users' UserSeasonStats rows are then recomputed from Pick.
+
+    known_players ({name: Player id}) resolves names the shared name index
+    can't see yet, e.g. Players created earlier in the caller's transaction
+    (names.index only learns them on commit).
 
-def sync_tournament_earnings(tournament: Tournament):
+    Returns {"picks": <picks checked>, "changed": <picks written>}.
+    """
+    summary = {"picks": 0, "changed": 0}
 
     if not tournament.pga_tournament_id:
         print(f"Skipping sync for '{tournament.name}' (no PGA ID)")
-        return
+        return summary
 
     multiplier = Decimal(tournament.multiplier or 1)
 
-    results = (
+    earnings_by_player = dict(
         Result.objects
         .filter(tournament=tournament)
-        .select_related("player")
+        .values_list("player_id", "earnings")
+    )
+
+    picks_qs = (
+        Pick.objects
+        .filter(tournament=tournament)
+        .select_related("user")
+        .only(
+            "id", "active_player", "primary_player", "earnings", "updated_at",
+            "user__id", "user__username",
+        )
+    )
+
+    known = {normalize_name(name): pk for name, pk in (known_players or {}).items()}
+
+    def changed_picks(picks):
+        wanted = {p.active_player or p.primary_player for p in picks} - {None, ""}
+        player_ids = names.resolve_many(wanted)
+        for name in wanted - set(player_ids):
+            if normalize_name(name) in known:
+                player_ids[name] = known[normalize_name(name)]
+        # Never score a pick 0 just because this process's index is stale.
+        missed = wanted - set(player_ids)
+        if missed:
+            player_ids.update(names.resolve_many_fresh(missed))
+        now = timezone.now()
+        changed = []
+        for p in picks:
+            player_id = player_ids.get(p.active_player or p.primary_player)
+            result_earnings = earnings_by_player.get(player_id) if player_id else None
+
+            if result_earnings is None:
+                new_earnings = Decimal("0")
+            else:
+                new_earnings = result_earnings * multiplier
+            new_earnings = new_earnings.quantize(Decimal("0.01"))
+
+            if p.earnings is not None and Decimal(p.earnings) == new_earnings:
+                continue
+
+            p.earnings = new_earnings
+            p.updated_at = now  # bulk_update skips auto_now
+            changed.append(p)
+        return changed
+
+    # Unlocked first pass: the common no-op sync costs no transaction.
+    picks = list(picks_qs)
+    summary["picks"] = len(picks)
+    if not changed_picks(picks):
+        return summary
+
+    with transaction.atomic():
+        # Lock only the Pick rows, where the backend can say so (no FOR UPDATE
+        # OF on MariaDB / older MySQL).
+        of = ("self",) if connection.features.has_select_for_update_of else ()
+        picks = list(picks_qs.select_for_update(of=of))
+        before = [(p.user_id, p.user.username, p.earnings or Decimal("0")) for p in picks]
+        changed = changed_picks(picks)
+        if changed:
+            Pick.objects.bulk_update(changed, ["earnings", "updated_at"], batch_size=500)
+
+            after = [(p.user_id, p.user.username, p.earnings) for p in picks]
+            refresh_tournament_stats(tournament, before, after)
+            season_cache.bump(tournament.season_id)  # bulk_update sends no signals
+
+    summary["picks"] = len(picks)
+    summary["changed"] = len(changed)
+    return summary
+
+
+# ─────────────────────────────────────────────
+# UserSeasonStats
+# ─────────────────────────────────────────────
+
+STAT_FIELDS = (
+    "total_earnings", "majors_earnings", "weeks_played",
+    "weekly_wins", "top5_finishes", "top10_finishes", "cashes",
+)
+
+# Users per recompute query (keeps the IN list under backend parameter limits).
+STATS_BATCH = 500
+
+
+def tournament_contributions(tournament: Tournament, pick_earnings):
+    """
+    What one tournament adds to each user's UserSeasonStats.
+
+    pick_earnings: iterable of (user_id, username, earnings).
+    Same rules as the standings page: a tournament only counts once at least
+    one pick earned money; ranks order by earnings desc, then username.
+    """
+    pick_earnings = list(pick_earnings)
+    if not any((e or 0) > 0 for _, _, e in pick_earnings):
+        return {}
+
+    ranked = sorted(pick_earnings, key=lambda p: (-(p[2] or 0), p[1]))
+
+    contributions = {}
+    for idx, (user_id, _, earnings) in enumerate(ranked):
+        rank = idx + 1
+        earnings = Decimal(earnings or 0)
+        contributions[user_id] = {
+            "total_earnings": earnings,
+            "majors_earnings": earnings if tournament.is_major else Decimal("0"),
+            "weeks_played": 1,
+            "weekly_wins": int(rank == 1),
+            "top5_finishes": int(rank <= 5),
+            "top10_finishes": int(rank <= 10),
+            "cashes": int(earnings > 0),
+        }
+    return contributions
+
+
+def refresh_tournament_stats(tournament: Tournament, before, after):
+    """
+    Bring UserSeasonStats up to date after the tournament's pick earnings
+    went from `before` to `after` (both (user_id, username, earnings) lists).
+
+    The users whose contribution changed (their own earnings, or a rank
+    shifted by someone else's) get their season rows recomputed from Pick,
+    so rows never drift from what the picks say. Returns the users refreshed.
+    """
+    old = tournament_contributions(tournament, before)
+    new = tournament_contributions(tournament, after)
+    user_ids = [u for u in set(old) | set(new) if old.get(u) != new.get(u)]
+    recompute_user_season_stats(tournament.season_id, user_ids)
+    return len(user_ids)
+
+
+def recompute_user_season_stats(season_id, user_ids):
+    """
+    Recompute the UserSeasonStats rows of the given users from their picks
+    (season_standings restricted to them; ranks still come from the whole
+    league). Rows are locked, updated in place and created where missing.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+
+    with transaction.atomic():
+        rows = {
+            s.user_id: s
+            for s in UserSeasonStats.objects
+            .select_for_update()
+            .filter(season_id=season_id, user_id__in=user_ids)
+        }
+        fresh = {}
+        for i in range(0, len(user_ids), STATS_BATCH):
+            for r in _standings_rows(season_id, user_ids[i:i + STATS_BATCH]):
+                fresh[r["user"].pk] = _stats_values(r)
+
+        to_create, to_update = [], []
+        for user_id in user_ids:
+            values = fresh.get(user_id) or dict.fromkeys(STAT_FIELDS, 0)
+            row = rows.get(user_id)
+            if row is None:
+                if user_id in fresh:
+                    to_create.append(UserSeasonStats(season_id=season_id, user_id=user_id, **values))
+                continue
+            if any(getattr(row, f) != v for f, v in values.items()):
+                for f, v in values.items():
+                    setattr(row, f, v)
+                to_update.append(row)
+
+        if to_create:
+            UserSeasonStats.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            UserSeasonStats.objects.bulk_update(to_update, list(STAT_FIELDS), batch_size=500)
+
+    return len(to_create) + len(to_update)
+
+
+# One row per user for a season, ranked per tournament in the database.
+# A tournament only counts once some pick earned money (best > 0), and ties
+# break on username, exactly like tournament_contributions().
+_SEASON_STANDINGS_SQL = """
+SELECT u.id, u.username,
+       SUM(r.earnings) AS points,
+       SUM(CASE WHEN r.is_major THEN r.earnings ELSE 0 END) AS majors,
+       SUM(CASE WHEN r.rnk = 1 THEN 1 ELSE 0 END) AS wins,
+       SUM(CASE WHEN r.rnk <= 5 THEN 1 ELSE 0 END) AS top5,
+       SUM(CASE WHEN r.rnk <= 10 THEN 1 ELSE 0 END) AS top10,
+       SUM(CASE WHEN r.earnings > 0 THEN 1 ELSE 0 END) AS cashes,
+       COUNT(*) AS events
+FROM (
+    SELECT p.user_id,
+           COALESCE(p.earnings, 0) AS earnings,
+           t.is_major,
+           RANK() OVER (
+               PARTITION BY p.tournament_id
+               ORDER BY COALESCE(p.earnings, 0) DESC, pu.username
+           ) AS rnk,
+           MAX(COALESCE(p.earnings, 0)) OVER (PARTITION BY p.tournament_id) AS best
+    FROM {pick} p
+    JOIN {tournament} t ON t.id = p.tournament_id
+    JOIN {user} pu ON pu.id = p.user_id
+    WHERE p.season_id = %s
+) r
+JOIN {user} u ON u.id = r.user_id
+WHERE r.best > 0{users}
+GROUP BY u.id, u.username
+ORDER BY points DESC, wins DESC, top5 DESC, top10 DESC, u.username
+"""
+
+
+def season_standings(season: Season):
+    """
+    Season standings computed in one query with RANK() OVER (PARTITION BY
+    tournament) and conditional aggregation.
+
+    Returns a list of dicts: user, points, majors, wins, top5, top10, cashes,
+    events (scored events the user had a pick in), best first.
+    """
+    return _standings_rows(season.pk)
+
+
+def season_leaderboard(season: Season):
+    """
+    Every user with a pick in the season, best first, with their
+    UserSeasonStats totals left-joined: users with nothing scored yet have
+    no stats row and show at 0. One query; the dashboard and the API
+    leaderboard share it.
+
+    Returns dicts: user_id, user__username, total_earnings, majors_earnings,
+    weeks_played, weekly_wins.
+    """
+    User = Pick._meta.get_field("user").related_model
+    return [
+        {
+            "user_id": u["pk"],
+            "user__username": u["username"],
+            "total_earnings": u["total"],
+            "majors_earnings": u["majors"],
+            "weeks_played": u["played"],
+            "weekly_wins": u["wins"],
+        }
+        for u in User.objects
+        .filter(Exists(Pick.objects.filter(season=season, user=OuterRef("pk"))))
+        .annotate(stats=FilteredRelation("season_stats", condition=Q(season_stats__season=season)))
+        .annotate(
+            total=Coalesce("stats__total_earnings", Value(Decimal("0"))),
+            majors=Coalesce("stats__majors_earnings", Value(Decimal("0"))),
+            played=Coalesce("stats__weeks_played", 0),
+            wins=Coalesce("stats__weekly_wins", 0),
+        )
+        .values("pk", "username", "total", "majors", "played", "wins")
+        .order_by("-total", "username")
+    ]
+
+
+def stored_standings(season: Season):
+    """
+    season_standings rows read from UserSeasonStats instead of recomputed
+    from Pick: one indexed query, same keys and order. Users with no scored
+    event are left out, as there.
+    """
+    return [
+        {
+            "user": s.user,
+            "points": s.total_earnings,
+            "majors": s.majors_earnings,
+            "wins": s.weekly_wins,
+            "top5": s.top5_finishes,
+            "top10": s.top10_finishes,
+            "cashes": s.cashes,
+            "events": s.weeks_played,
+        }
+        for s in UserSeasonStats.objects
+        .filter(season=season, weeks_played__gt=0)
+        .select_related("user")
+        .order_by("-total_earnings", "-weekly_wins", "-top5_finishes", "-top10_finishes", "user__username")
+    ]
+
+
+def _standings_rows(season_id, user_ids=None):
+    """season_standings rows, optionally only for user_ids."""
+    User = Pick._meta.get_field("user").related_model
+    qn = connection.ops.quote_name
+    params = [season_id]
+    users = ""
+    if user_ids is not None:
+        users = f" AND r.user_id IN ({', '.join(['%s'] * len(user_ids))})"
+        params.extend(user_ids)
+    sql = _SEASON_STANDINGS_SQL.format(
+        pick=qn(Pick._meta.db_table),
+        tournament=qn(Tournament._meta.db_table),
+        user=qn(User._meta.db_table),
+        users=users,
     )
 
-    name_to_result = {}
-    for r in results:
-        full_name = (r.player.full_name or "").strip()
-        if not full_name:
-            continue
-        name_to_result[_norm(full_name)] = r
+    rows = []
+    for u in User.objects.raw(sql, params):
+        rows.append({
+            "user": u,
+            "points": Decimal(u.points or 0).quantize(Decimal("0.01")),
+            "majors": Decimal(u.majors or 0).quantize(Decimal("0.01")),
+            "wins": int(u.wins),
+            "top5": int(u.top5),
+            "top10": int(u.top10),
+            "cashes": int(u.cashes),
+            "events": int(u.events),
+        })
+    return rows
+
 
-    picks = Pick.objects.filter(tournament=tournament)
+def _stats_values(r):
+    """UserSeasonStats field values for a season_standings row."""
+    return {
+        "total_earnings": r["points"],
+        "majors_earnings": r["majors"],
+        "weeks_played": r["events"],
+        "weekly_wins": r["wins"],
+        "top5_finishes": r["top5"],
+        "top10_finishes": r["top10"],
+        "cashes": r["cashes"],
+    }
 
-    for p in picks:
-        raw_name = p.active_player or p.primary_player
-        if not raw_name:
-            p.earnings = Decimal("0")
-            p.save(update_fields=["earnings"])
-            continue
 
-        key = _norm(raw_name)
-        r = name_to_result.get(key)
+def rebuild_season_stats(season: Season):
+    """
+    Recompute every UserSeasonStats row of a season from scratch.
+    Use after bulk imports or manual data fixes; day to day the rows are kept
+    current by sync_tournament_earnings.
+    """
+    rows = season_standings(season)
 
-        if r is None:
-            p.earnings = Decimal("0")
-        else:
-            p.earnings = (r.earnings or Decimal("0")) * multiplier
+    with transaction.atomic():
+        UserSeasonStats.objects.filter(season=season).delete()
+        UserSeasonStats.objects.bulk_create(
+            [
+                UserSeasonStats(season=season, user=r["user"], **_stats_values(r))
+                for r in rows
+            ],
+            batch_size=500,
+        )
+        season_cache.bump(season.pk)
 
-        p.save(update_fields=["earnings"])
+    return len(rows)
 
+
+# ─────────────────────────────────────────────
+# Tournament status
+# ─────────────────────────────────────────────
+
+def sync_tournament_statuses(now=None):
+    """
+    Move Tournament.status along (upcoming -> in_progress -> completed) to
+    match TournamentQuerySet.with_computed_status. Cancelled stays cancelled.
+
+    Run by the ingest worker every pass (and by update_tournament_statuses);
+    one indexed query when nothing is due. Returns {new status: count}.
+    """
+    stale = list(
+        Tournament.objects
+        .stale_status(now)
+        .values_list("pk", "season_id", "computed_status")
+    )
+    if not stale:
+        return {}
+
+    by_status = {}
+    for pk, _, status in stale:
+        by_status.setdefault(status, []).append(pk)
+
+    with transaction.atomic():
+        for status, pks in by_status.items():
+            Tournament.objects.filter(pk__in=pks).update(status=status)
+        # update() sends no signals
+        for season_id in {season_id for _, season_id, _ in stale}:
+            season_cache.bump(season_id)
+
+    return {status: len(pks) for status, pks in by_status.items()}
+
+
+# ─────────────────────────────────────────────
+# Denormalized season keys
+# ─────────────────────────────────────────────
+
+def backfill_season_keys():
+    """
+    Set Pick.season / Result.season from their tournament wherever they are
+    missing or out of step. One UPDATE per model; returns {model name: rows}.
+    """
+    season_of_tournament = Subquery(
+        Tournament.objects.filter(pk=OuterRef("tournament_id")).values("season_id")[:1]
+    )
+    counts = {}
+    with transaction.atomic():
+        for model in (Pick, Result):
+            stale = model.objects.filter(Q(season__isnull=True) | ~Q(season_id=season_of_tournament))
+            counts[model.__name__] = stale.update(season_id=season_of_tournament)
+    return counts
+
+
+# ─────────────────────────────────────────────
+# Duplicate players
+# ─────────────────────────────────────────────
+
+def duplicate_players():
+    """
+    {normalized name: [(Player id, full_name), ...]} for every normalized
+    name more than one Player has ("Sung-jae Im" / "Sungjae Im"), oldest
+    Player first.
+    """
+    groups = {}
+    for pk, full_name, normalized in (
+        Player.objects.exclude(normalized_name="").order_by("id")
+        .values_list("id", "full_name", "normalized_name")
+    ):
+        groups.setdefault(normalized, []).append((pk, full_name))
+    return {normalized: rows for normalized, rows in groups.items() if len(rows) > 1}
+
+
+def merge_duplicate_players(groups=None):
+    """
+    Fold each group of duplicate_players() into its oldest Player.
+
+    Results and TournamentField rows of the other Players move to the kept
+    one; where both have a row for a tournament, the most recently updated
+    Result and the kept Player's field entry win. Their aliases move too,
+    each other Player's full_name becomes a PlayerAlias, and those Players
+    are deleted. Picks store names as text and resolve through the name
+    index, so they follow the kept Player by themselves; the earnings of
+    every tournament whose Results moved are re-synced afterwards.
+
+    Returns {kept full_name: [merged full_names]}.
+    """
+    groups = duplicate_players() if groups is None else groups
+    merged, rescored, seasons, fields = {}, set(), set(), set()
+
+    with transaction.atomic():
+        for normalized, rows in groups.items():
+            (keep, keep_name), others = rows[0], rows[1:]
+            other_ids = [pk for pk, _ in others]
+            group_ids = [keep] + other_ids
+
+            # One Result per tournament: the newest, then the kept Player's.
+            winners, losers = {}, []
+            for pk, tournament_id, season_id, player_id, updated_at in (
+                Result.objects.filter(player_id__in=group_ids)
+                .order_by("-updated_at", "player_id")
+                .values_list("pk", "tournament_id", "season_id", "player_id", "updated_at")
+            ):
+                seasons.add(season_id)
+                if player_id != keep:
+                    rescored.add(tournament_id)
+                if tournament_id in winners:
+                    losers.append(pk)
+                else:
+                    winners[tournament_id] = pk
+            Result.objects.filter(pk__in=losers).delete()
+            Result.objects.filter(pk__in=winners.values()).exclude(player_id=keep).update(player_id=keep)
+
+            kept_entries = set(
+                TournamentField.objects.filter(player_id=keep).values_list("tournament_id", flat=True)
+            )
+            entries = {}
+            for pk, tournament_id in (
+                TournamentField.objects.filter(player_id__in=other_ids)
+                .order_by("player_id").values_list("pk", "tournament_id")
+            ):
+                fields.add(tournament_id)
+                if tournament_id not in kept_entries:
+                    entries.setdefault(tournament_id, pk)
+            TournamentField.objects.filter(player_id__in=other_ids).exclude(
+                pk__in=entries.values(),
+            ).delete()
+            TournamentField.objects.filter(pk__in=entries.values()).update(player_id=keep)
+
+            PlayerAlias.objects.filter(player_id__in=other_ids).update(player_id=keep)
+            taken = set(
+                PlayerAlias.objects.filter(name__in=[name for _, name in others])
+                .values_list("name", flat=True)
+            )
+            PlayerAlias.objects.bulk_create([
+                PlayerAlias(player_id=keep, name=name, normalized_name=normalized)
+                for _, name in others if name not in taken
+            ])
+            Player.objects.filter(pk__in=other_ids).delete()
+            merged[keep_name] = [name for _, name in others]
+
+        # update() / bulk_create() send no signals
+        for tournament_id in fields:
+            field_choices.invalidate(tournament_id)
+        for season_id in seasons - {None}:
+            season_cache.bump(season_id)
+
+    names.reset()
+    for tournament in Tournament.objects.filter(pk__in=rescored):
+        sync_tournament_earnings(tournament)
+    return merged
+
+
+# ─────────────────────────────────────────────
+# Pick lock
+# ─────────────────────────────────────────────
+
+OUT_OF_FIELD = ("wd", "dq")
+
+
+def lock_tournament_picks(tournament: Tournament, now=None):
+    """
+    Lock every pending pick of a tournament in one transaction.
+
+    A pick whose primary is WD/DQ in TournamentField switches to its backup
+    (reason "primary_wd_pre_start"); with no backup still in the field it is
+    voided. Every other pick locks on its primary, except manual overrides,
+    which keep their active_player. Picks that are already locked / void are
+    left alone, so running it twice is harmless.
+
+    A few queries whatever the league size: WD/DQ field rows, pending picks,
+    at most three UPDATEs. Returns {"locked", "substituted", "void"} counts.
+    """
+    now = now or timezone.now()
+    summary = {"locked": 0, "substituted": 0, "void": 0}
+
+    with transaction.atomic():
+        pending = Pick.objects.filter(tournament=tournament, status="pending")
+        picks = list(
+            pending
+            .select_for_update()
+            .values_list("pk", "user_id", "primary_player", "backup_player", "active_player", "reason")
+        )
+        if not picks:
+            return summary
+
+        out = set(
+            TournamentField.objects
+            .filter(tournament=tournament, status__in=OUT_OF_FIELD)
+            .values_list("player_id", flat=True)
+        )
+        player_ids = names.resolve_many_fresh(
+            {name for _, _, primary, backup, _, _ in picks for name in (primary, backup)} - {None, ""}
+        ) if out else {}
+
+        def withdrawn(name):
+            return player_ids.get(name) in out if name else True
+
+        substituted, void, moved_users = [], [], set()
+        for pk, user_id, primary, backup, active, reason in picks:
+            if reason == "manual_override" or not withdrawn(primary):
+                new_active = active if reason == "manual_override" else primary
+            elif not withdrawn(backup):
+                substituted.append(pk)
+                new_active = backup
+            else:
+                void.append(pk)
+                new_active = primary
+            if new_active != active:
+                moved_users.add(user_id)
+
+        if substituted:
+            Pick.objects.filter(pk__in=substituted).update(
+                status="locked", reason="primary_wd_pre_start",
+                active_player=F("backup_player"), updated_at=now,
+            )
+        if void:
+            Pick.objects.filter(pk__in=void).update(
+                status="void", active_player=F("primary_player"), updated_at=now,
+            )
+        locked = pending.update(
+            status="locked",
+            active_player=Case(
+                When(reason="manual_override", then=F("active_player")),
+                default=F("primary_player"),
+            ),
+            updated_at=now,
+        )
+
+        # update() sends no signals
+        used_players.invalidate_many(moved_users, tournament.season_id)
+        season_cache.bump(tournament.season_id)
+
+    # A late lock (results already in) changes what the picks earned.
+    if moved_users and tournament.status == "completed":
+        sync_tournament_earnings(tournament)
+
+    summary.update(
+        locked=locked + len(substituted), substituted=len(substituted), void=len(void),
+    )
+    return summary
+
+
+def lock_due_picks(now=None, before_lock=None):
+    """
+    Lock the picks of every tournament whose pick_lock_datetime has passed
+    and that still has pending picks. Run by the ingest worker every pass
+    (and by lock_picks); one query when nothing is due.
+
+    before_lock(tournament), if given, runs right before each tournament is
+    locked; the worker passes views.refresh_field_before_lock so a late
+    WD/DQ is in TournamentField when the backups are decided.
+
+    Returns [(tournament, lock_tournament_picks summary)].
+    """
+    now = now or timezone.now()
+    due = (
+        Tournament.objects
+        .filter(pick_lock_datetime__lte=now)
+        .exclude(status="cancelled")
+        .filter(Exists(Pick.objects.filter(tournament=OuterRef("pk"), status="pending")))
+        .order_by("pick_lock_datetime")
+    )
+    locked = []
+    for t in due:
+        if before_lock is not None:
+            before_lock(t)
+        locked.append((t, lock_tournament_picks(t, now=now)))
+    return locked
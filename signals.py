@@ -0,0 +1,165 @@
+# core/signals.py
+"""
+Model signal handlers; connected in CoreConfig.ready().
+"""
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import field_choices, names, season_cache, services, used_players
+from .models import Pick, Player, PlayerAlias, Result, Tournament, TournamentField
+
+
+def _season_id(instance):
+    """Season of a Pick / Result without re-reading its tournament if loaded."""
+    tournament = instance._state.fields_cache.get("tournament")
+    if tournament is not None:
+        return tournament.season_id
+    return (
+        Tournament.objects
+        .filter(pk=instance.tournament_id)
+        .values_list("season_id", flat=True)
+        .first()
+    )
+
+
+# (season_id, tournament_id) -> {user_id: earnings before this transaction}
+# for picks saved or deleted in it; see _recompute_stats_on_commit.
+_moved = threading.local()
+
+
+def _recompute_stats_on_commit(season_id, pick, earnings_before):
+    """
+    Once the write has committed, recompute UserSeasonStats for the pick's
+    user and whoever else's rank in its tournament moved with it
+    (services.refresh_tournament_stats); earnings_before is None for a new
+    pick.
+
+    Picks are collected per tournament and the first callback to run after
+    the commit handles them all, so deleting many picks at once (a cascade
+    from a Tournament or User, the admin's bulk delete) recomputes each
+    tournament once. Entries left by a rolled-back transaction only widen
+    the next recompute; the stats are always rebuilt from Pick.
+    """
+    pending = getattr(_moved, "tournaments", None)
+    if pending is None:
+        pending = _moved.tournaments = {}
+    pending.setdefault((season_id, pick.tournament_id), {}).setdefault(pick.user_id, earnings_before)
+
+    transaction.on_commit(lambda: _recompute_moved(season_id, pick.tournament_id))
+
+
+def _recompute_moved(season_id, tournament_id):
+    moved = getattr(_moved, "tournaments", {}).pop((season_id, tournament_id), None)
+    if not moved:  # already handled by an earlier callback
+        return
+
+    tournament = Tournament.objects.filter(pk=tournament_id).first()
+    if tournament is None:  # deleted along with its picks
+        services.recompute_user_season_stats(season_id, list(moved))
+        return
+
+    # The tournament's other picks are unchanged, so their stored earnings
+    # serve as both the before and the after.
+    after = list(
+        Pick.objects.filter(tournament=tournament).values_list("user_id", "user__username", "earnings")
+    )
+    before = [row for row in after if row[0] not in moved]
+    usernames = {user_id: name for user_id, name, _ in after}
+    gone = [u for u, earnings in moved.items() if earnings is not None and u not in usernames]
+    if gone:  # deleted picks; their users may be gone too
+        usernames.update(
+            Pick._meta.get_field("user").related_model.objects
+            .filter(pk__in=gone).values_list("pk", "username")
+        )
+    before.extend(
+        (user_id, usernames.get(user_id, ""), earnings)
+        for user_id, earnings in moved.items() if earnings is not None
+    )
+    services.refresh_tournament_stats(tournament, before, after)
+
+
+@receiver(pre_save, sender=Pick)
+def remember_pick_scoring(sender, instance, update_fields=None, **kwargs):
+    """Stash the stored (earnings, status) so post_save can tell if scoring changed."""
+    instance._scoring_before = None
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {"earnings", "status"} & set(update_fields):
+        instance._scoring_before = (instance.earnings, instance.status)
+        return
+    instance._scoring_before = (
+        Pick.objects.filter(pk=instance.pk).values_list("earnings", "status").first()
+    )
+
+
+@receiver(post_save, sender=Pick)
+@receiver(post_delete, sender=Pick)
+def pick_changed(sender, instance, **kwargs):
+    season_id = _season_id(instance)
+    used_players.invalidate(instance.user_id, season_id)
+    season_cache.bump(season_id)
+    if not season_id:
+        return
+
+    if "created" not in kwargs:  # post_delete
+        _recompute_stats_on_commit(season_id, instance, instance.earnings or 0)
+        return
+
+    # post_save: an admin edit of earnings / status must reach UserSeasonStats
+    # (the dashboard) as it reaches the standings computed from Pick.
+    before = getattr(instance, "_scoring_before", None)
+    if before is None:
+        changed = bool(instance.earnings)
+    else:
+        changed = before != (instance.earnings, instance.status)
+    if changed:
+        _recompute_stats_on_commit(season_id, instance, before[0] if before else None)
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def result_changed(sender, instance, **kwargs):
+    season_cache.bump(_season_id(instance))
+
+    # An admin edit of a Result rescores the picks on that golfer on commit;
+    # the sync only writes those picks and refreshes the users they moved.
+    # The bulk ingest paths send no signals and sync themselves.
+    def rescore():
+        tournament = Tournament.objects.filter(pk=instance.tournament_id).first()
+        if tournament is not None and tournament.pga_tournament_id:
+            services.sync_tournament_earnings(tournament)
+
+    transaction.on_commit(rescore)
+
+
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+def tournament_changed(sender, instance, **kwargs):
+    season_cache.bump(instance.season_id)
+
+    if kwargs.get("created") is False:  # post_save of an existing tournament
+        # Keep the denormalized Pick/Result.season in step with a moved tournament.
+        for model in (Pick, Result):
+            (
+                model.objects
+                .filter(tournament=instance)
+                .exclude(season_id=instance.season_id)
+                .update(season_id=instance.season_id)
+            )
+
+
+@receiver(post_save, sender=TournamentField)
+@receiver(post_delete, sender=TournamentField)
+def field_changed(sender, instance, **kwargs):
+    field_choices.invalidate(instance.tournament_id)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=PlayerAlias)
+@receiver(post_delete, sender=PlayerAlias)
+def player_names_changed(sender, **kwargs):
+    names.reset()
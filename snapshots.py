@@ -0,0 +1,176 @@
+# core/snapshots.py
+"""
+Stored history of live leaderboards.
+
+Every live poll that changes the board is saved as a LeaderboardSnapshot:
+the full board plus its delta against the previous snapshot, both stored as
+JSON arrays in FIELDS order and zlib-compressed, which keeps a 150-player
+board to a few KB. Identical polls are not stored.
+
+Each delta row carries "moved" (places gained since the previous snapshot,
+from the numeric part of POS) and "new" (player wasn't on the last board).
+
+changes_since(tournament, seq) answers "what changed since snapshot N" from
+two rows, whatever the number of polls in between. prune() drops snapshots
+older than LEADERBOARD_SNAPSHOT_RETENTION_DAYS (default 14), always keeping
+each tournament's latest one.
+"""
+import hashlib
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import LeaderboardSnapshot, Tournament
+
+
+FIELDS = ("PLAYER", "POS", "SCORE", "TODAY", "THRU", "R1", "R2", "R3", "R4", "TOT")
+
+DEFAULT_RETENTION_DAYS = 14
+PRUNE_BATCH = 1000
+
+
+def pack(rows) -> bytes:
+    table = [[str(r.get(f, "") or "") for f in FIELDS] for r in rows if r.get("PLAYER")]
+    return zlib.compress(json.dumps(table, separators=(",", ":")).encode("utf-8"))
+
+
+def unpack(blob) -> list:
+    if not blob:
+        return []
+    return [dict(zip(FIELDS, values)) for values in json.loads(zlib.decompress(bytes(blob)))]
+
+
+def _pack_delta(delta) -> bytes:
+    return zlib.compress(json.dumps(delta, separators=(",", ":")).encode("utf-8"))
+
+
+def unpack_delta(blob) -> dict:
+    return json.loads(zlib.decompress(bytes(blob))) if blob else {"changed": [], "removed": []}
+
+
+def _place(pos):
+    digits = "".join(c for c in (pos or "") if c.isdigit())
+    return int(digits) if digits else None
+
+
+def diff(old_rows, new_rows) -> dict:
+    """
+    {"changed": [row + moved/new], "removed": [player]} between two boards.
+    A row counts as changed when any FIELDS value differs.
+    """
+    old = {r["PLAYER"]: r for r in old_rows}
+    changed = []
+    for row in new_rows:
+        before = old.get(row["PLAYER"])
+        if before is not None and all(before.get(f, "") == row.get(f, "") for f in FIELDS):
+            continue
+        entry = {f: row.get(f, "") for f in FIELDS}
+        entry["new"] = before is None
+        was, now = (_place(before["POS"]) if before else None), _place(row.get("POS"))
+        entry["moved"] = was - now if was is not None and now is not None else None
+        changed.append(entry)
+
+    current = {r["PLAYER"] for r in new_rows}
+    removed = [p for p in old if p not in current]
+    return {"changed": changed, "removed": removed}
+
+
+def _latest_seq(tournament):
+    return (
+        LeaderboardSnapshot.objects
+        .filter(tournament=tournament)
+        .order_by("-seq")
+        .values("seq")[:1]
+    )
+
+
+def latest(tournament):
+    return LeaderboardSnapshot.objects.filter(tournament=tournament).order_by("-seq").first()
+
+
+def record(tournament, rows):
+    """
+    Store rows as the tournament's next snapshot. Returns it, or None when
+    the board is empty or identical to the latest snapshot.
+    """
+    rows = [{f: str(r.get(f, "") or "") for f in FIELDS} for r in rows if r.get("PLAYER")]
+    if not rows:
+        return None
+
+    packed = pack(rows)
+    digest = hashlib.sha1(packed).hexdigest()
+
+    with transaction.atomic():
+        # Serialise seq allocation per tournament.
+        Tournament.objects.select_for_update().filter(pk=tournament.pk).exists()
+
+        previous = latest(tournament)
+        if previous is not None and previous.digest == digest:
+            return None
+
+        delta = diff(unpack(previous.rows) if previous else [], rows)
+        return LeaderboardSnapshot.objects.create(
+            tournament=tournament,
+            seq=previous.seq + 1 if previous else 1,
+            digest=digest,
+            rows=packed,
+            delta=_pack_delta(delta),
+            row_count=len(rows),
+            changed_count=len(delta["changed"]) + len(delta["removed"]),
+        )
+
+
+def changes_since(tournament, seq=None):
+    """
+    What changed on the board after snapshot seq:
+
+        {"seq": latest seq, "full": bool, "changed": [...], "removed": [...]}
+
+    With no seq, or one that was pruned, "full" is True and "changed" is the
+    whole current board. {"seq": 0, ...} when nothing was recorded yet.
+    """
+    wanted = Q(seq=Subquery(_latest_seq(OuterRef("tournament"))))
+    if seq:
+        wanted |= Q(seq=seq)
+    snaps = LeaderboardSnapshot.objects.filter(tournament=tournament).filter(wanted)
+    by_seq = {s.seq: s for s in snaps}
+    if not by_seq:
+        return {"seq": 0, "full": True, "changed": [], "removed": []}
+
+    head = by_seq[max(by_seq)]
+    if seq and seq == head.seq:
+        return {"seq": head.seq, "full": False, "changed": [], "removed": []}
+
+    base = by_seq.get(seq) if seq else None
+    if base is None:
+        return {"seq": head.seq, "full": True, **diff([], unpack(head.rows))}
+
+    # Only the latest snapshot's delta is needed when the client is one behind.
+    if head.seq == seq + 1:
+        return {"seq": head.seq, "full": False, **unpack_delta(head.delta)}
+    return {"seq": head.seq, "full": False, **diff(unpack(base.rows), unpack(head.rows))}
+
+
+def _retention_days() -> int:
+    return int(getattr(settings, "LEADERBOARD_SNAPSHOT_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+
+
+def prune(now=None) -> int:
+    """Delete expired snapshots (never a tournament's latest). Returns rows deleted."""
+    cutoff = (now or timezone.now()) - timedelta(days=_retention_days())
+    expired = (
+        LeaderboardSnapshot.objects
+        .filter(taken_at__lt=cutoff)
+        .exclude(seq=Subquery(_latest_seq(OuterRef("tournament"))))
+    )
+    deleted = 0
+    while True:
+        batch = list(expired.values_list("pk", flat=True)[:PRUNE_BATCH])
+        if not batch:
+            return deleted
+        deleted += LeaderboardSnapshot.objects.filter(pk__in=batch).delete()[0]
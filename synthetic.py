@@ -0,0 +1,316 @@
+# core/synthetic.py
+"""
+Synthetic league generator for tests and benchmarks.
+
+    league = build_league(users=5000, tournaments=40, field_size=150)
+
+Builds one active Season with `tournaments` events (the first `completed`
+ones finished and scored, the rest upcoming), a shared player pool, each
+event's field in TournamentField, Results
+with a realistic purse split, and Picks that respect the one-golfer-per-season
+rule. Everything is written with bulk_create (Pick.earnings pre-computed the
+way sync_tournament_earnings would), then UserSeasonStats is rebuilt.
+
+Also renders ESPN-shaped HTML for a generated tournament (see fake_espn).
+"""
+import gzip
+import random
+from dataclasses import dataclass, field as dc_field
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .fake_espn import render_field_page, render_final_page, render_live_page
+from .models import Season, Tournament, TournamentField, Player, Result, Pick
+from .names import normalize_name, reload as reload_player_names
+from .services import rebuild_season_stats, sync_tournament_statuses
+
+
+FIRST_NAMES = [
+    "Scottie", "Rory", "Xander", "Jon", "Collin", "Viktor", "Ludvig", "Patrick",
+    "Tommy", "Hideki", "Wyndham", "Max", "Sahith", "Tony", "Sungjae", "Shane",
+    "Justin", "Jordan", "Cameron", "Russell", "Brian", "Tom", "Sam", "Keegan",
+    "Matt", "Adam", "Will", "Corey", "Sepp", "Nicolai", "Joaquín", "Séamus",
+]
+LAST_NAMES = [
+    "Scheffler", "McIlroy", "Schauffele", "Rahm", "Morikawa", "Hovland", "Åberg",
+    "Cantlay", "Fleetwood", "Matsuyama", "Clark", "Homa", "Theegala", "Finau",
+    "Im", "Lowry", "Thomas", "Spieth", "Young", "Henley", "Harman", "Kim",
+    "Burns", "Bradley", "Fitzpatrick", "Scott", "Zalatoris", "Conners",
+    "Straka", "Højgaard", "Niemann", "Power", "Love III", "Pérez",
+]
+
+# Share of the purse paid to each finishing position (top 65 make the cut).
+PAYOUT_SHARES = [0.18, 0.109, 0.069, 0.049, 0.041, 0.03625, 0.03375, 0.03125,
+                 0.02925, 0.02725, 0.02525, 0.02325, 0.02125, 0.01925, 0.01825,
+                 0.01725, 0.01625, 0.01525, 0.01425, 0.01325] + [0.0125 - i * 0.00018 for i in range(45)]
+
+
+@dataclass
+class League:
+    season: Season
+    users: list
+    tournaments: list
+    completed: list
+    upcoming: list
+    players: list = dc_field(default_factory=list)
+    fields: dict = dc_field(default_factory=dict)  # tournament pk -> [Player], winner first
+
+
+def _player_names(n, rng):
+    names = set()
+    while len(names) < n:
+        names.add(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        if len(names) >= len(FIRST_NAMES) * len(LAST_NAMES):
+            names.add(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {len(names)}")
+    return sorted(names)
+
+
+def _aware(d, hour=7):
+    return timezone.make_aware(datetime.combine(d, time(hour, 0)), timezone.get_current_timezone())
+
+
+def final_rows_for_field(field, purse, rng):
+    """fetch_espn_results-shaped rows for an ordered field (winner first)."""
+    rows = []
+    for idx, player in enumerate(field):
+        made_cut = idx < len(PAYOUT_SHARES)
+        earnings = Decimal(purse * PAYOUT_SHARES[idx]).quantize(Decimal("1")) if made_cut else Decimal("0")
+        rounds = [str(rng.randint(64, 74)) for _ in range(4 if made_cut else 2)] + [""] * (0 if made_cut else 2)
+        rows.append({
+            "Player": player.full_name,
+            "Pos": str(idx + 1) if made_cut else "CUT",
+            "R1": rounds[0], "R2": rounds[1], "R3": rounds[2], "R4": rounds[3],
+            "Total": str(-20 + idx // 3) if made_cut else "MC",
+            "Earnings": f"${earnings:,}" if made_cut else "--",
+        })
+    return rows
+
+
+@transaction.atomic
+def build_league(users=50, tournaments=8, field_size=60, completed=None,
+                 pick_rate=0.9, player_pool=None, seed=1, prefix="bench"):
+    """
+    Create a synthetic league and return a League handle.
+
+    completed defaults to three quarters of the tournaments. player_pool
+    defaults to enough golfers for every user to pick a new one each week.
+    """
+    rng = random.Random(seed)
+    User = get_user_model()
+    completed = tournaments * 3 // 4 if completed is None else completed
+    player_pool = player_pool or max(field_size * 2, tournaments * 4)
+
+    today = timezone.localdate()
+    first_start = today - timedelta(days=7 * completed + 3)
+    season = Season.objects.create(
+        name=f"{prefix} season", year=today.year,
+        start_date=first_start, end_date=first_start + timedelta(days=7 * tournaments),
+        is_active=True,
+    )
+
+    User.objects.bulk_create(
+        [User(username=f"{prefix}_user_{i:05d}", password="!") for i in range(users)],
+        batch_size=2000,
+    )
+    user_list = list(User.objects.filter(username__startswith=f"{prefix}_user_").order_by("username"))
+
+    Player.objects.bulk_create(
+        [
+            Player(
+                full_name=name, normalized_name=normalize_name(name),
+                first_name=name.split()[0], last_name=" ".join(name.split()[1:]),
+            )
+            for name in _player_names(player_pool, rng)
+        ],
+        batch_size=2000, ignore_conflicts=True,
+    )
+    reload_player_names()  # bulk_create sends no signals
+    players = list(Player.objects.order_by("full_name")[:player_pool])
+
+    tournament_objs = []
+    for k in range(tournaments):
+        start = first_start + timedelta(days=7 * k)
+        tournament_objs.append(Tournament(
+            season=season,
+            name=f"{prefix} open {k + 1}",
+            pga_tournament_id=f"{prefix}{seed}{k:03d}",
+            start_date=start,
+            end_date=start + timedelta(days=3),
+            pick_lock_datetime=_aware(start),
+            purse=Decimal("9000000"),
+            multiplier=Decimal("2.00") if k % 10 == 9 else Decimal("1.00"),
+            is_major=k % 10 == 9,
+            status="completed" if k < completed else "upcoming",
+        ))
+    Tournament.objects.bulk_create(tournament_objs)
+    sync_tournament_statuses()  # the event that started three days ago is in progress
+    tournament_list = list(Tournament.objects.filter(season=season).order_by("start_date"))
+
+    next_up = tournament_list[completed] if completed < len(tournament_list) else None
+    used = {u.pk: set() for u in user_list}
+    results = []
+    picks = []
+    fields = {}
+    entries = []
+    for t in tournament_list:
+        field = rng.sample(players, min(field_size, len(players)))
+        fields[t.pk] = field
+        entries.extend(TournamentField(tournament=t, player=player) for player in field)
+
+        earnings_by_name = {}
+        if t.status == "completed":
+            for row, player in zip(final_rows_for_field(field, 9_000_000, rng), field):
+                earnings = Decimal(row["Earnings"].replace("$", "").replace(",", "")) if row["Earnings"] != "--" else Decimal("0")
+                earnings_by_name[player.full_name] = earnings * t.multiplier
+                results.append(Result(
+                    tournament=t, season=season, player=player, position=row["Pos"],
+                    earnings=earnings, made_cut=row["Total"] != "MC",
+                ))
+
+        for u in user_list:
+            # Only the next upcoming event has picks in yet.
+            if t.status == "upcoming" and t is not next_up:
+                continue
+            if rng.random() > pick_rate:
+                continue
+            choices = [p for p in rng.sample(field, min(12, len(field))) if p.full_name not in used[u.pk]]
+            if len(choices) < 2:
+                continue
+            primary, backup = choices[0], choices[1]
+            used[u.pk].add(primary.full_name)
+            picks.append(Pick(
+                user=u, tournament=t, season=season,
+                primary_player=primary.full_name,
+                backup_player=backup.full_name,
+                active_player=primary.full_name,
+                status="locked" if t.status == "completed" else "pending",
+                # what sync_tournament_earnings would store
+                earnings=earnings_by_name.get(primary.full_name, Decimal("0")),
+            ))
+
+    TournamentField.objects.bulk_create(entries, batch_size=2000)
+    Result.objects.bulk_create(results, batch_size=2000)
+    Pick.objects.bulk_create(picks, batch_size=2000)
+
+    completed_list = [t for t in tournament_list if t.status == "completed"]
+    rebuild_season_stats(season)
+
+    league = League(
+        season=season,
+        users=user_list,
+        tournaments=tournament_list,
+        completed=completed_list,
+        upcoming=[t for t in tournament_list if t.status != "completed"],
+        players=players,
+        fields=fields,
+    )
+    return league
+
+
+def espn_pages_for(league, tournament, padding_kb=None, seed=1):
+    """{"field": html, "final": html, "live": html} for a generated tournament."""
+    return pages_for_field(league.fields[tournament.pk], padding_kb=padding_kb, seed=seed)
+
+
+def pages_for_field(field, padding_kb=None, seed=1):
+    """ESPN-shaped pages for an ordered field of objects with .full_name."""
+    rng = random.Random(seed)
+    kwargs = {} if padding_kb is None else {"padding_kb": padding_kb}
+
+    final_rows = final_rows_for_field(field, 9_000_000, rng)
+    live_rows = [
+        {
+            "POS": r["Pos"], "PLAYER": r["Player"], "SCORE": r["Total"],
+            "TODAY": str(rng.randint(-6, 3)), "THRU": str(rng.randint(1, 18)),
+            "R1": r["R1"], "R2": r["R2"], "R3": "", "R4": "", "TOT": "",
+        }
+        for r in final_rows
+    ]
+    field_rows = [
+        {"player": p.full_name, "tee_time": f"{7 + i % 6}:{(i * 11) % 60:02d} AM"}
+        for i, p in enumerate(field)
+    ]
+    return {
+        "field": render_field_page(field_rows, **kwargs),
+        "final": render_final_page(final_rows, **kwargs),
+        "live": render_live_page(live_rows, **kwargs),
+    }
+
+
+# ─────────────────────────────────────────────
+# ESPN page fixtures (fixtures/espn/*.html.gz)
+# ─────────────────────────────────────────────
+
+# These pages are SYNTHETIC: write_espn_fixtures renders them with fake_espn
+# from generated golfer names. They are not captures of espn.com. They follow
+# the table markup the scrapers expect, so they pin the parsers and their cost,
+# but they can't catch drift in ESPN's real pages. decoy_table.html next to
+# them is a small hand-written regression page for the table slicer.
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "espn"
+FIXTURE_KINDS = ("field", "final", "live")
+
+
+def fixture_pages(field_size=150, seed=7, padding_kb=None):
+    """Deterministic ESPN-shaped pages that don't need a database."""
+    rng = random.Random(seed)
+    field = [Player(full_name=n) for n in _player_names(field_size, rng)]
+    rng.shuffle(field)
+    return pages_for_field(field, padding_kb=padding_kb, seed=seed)
+
+
+def write_espn_fixtures(directory=FIXTURE_DIR, **kwargs):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for kind, body in fixture_pages(**kwargs).items():
+        with gzip.open(directory / f"{kind}.html.gz", "wt", encoding="utf-8") as fh:
+            fh.write(body)
+
+
+def load_espn_fixture(kind, directory=FIXTURE_DIR):
+    """HTML of a synthetic ESPN fixture page: "field", "final" or "live"."""
+    with gzip.open(Path(directory) / f"{kind}.html.gz", "rt", encoding="utf-8") as fh:
+        return fh.read()
+
+
+# ─────────────────────────────────────────────
+# Minimal page templates for tests / benchmarks
+# ─────────────────────────────────────────────
+
+# Stand-ins for the project's templates: they walk the same context lists the
+# real pages do, so lazy querysets are evaluated (and counted) as in production.
+PAGE_TEMPLATES = {
+    "core/dashboard.html": (
+        "{% for t in upcoming_tournaments %}{{ t.name }}{% endfor %}"
+        "{% for row in leaderboard %}{{ row.user__username }}{{ row.total_earnings }}{% endfor %}"
+        "{{ kpis }}"
+    ),
+    "core/standings.html": (
+        "{% for r in rows %}{{ r.user.username }}{{ r.points }}{{ r.wins }}{% endfor %}{{ kpis }}"
+    ),
+    "core/my_picks.html": (
+        "{% for p in picks %}{{ p.tournament.name }}{{ p.active_player }}{{ p.earnings }}{% endfor %}"
+        "{% for p in league_picks %}{{ p.user.username }}{{ p.tournament.name }}{{ p.earnings }}{% endfor %}"
+        "{{ kpis }}"
+    ),
+    "core/make_picks.html": "{{ form.as_p }}",
+    "core/tournament_results.html": "{% for r in results %}{{ r }}{% endfor %}{{ user_pick.active_player }}",
+    "core/tournament_detail.html": "{% for p in league_picks %}{{ p.user.username }}{% endfor %}",
+    "core/tournament_list.html": "{% for t in tournaments %}{{ t.name }}{% endfor %}",
+    "core/results_overview.html": "{% for t in tournaments %}{{ t.name }}{% endfor %}",
+    "core/rules.html": "rules",
+    "core/signup.html": "{{ form }}",
+}
+
+PAGE_TEMPLATE_SETTINGS = [{
+    "BACKEND": "django.template.backends.django.DjangoTemplates",
+    "OPTIONS": {
+        "loaders": [("django.template.loaders.locmem.Loader", PAGE_TEMPLATES)],
+        "context_processors": ["django.template.context_processors.request"],
+    },
+}]
@@ -1,3 +1,1492 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import random
+import re
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, modify_settings, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import (
+    checks, espn_parse, exports, field_choices, leaderboard_cache, live_stream, middleware,
+    names, season_cache, services, snapshots, used_players, views,
+)
+from .fake_espn import FakeESPNServer, render_field_page, render_final_page
+from .forms import PickForm
+from .ingest import IngestScheduler, backfill_results
+from .middleware import ViewMetricsMiddleware, record_http
+from .models import (
+    Pick, Player, PlayerAlias, Result, Season, Tournament, TournamentField, UserSeasonStats,
+)
+from .names import key as names_key, normalize_name
+from .services import (
+    backfill_season_keys, lock_due_picks, rebuild_season_stats, season_standings,
+    sync_tournament_earnings, sync_tournament_statuses,
+)
+from .synthetic import (
+    FIXTURE_DIR, FIXTURE_KINDS, PAGE_TEMPLATE_SETTINGS, build_league, final_rows_for_field,
+    load_espn_fixture,
+)
+
+
+# Query budgets per view / service. They must hold for any league size, so
+# every budget is asserted against a small and a larger synthetic league.
+# View budgets are for a cold season cache; *_warm once it is filled.
+QUERY_BUDGETS = {
+    "dashboard": 3,
+    "dashboard_warm": 2,
+    "standings": 3,
+    "standings_warm": 1,
+    "my_picks": 4,
+    "my_picks_warm": 3,
+    "tournament_results": 3,
+    "upsert_cold": 7,
+    "upsert_unchanged": 6,
+    "sync_noop": 2,
+    "season_standings": 1,
+}
+
+
+def _stats_rows(season):
+    return sorted(
+        UserSeasonStats.objects
+        .filter(season=season, weeks_played__gt=0)
+        .values_list(
+            "user_id", "total_earnings", "majors_earnings", "weeks_played",
+            "weekly_wins", "top5_finishes", "top10_finishes", "cashes",
+        )
+    )
+
+
+class QueryBudgetMixin:
+    league_size = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(**cls.league_size)
+        cls.user = cls.league.users[0]
+        cls.completed = cls.league.completed[-1]
+
+    def setUp(self):
+        cache.clear()
+
+    def call_view(self, name, *args):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        response = getattr(views, name)(request, *args)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def final_rows(self):
+        return final_rows_for_field(self.league.fields[self.completed.pk], 9_000_000, random.Random(1))
+
+    def test_dashboard_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["dashboard"]):
+            self.call_view("dashboard")
+
+    def test_standings_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["standings"]):
+            self.call_view("standings")
+
+    def test_my_picks_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["my_picks"]):
+            self.call_view("my_picks")
+
+    def test_my_picks_lists_every_league_pick(self):
+        season = self.league.season
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("core:my_picks"))
+        self.assertEqual(response.status_code, 200)
+
+        ordered = list(
+            Pick.objects.filter(season=season)
+            .order_by("tournament__start_date", "user__username")
+            .values_list("pk", flat=True)
+        )
+        self.assertEqual([p.pk for p in response.context["league_picks"]], ordered)
+
+    def test_dashboard_lists_season_pickers_with_nothing_scored(self):
+        newcomer = self.user.__class__.objects.create(username="aaa_newcomer")
+        Pick.objects.create(user=newcomer, tournament=self.league.upcoming[-1], primary_player="Anyone")
+        self.client.force_login(newcomer)
+
+        leaderboard = self.client.get(reverse("core:dashboard")).context["leaderboard"]
+        self.assertEqual(
+            len(leaderboard),
+            Pick.objects.filter(season=self.league.season).values("user").distinct().count(),
+        )
+        row = next(r for r in leaderboard if r["user_id"] == newcomer.pk)
+        self.assertEqual((row["user__username"], row["total_earnings"]), ("aaa_newcomer", 0))
+
+    def test_season_cache_query_budgets(self):
+        for view in ("dashboard", "standings", "my_picks"):
+            self.call_view(view)
+            with self.assertNumQueries(QUERY_BUDGETS[f"{view}_warm"]):
+                self.call_view(view)
+
+    def test_tournament_results_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["tournament_results"]):
+            self.call_view("tournament_results", self.completed.pk)
+
+    def test_upsert_results_query_budget(self):
+        rows = self.final_rows()
+        Result.objects.filter(tournament=self.completed).delete()
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = views._upsert_results_from_rows(self.completed, rows)
+        self.assertLessEqual(len(ctx.captured_queries), QUERY_BUDGETS["upsert_cold"])
+        self.assertEqual(summary["created"], len(rows))
+
+        with CaptureQueriesContext(connection) as ctx:
+            summary = views._upsert_results_from_rows(self.completed, rows)
+        self.assertLessEqual(len(ctx.captured_queries), QUERY_BUDGETS["upsert_unchanged"])
+        self.assertEqual(summary, {"created": 0, "updated": 0, "unchanged": len(rows), "picks_changed": 0})
+
+    def test_sync_earnings_noop_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["sync_noop"]):
+            summary = sync_tournament_earnings(self.completed)
+        self.assertEqual(summary["changed"], 0)
+
+    def test_season_standings_query_budget(self):
+        with self.assertNumQueries(QUERY_BUDGETS["season_standings"]):
+            season_standings(self.league.season)
+
+
+@override_settings(TEMPLATES=PAGE_TEMPLATE_SETTINGS, ESPN_INLINE_FETCH=False)
+class SmallLeagueQueryBudgetTests(QueryBudgetMixin, TestCase):
+    league_size = {"users": 8, "tournaments": 4, "field_size": 20}
+
+
+@override_settings(TEMPLATES=PAGE_TEMPLATE_SETTINGS, ESPN_INLINE_FETCH=False)
+class LargerLeagueQueryBudgetTests(QueryBudgetMixin, TestCase):
+    league_size = {"users": 60, "tournaments": 12, "field_size": 80}
+
+
+class ScoringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=25, tournaments=8, field_size=80)
+
+    def test_manual_earnings_survive_espn_zero(self):
+        t = self.league.completed[0]
+        result = Result.objects.filter(tournament=t, made_cut=False).select_related("player").first()
+        result.earnings = Decimal("12345.00")
+        result.save()
+
+        rows = [{"Player": result.player.full_name, "Pos": "MC", "Total": "MC", "Earnings": "--"}]
+        views._upsert_results_from_rows(t, rows)
+
+        result.refresh_from_db()
+        self.assertEqual(result.earnings, Decimal("12345.00"))
+
+    def test_upsert_writes_only_changed_results(self):
+        t = self.league.completed[1]
+        rows = final_rows_for_field(self.league.fields[t.pk], 9_000_000, random.Random(1))
+        views._upsert_results_from_rows(t, rows)
+        summary = views._upsert_results_from_rows(t, rows)
+        self.assertEqual(summary, {"created": 0, "updated": 0, "unchanged": len(rows), "picks_changed": 0})
+
+        # A manual payout for a golfer ESPN lists with no earnings.
+        missed = next(r for r in rows if r["Earnings"] == "--")
+        manual = Result.objects.get(tournament=t, player__full_name=missed["Player"])
+        Result.objects.filter(pk=manual.pk).update(earnings=Decimal("12345.00"))
+
+        mark = timezone.now()
+        rows[0] = dict(rows[0], Earnings="$1,234,567")
+        rows[5] = dict(rows[5], Pos="T5")
+        rows.append({"Player": "New Golfer", "Pos": "70", "Total": "+8", "Earnings": "$20,000"})
+        summary = views._upsert_results_from_rows(t, rows)
+        self.assertEqual(summary["created"], 1)
+        self.assertEqual(summary["updated"], 2)
+        self.assertEqual(summary["unchanged"], len(rows) - 3)
+
+        manual.refresh_from_db()
+        self.assertEqual(manual.earnings, Decimal("12345.00"))
+        written = set(
+            Result.objects.filter(tournament=t, updated_at__gte=mark)
+            .values_list("player__full_name", flat=True)
+        )
+        self.assertEqual(written, {rows[0]["Player"], rows[5]["Player"], "New Golfer"})
+        self.assertEqual(
+            Result.objects.get(tournament=t, player__full_name=rows[0]["Player"]).earnings,
+            Decimal("1234567"),
+        )
+
+    def test_pick_on_golfer_first_seen_in_results_is_scored(self):
+        t = self.league.completed[3]
+        pick = Pick.objects.filter(tournament=t).first()
+        Pick.objects.filter(pk=pick.pk).update(active_player="Rookie Newcomer", primary_player="Rookie Newcomer")
+        names.reload()
+
+        rows = [{"Player": "Rookie Newcomer", "Pos": "1", "Total": "-20", "Earnings": "$3,600,000"}]
+        summary = views._upsert_results_from_rows(t, rows)
+        self.assertEqual(summary["created"], 1)
+        self.assertEqual(summary["picks_changed"], 1)
+        pick.refresh_from_db()
+        self.assertEqual(pick.earnings, Decimal("3600000") * t.multiplier)
+
+    def test_sync_writes_only_changed_picks(self):
+        t = self.league.completed[2]
+        sync_tournament_earnings(t)
+        picked = sorted(set(Pick.objects.filter(tournament=t).values_list("active_player", flat=True)))[:2]
+        Result.objects.filter(tournament=t, player__full_name__in=picked).update(earnings=Decimal("987654"))
+        expected = set(Pick.objects.filter(tournament=t, active_player__in=picked).values_list("pk", flat=True))
+
+        mark = timezone.now()
+        with CaptureQueriesContext(connection) as ctx:
+            summary = sync_tournament_earnings(t)
+        self.assertEqual(summary, {"picks": Pick.objects.filter(tournament=t).count(), "changed": len(expected)})
+        pick_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "core_pick"')]
+        self.assertEqual(len(pick_updates), 1)
+
+        written = Pick.objects.filter(tournament=t, updated_at__gte=mark)
+        self.assertEqual(set(written.values_list("pk", flat=True)), expected)
+        self.assertTrue(all(p.earnings == Decimal("987654") * t.multiplier for p in written))
+        self.assertEqual(sync_tournament_earnings(t)["changed"], 0)
+
+    def test_incremental_stats_match_rebuild(self):
+        rng = random.Random(3)
+        for t in self.league.completed:
+            for r in Result.objects.filter(tournament=t):
+                r.earnings = Decimal(rng.choice([0, 0, 5000, 25000, 400000]))
+                r.save()
+            sync_tournament_earnings(t)
+        incremental = _stats_rows(self.league.season)
+
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(incremental, _stats_rows(self.league.season))
+
+    def test_stats_follow_picks_edited_or_deleted_outside_sync(self):
+        t = self.league.completed[0]
+        pick = Pick.objects.filter(tournament=t, earnings__gt=0).first()
+        Pick.objects.filter(pk=pick.pk).update(earnings=pick.earnings + 1_619_999)
+        sync_tournament_earnings(t)  # puts the pick back; stats must not drift
+        synced = _stats_rows(self.league.season)
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(synced, _stats_rows(self.league.season))
+
+        other = Pick.objects.filter(tournament=self.league.completed[1], earnings__gt=0).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        after_delete = _stats_rows(self.league.season)
+        self.assertNotEqual(synced, after_delete)
+
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(after_delete, _stats_rows(self.league.season))
+
+    def test_stats_follow_a_pick_saved_with_new_earnings(self):
+        t = self.league.completed[2]
+        pick = Pick.objects.filter(tournament=t).order_by("earnings").first()
+        before = _stats_rows(self.league.season)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            pick.save()  # scoring unchanged: nothing to recompute
+        self.assertEqual(len(callbacks), 1)  # only the season_cache bump
+
+        pick.earnings += Decimal("2500000")  # admin hand fix
+        with self.captureOnCommitCallbacks(execute=True):
+            pick.save()
+        saved = _stats_rows(self.league.season)
+        self.assertNotEqual(saved, before)
+
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(saved, _stats_rows(self.league.season))
+
+    def test_pick_save_recomputes_only_the_users_it_moves(self):
+        t = self.league.completed[3]
+        picks = list(Pick.objects.filter(tournament=t).order_by("user__username"))
+        for i, p in enumerate(picks):
+            Pick.objects.filter(pk=p.pk).update(earnings=Decimal(1000 * (len(picks) - i)))
+        rebuild_season_stats(self.league.season)
+        ranked = [p.user_id for p in picks]  # best first
+
+        last = Pick.objects.get(pk=picks[-1].pk)
+        recompute = services.recompute_user_season_stats
+        with mock.patch.object(services, "recompute_user_season_stats", wraps=recompute) as spy:
+            last.earnings = Decimal("999.99")  # still last
+            with self.captureOnCommitCallbacks(execute=True):
+                last.save()
+            self.assertEqual(set(spy.call_args.args[1]), {last.user_id})
+
+            # To first: only the old winner, 5th and 10th lose a finish.
+            last.earnings = Decimal("10000000")
+            with self.captureOnCommitCallbacks(execute=True):
+                last.save()
+            self.assertEqual(set(spy.call_args.args[1]), {last.user_id, ranked[0], ranked[4], ranked[9]})
+
+        saved = _stats_rows(self.league.season)
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(saved, _stats_rows(self.league.season))
+
+    def test_deleting_a_tournament_recomputes_its_users_once(self):
+        t = self.league.completed[5]
+        self.assertGreater(Pick.objects.filter(tournament=t).count(), 1)
+        recompute = services.recompute_user_season_stats
+        with mock.patch.object(services, "recompute_user_season_stats", wraps=recompute) as spy:
+            with self.captureOnCommitCallbacks(execute=True):
+                t.delete()
+        self.assertEqual(spy.call_count, 1)
+
+        saved = _stats_rows(self.league.season)
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(saved, _stats_rows(self.league.season))
+
+    def test_result_edit_rescores_the_picks_on_that_golfer(self):
+        t = self.league.completed[4]
+        pick = Pick.objects.filter(tournament=t).first()
+        result = Result.objects.get(tournament=t, player__full_name=pick.active_player)
+        result.earnings = Decimal("4321000")
+        with self.captureOnCommitCallbacks(execute=True):
+            result.save()
+
+        pick.refresh_from_db()
+        self.assertEqual(pick.earnings, result.earnings * t.multiplier)
+        saved = _stats_rows(self.league.season)
+        rebuild_season_stats(self.league.season)
+        self.assertEqual(saved, _stats_rows(self.league.season))
+
+    def test_season_cache_is_invalidated_by_scoring_writes(self):
+        season = self.league.season
+        cached = lambda: season_cache.get_or_set(season.pk, "standings", lambda: season_standings(season))
+        before = cached()
+        self.assertEqual(cached(), before)
+        generation = season_cache.generation(season.pk)
+
+        t = self.league.completed[0]
+        pick = Pick.objects.filter(tournament=t).first()
+        Result.objects.filter(tournament=t, player__full_name=pick.active_player).update(earnings=Decimal("7777777"))
+        sync_tournament_earnings(t)  # bulk path, no signals
+
+        self.assertNotEqual(season_cache.generation(season.pk), generation)
+        leader = cached()[0]
+        self.assertEqual(leader["user"], pick.user)
+
+    def test_season_standings_matches_python_ranking(self):
+        picks = Pick.objects.filter(tournament__season=self.league.season).select_related("user")
+        by_tournament = {}
+        for p in picks:
+            by_tournament.setdefault(p.tournament_id, []).append(p)
+
+        expected = {}
+        for tournament_picks in by_tournament.values():
+            if not any(p.earnings > 0 for p in tournament_picks):
+                continue
+            ranked = sorted(tournament_picks, key=lambda p: (-p.earnings, p.user.username))
+            for rank, p in enumerate(ranked, start=1):
+                s = expected.setdefault(p.user.username, [0, 0, 0, 0])
+                s[0] += p.earnings
+                s[1] += rank == 1
+                s[2] += rank <= 5
+                s[3] += 1
+
+        actual = {
+            r["user"].username: [r["points"], r["wins"], r["top5"], r["events"]]
+            for r in season_standings(self.league.season)
+        }
+        self.assertEqual(actual, expected)
+
+
+class NameMatchingTests(TestCase):
+    def test_normalize_name(self):
+        for a, b in [
+            ("Ludvig Åberg", "ludvig aberg"),
+            ("Davis Love III", "davis love"),
+            ("J.J. Spaun", "JJ Spaun"),
+            ("Sung-jae Im", "Sungjae Im"),
+            ("Nicolai Højgaard", "nicolai hojgaard"),
+        ]:
+            self.assertEqual(normalize_name(a), normalize_name(b), (a, b))
+
+    def test_sync_matches_accent_and_alias_spellings(self):
+        league = build_league(users=2, tournaments=2, field_size=10, completed=1, pick_rate=1, seed=7)
+        t = league.completed[0]
+        winner = Result.objects.filter(tournament=t, earnings__gt=0).select_related("player").first()
+        winner.player.full_name = "Ludvig Åberg"
+        winner.player.save()
+        PlayerAlias.objects.create(player=winner.player, name="Ludde Aberg")
+
+        picks = list(Pick.objects.filter(tournament=t))
+        self.assertEqual(len(picks), 2)
+        for pick, spelling in zip(picks, ["Ludvig Aberg", "Ludde Åberg"]):
+            pick.active_player = spelling
+            pick.save()
+        sync_tournament_earnings(t)
+
+        for pick in picks:
+            pick.refresh_from_db()
+            self.assertEqual(pick.earnings, winner.earnings * t.multiplier, pick.active_player)
+
+    def test_sync_finds_players_the_process_index_has_not_seen(self):
+        league = build_league(users=2, tournaments=2, field_size=10, completed=1, seed=10)
+        t = league.completed[0]
+        names.reload()
+        # Created by another process: this one's index doesn't know it yet.
+        Player.objects.bulk_create([Player(full_name="Late Golfer", normalized_name="late golfer")])
+        Result.objects.bulk_create([Result(
+            tournament=t, season=t.season, player=Player.objects.get(full_name="Late Golfer"),
+            position="1", earnings=Decimal("2000000"), made_cut=True,
+        )])
+        pick = Pick.objects.filter(tournament=t).first()
+        Pick.objects.filter(pk=pick.pk).update(active_player="Late Golfer")
+
+        self.assertIsNone(names.resolve("Late Golfer"))
+        sync_tournament_earnings(t)
+        pick.refresh_from_db()
+        self.assertEqual(pick.earnings, Decimal("2000000") * t.multiplier)
+
+    def test_upsert_merges_two_spellings_of_one_golfer(self):
+        league = build_league(users=2, tournaments=2, field_size=10, completed=1, seed=8)
+        t = league.completed[0]
+        rows = [
+            {"Player": "Zed Åberg", "Pos": "1", "Total": "-10", "Earnings": "$1,000,000"},
+            {"Player": "Zed Aberg", "Pos": "1", "Total": "-10", "Earnings": "$1,000,000"},
+        ]
+        summary = views._upsert_results_from_rows(t, rows)
+        self.assertEqual((summary["created"], summary["updated"]), (1, 0))
+        self.assertEqual(Result.objects.filter(tournament=t, player__full_name="Zed Åberg").count(), 1)
+
+        # Existing Result, one spelling via an alias: updated once, not twice.
+        PlayerAlias.objects.create(player=Player.objects.get(full_name="Zed Åberg"), name="Zeddy Aberg")
+        rows = [dict(r, Earnings="$900,000") for r in rows] + [
+            {"Player": "Zeddy Aberg", "Pos": "1", "Total": "-10", "Earnings": "$900,000"},
+        ]
+        summary = views._upsert_results_from_rows(t, rows)
+        self.assertEqual((summary["created"], summary["updated"]), (0, 1))
+
+
+    def test_normalize_player_names_merges_players_that_normalize_alike(self):
+        league = build_league(users=2, tournaments=3, field_size=10, completed=2, pick_rate=1, seed=9)
+        first, second = league.completed[:2]
+        older = Player.objects.create(full_name="Sung-jae Im")
+        newer = Player.objects.create(full_name="Sungjae Im")
+        for player in (older, newer):
+            Result.objects.create(tournament=first, player=player, position="2",
+                                  earnings=Decimal("500000"), made_cut=True)
+            TournamentField.objects.create(tournament=second, player=player)
+        Result.objects.create(tournament=second, player=newer, position="1",
+                              earnings=Decimal("900000"), made_cut=True)
+
+        # Resolves to the older Player, whose Result for `second` is missing.
+        pick = Pick.objects.filter(tournament=second).first()
+        pick.active_player = "Sung-jae Im"
+        pick.save()
+        sync_tournament_earnings(second)
+        pick.refresh_from_db()
+        self.assertEqual(pick.earnings, 0)
+
+        with self.assertRaises(CommandError):
+            call_command("normalize_player_names", "--check", stdout=io.StringIO())
+        call_command("normalize_player_names", stdout=io.StringIO())
+
+        self.assertEqual(list(Player.objects.filter(normalized_name="sungjae im")), [older])
+        self.assertEqual(PlayerAlias.objects.get(name="Sungjae Im").player, older)
+        for t in (first, second):
+            self.assertEqual(list(Result.objects.filter(tournament=t, player__normalized_name="sungjae im")
+                                  .values_list("player_id", flat=True)), [older.pk])
+        self.assertEqual(TournamentField.objects.filter(tournament=second, player=older).count(), 1)
+        pick.refresh_from_db()
+        self.assertEqual(pick.earnings, Decimal("900000") * second.multiplier)
+        call_command("normalize_player_names", "--check", stdout=io.StringIO())
+
+class TournamentStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=2, tournaments=5, field_size=10, completed=2)
+
+    def test_computed_status_matches_status_auto(self):
+        for t in Tournament.objects.with_computed_status():
+            self.assertEqual(t.computed_status, t.status_auto, t)
+            self.assertEqual(t.status, t.status_auto, t)
+
+    def test_sync_moves_stale_statuses_and_keeps_cancelled(self):
+        live, later = self.league.upcoming[0], self.league.upcoming[-1]
+        Tournament.objects.filter(pk=live.pk).update(status="upcoming")
+        Tournament.objects.filter(pk=later.pk).update(status="cancelled")
+
+        self.assertEqual(sync_tournament_statuses(), {"in_progress": 1})
+        self.assertEqual(sync_tournament_statuses(), {})
+        self.assertEqual(list(Tournament.objects.in_progress()), [live])
+        self.assertEqual(Tournament.objects.get(pk=later.pk).status, "cancelled")
+
+        after_end = timezone.now() + timedelta(days=2)
+        self.assertEqual(sync_tournament_statuses(now=after_end), {"completed": 1})
+
+
+class SeasonKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=3, tournaments=4, field_size=10, completed=2, pick_rate=1)
+
+    def test_backfill_and_tournament_moves_keep_season_keys_in_step(self):
+        season = self.league.season
+        t = self.league.completed[0]
+        Pick.objects.filter(tournament=t).update(season=None)
+        Result.objects.filter(tournament=t).update(season=None)
+
+        counts = backfill_season_keys()
+        self.assertEqual(counts, {
+            "Pick": Pick.objects.filter(tournament=t).count(),
+            "Result": Result.objects.filter(tournament=t).count(),
+        })
+        self.assertEqual(backfill_season_keys(), {"Pick": 0, "Result": 0})
+
+        other = Season.objects.create(name="other", year=season.year - 1,
+                                      start_date=season.start_date, end_date=season.end_date)
+        t.season = other
+        t.save()
+        self.assertFalse(Pick.objects.filter(tournament=t).exclude(season=other).exists())
+        self.assertFalse(Result.objects.filter(tournament=t).exclude(season=other).exists())
+
+        pick = Pick.objects.create(user=self.league.users[0], tournament=self.league.upcoming[-1],
+                                   primary_player="X", active_player="X")
+        self.assertEqual(pick.season_id, season.pk)
+
+
+class PickLockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=4, tournaments=4, field_size=20, completed=2, pick_rate=1)
+
+    def test_lock_substitutes_backups_for_withdrawn_primaries(self):
+        t = self.league.upcoming[0]  # started, picks still pending
+        picks = {p.user_id: p for p in Pick.objects.filter(tournament=t)}
+        wd, both_out, override, normal = (picks[u.pk] for u in self.league.users)
+
+        def mark(name, status):
+            TournamentField.objects.filter(tournament=t, player__full_name=name).update(status=status)
+
+        mark(wd.primary_player, "wd")
+        mark(both_out.primary_player, "wd")
+        mark(both_out.backup_player, "dq")
+        Pick.objects.filter(pk=override.pk).update(reason="manual_override", active_player="Someone Else")
+        used_players.get(wd.user_id, t.season_id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            locked = lock_due_picks()
+        self.assertLessEqual(len(ctx.captured_queries), 10)
+        self.assertEqual(locked, [(t, {"locked": 3, "substituted": 1, "void": 1})])
+        self.assertEqual(lock_due_picks(), [])
+
+        rows = {
+            p.pk: (p.status, p.reason, p.active_player)
+            for p in Pick.objects.filter(tournament=t)
+        }
+        self.assertEqual(rows[wd.pk], ("locked", "primary_wd_pre_start", wd.backup_player))
+        self.assertEqual(rows[both_out.pk], ("void", "normal", both_out.primary_player))
+        self.assertEqual(rows[override.pk], ("locked", "manual_override", "Someone Else"))
+        self.assertEqual(rows[normal.pk], ("locked", "normal", normal.primary_player))
+
+        used = used_players.get(wd.user_id, t.season_id)
+        self.assertTrue(used_players.is_used(used, wd.backup_player, self.league.upcoming[-1]))
+        self.assertFalse(used_players.is_used(used, wd.primary_player, self.league.upcoming[-1]))
+
+
+class PickValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=3, tournaments=5, field_size=20, completed=2)
+
+    def setUp(self):
+        cache.clear()
+        self.user = self.league.users[0]
+        self.tournament = self.league.upcoming[-1]  # pick window still open
+        self.used_name = (
+            Pick.objects.filter(user=self.user, tournament__in=self.league.completed)
+            .values_list("active_player", flat=True).first()
+        )
+        self.field = [p.full_name for p in self.league.fields[self.tournament.pk] if p.full_name != self.used_name]
+
+    def _form(self, primary, backup=""):
+        form = PickForm({"primary_player": primary, "backup_player": backup},
+                        user=self.user, tournament=self.tournament)
+        choices = [(n, n) for n in [self.used_name] + self.field]
+        form.fields["primary_player"].choices = choices
+        form.fields["backup_player"].choices = choices
+        return form
+
+    def test_primary_and_backup_checked_with_one_query(self):
+        used_players.get(self.user.pk, self.league.season.pk)
+        with self.assertNumQueries(0):  # rejected straight from the cached index
+            self.assertFalse(self._form(self.field[0], self.used_name).is_valid())
+        with self.assertNumQueries(1):  # accepted only once the picks confirm it
+            self.assertTrue(self._form(self.field[0], self.field[1]).is_valid())
+
+    def test_picks_without_a_season_key_still_count_as_used(self):
+        # An upgraded install before backfill_season_keys has run.
+        Pick.objects.filter(user=self.user).update(season=None)
+        self.assertFalse(self._form(self.field[0], self.used_name).is_valid())
+
+    def test_stale_index_cannot_let_a_repeat_through(self):
+        season = self.league.season
+        stale = dict(used_players.get(self.user.pk, season.pk))
+
+        # Saved by another process: this process's cache still has the old index.
+        other = self.league.upcoming[-2]
+        Pick.objects.create(user=self.user, tournament=other,
+                            primary_player=self.field[0], active_player=self.field[0])
+        cache.set(used_players._key(self.user.pk, season.pk), stale)
+
+        form = self._form(self.field[1], self.field[0])
+        self.assertFalse(form.is_valid())
+        self.assertIn(f"You've already used {self.field[0]} this season.", form.non_field_errors())
+
+    def test_index_is_invalidated_when_a_pick_is_saved(self):
+        self.assertTrue(self._form(self.field[0]).is_valid())
+
+        other = self.league.upcoming[-2]
+        Pick.objects.create(user=self.user, tournament=other,
+                            primary_player=self.field[0], active_player=self.field[0])
+
+        self.assertFalse(self._form(self.field[0]).is_valid())
+        used = used_players.get(self.user.pk, self.league.season.pk)
+        self.assertEqual(used_players.available(self.field[:2], used, self.tournament), self.field[1:2])
+        self.assertEqual(used_players.available(self.field[:1], used, other), self.field[:1])
+
+
+class LiveStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=4, tournaments=4, field_size=20, completed=2, pick_rate=1)
+        cls.tournament = cls.league.upcoming[0]  # started three days ago
+
+    def setUp(self):
+        self.board = [
+            {"PLAYER": p.full_name, "POS": str(i + 1), "SCORE": "-4", "TODAY": "-1", "THRU": "9"}
+            for i, p in enumerate(self.league.fields[self.tournament.pk])
+        ]
+        self.hub = live_stream.LiveHub(loader=lambda t: self.board, background=False)
+
+    def test_only_changed_rows_are_published_with_their_pickers(self):
+        channel = self.hub.subscribe(self.tournament)
+        self.assertEqual(channel.seq, 1)
+        self.assertIsNone(channel.poll())
+
+        pick = Pick.objects.filter(tournament=self.tournament).select_related("user").first()
+        row = next(r for r in self.board if r["PLAYER"] == pick.active_player)
+        row.update(SCORE="-6", TODAY="-3", THRU="12")
+
+        delta = channel.poll()
+        self.assertEqual([r["PLAYER"] for r in delta["rows"]], [pick.active_player])
+        self.assertIn(pick.user.username, delta["rows"][0]["picked_by"])
+        self.assertEqual(channel.since(1), [delta])
+        self.assertEqual(channel.since(2), [])
+        self.assertEqual(len(channel.since(0)), 2)  # first poll sent the whole board
+
+    def test_stream_sends_snapshot_then_resumes_from_last_event_id(self):
+        messages = list(live_stream.stream(self.tournament, hub=self.hub, max_seconds=0))
+        self.assertTrue(messages[0].startswith("id: "))
+        self.assertIn("event: snapshot", messages[0])
+        self.assertEqual(self.hub._channels, {})
+
+        channel = self.hub.subscribe(self.tournament)
+        self.board[0]["THRU"] = "F"
+        channel.poll()
+        resumed = list(live_stream.stream(
+            self.tournament, last_event_id=f"{channel.epoch}:1", hub=self.hub, max_seconds=0,
+        ))
+        self.assertIn("event: delta", resumed[0])
+        self.assertIn(f"id: {channel.epoch}:2", resumed[0])
+
+
+    @override_settings(LIVE_STREAM_MAX_CLIENTS=1)
+    def test_concurrent_streams_are_capped_per_process(self):
+        first = live_stream.open_stream(self.tournament, hub=self.hub, max_seconds=0)
+        self.assertIsNotNone(first)
+        self.assertIsNone(live_stream.open_stream(self.tournament, hub=self.hub, max_seconds=0))
+
+        first.close()  # never iterated: the slot must still come back
+        second = live_stream.open_stream(self.tournament, hub=self.hub, max_seconds=0)
+        self.assertIn("event: snapshot", list(second)[0])
+        second.close()
+        second.close()
+        self.assertEqual(self.hub.streams, 0)
+
+    @override_settings(LIVE_STREAM_MAX_CLIENTS=0)
+    def test_stream_view_answers_503_when_full(self):
+        Tournament.objects.filter(pk=self.tournament.pk).update(status="in_progress")
+        self.client.force_login(self.league.users[0])
+        response = self.client.get(reverse("core:live_leaderboard_stream", args=[self.tournament.pk]))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "30")
+
+
+class SnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=2, tournaments=4, field_size=20, completed=2)
+        cls.tournament = cls.league.upcoming[0]
+
+    def board(self, order):
+        return [
+            {"PLAYER": name, "POS": str(i + 1), "SCORE": str(-i), "TODAY": "E", "THRU": "9"}
+            for i, name in enumerate(order)
+        ]
+
+    def test_snapshots_store_deltas_and_answer_changes_since(self):
+        players = [p.full_name for p in self.league.fields[self.tournament.pk]]
+        first = snapshots.record(self.tournament, self.board(players))
+        self.assertIsNone(snapshots.record(self.tournament, self.board(players)))
+
+        swapped = [players[1], players[0]] + players[2:]
+        second = snapshots.record(self.tournament, self.board(swapped))
+        self.assertEqual((first.seq, second.seq), (1, 2))
+        self.assertEqual(snapshots.unpack(second.rows)[0]["PLAYER"], players[1])
+        self.assertLess(len(second.rows), len(json.dumps(self.board(swapped))))
+
+        delta = snapshots.unpack_delta(second.delta)
+        moved = {r["PLAYER"]: r["moved"] for r in delta["changed"]}
+        self.assertEqual(moved, {players[1]: 1, players[0]: -1})
+
+        third = snapshots.record(self.tournament, self.board(swapped[:-1]))
+        with self.assertNumQueries(1):
+            changes = snapshots.changes_since(self.tournament, 1)
+        self.assertEqual(changes["seq"], third.seq)
+        self.assertFalse(changes["full"])
+        self.assertEqual(len(changes["changed"]), 2)
+        self.assertEqual(changes["removed"], [players[-1]])
+        self.assertEqual(snapshots.changes_since(self.tournament, 2)["removed"], [players[-1]])
+        self.assertEqual(snapshots.changes_since(self.tournament, 3)["changed"], [])
+        self.assertTrue(snapshots.changes_since(self.tournament)["full"])
+
+    def test_prune_keeps_latest_snapshot_per_tournament(self):
+        players = [p.full_name for p in self.league.fields[self.tournament.pk]]
+        for n in range(3):
+            snapshots.record(self.tournament, self.board(players[n:]))
+
+        later = timezone.now() + timedelta(days=snapshots.DEFAULT_RETENTION_DAYS + 1)
+        self.assertEqual(snapshots.prune(now=later), 2)
+        self.assertEqual(snapshots.latest(self.tournament).seq, 3)
+        self.assertTrue(snapshots.changes_since(self.tournament, 1)["full"])
+
+
+class StoredLeaderboardTests(TestCase):
+    """Boards read without inline ESPN fetches, when the worker's cache entries aren't visible."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=2, tournaments=4, field_size=20, completed=2)
+        cls.tournament = cls.league.upcoming[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_live_board_falls_back_to_latest_snapshot(self):
+        self.assertEqual(views._stored_leaderboard_for_tournament(self.tournament, "in_progress"), ("live", []))
+
+        board = [
+            {"PLAYER": p.full_name, "POS": str(i + 1), "SCORE": str(-i), "TODAY": "E", "THRU": "9"}
+            for i, p in enumerate(self.league.fields[self.tournament.pk])
+        ]
+        snapshots.record(self.tournament, board)
+        mode, rows = views._stored_leaderboard_for_tournament(self.tournament, "in_progress")
+        self.assertEqual(mode, "live")
+        self.assertEqual([(r["PLAYER"], r["POS"]) for r in rows], [(r["PLAYER"], r["POS"]) for r in board])
+
+    def test_field_board_falls_back_to_tournament_field(self):
+        entries = TournamentField.objects.filter(tournament=self.tournament).select_related("player")
+        first, withdrawn = list(entries[:2])
+        first.tee_time = views._parse_tee_time(self.tournament, "7:45 AM")
+        first.save()
+        withdrawn.status = "wd"
+        withdrawn.save()
+
+        mode, rows = views._stored_leaderboard_for_tournament(self.tournament, "scheduled")
+        self.assertEqual(mode, "field")
+        self.assertEqual(len(rows), entries.count())
+        tee = {r["player"]: r["tee_time"] for r in rows}
+        self.assertEqual(tee[first.player.full_name], "7:45 AM")
+        self.assertEqual(tee[withdrawn.player.full_name], "WD")
+
+        # What the worker cached wins when this process can see it.
+        leaderboard_cache.put_rows(self.tournament, "field", [{"player": "Cached Golfer", "tee_time": ""}])
+        _, rows = views._stored_leaderboard_for_tournament(self.tournament, "scheduled")
+        self.assertEqual([r["player"] for r in rows], ["Cached Golfer"])
+
+    def test_empty_cached_board_falls_back_to_stored_rows(self):
+        board = [{"PLAYER": p.full_name, "POS": "1", "SCORE": "-3", "TODAY": "-3", "THRU": "9"}
+                 for p in self.league.fields[self.tournament.pk][:3]]
+        snapshots.record(self.tournament, board)
+        leaderboard_cache.put_rows(self.tournament, "live", [])
+        _, rows = views._stored_leaderboard_for_tournament(self.tournament, "in_progress")
+        self.assertEqual([r["PLAYER"] for r in rows], [r["PLAYER"] for r in board])
+
+        leaderboard_cache.put_rows(self.tournament, "field", [])
+        _, rows = views._stored_leaderboard_for_tournament(self.tournament, "scheduled")
+        self.assertEqual(len(rows), TournamentField.objects.filter(tournament=self.tournament).count())
+
+
+class APITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=5, tournaments=4, field_size=20, completed=3)
+
+    def setUp(self):
+        self.client.force_login(self.league.users[0])
+
+    def test_unchanged_scope_answers_304_without_aggregating(self):
+        t = self.league.completed[0]
+        for url in ["/api/standings/", "/api/leaderboard/",
+                    f"/api/tournaments/{t.pk}/results/", f"/api/tournaments/{t.pk}/picks/"]:
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200, url)
+            self.assertIn("ETag", first)
+            self.assertNotIn("Last-Modified", first)  # can't see deletes or status changes
+
+            # session/user + scope lookup + validator aggregate
+            with self.assertNumQueries(4):
+                again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+            self.assertEqual(again.status_code, 304, url)
+
+    def test_etag_changes_when_scope_changes(self):
+        t = self.league.completed[0]
+        url = f"/api/tournaments/{t.pk}/picks/"
+        etag = self.client.get(url)["ETag"]
+
+        pick = Pick.objects.filter(tournament=t).first()
+        pick.status = "void"
+        pick.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("void", [p["status"] for p in response.json()["picks"]])
+
+        results_url = f"/api/tournaments/{t.pk}/results/"
+        etag = self.client.get(results_url)["ETag"]
+        views._upsert_results_from_rows(t, [{"Player": "New Golfer", "Pos": "70", "Total": "+8", "Earnings": "$20,000"}])
+        self.assertEqual(self.client.get(results_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_covers_tournament_fields_and_stats_rebuilds(self):
+        t = self.league.completed[0]
+        url = f"/api/tournaments/{t.pk}/results/"
+        etag = self.client.get(url)["ETag"]
+        Tournament.objects.filter(pk=t.pk).update(status="in_progress")  # no Result touched
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tournament"]["status"], "in_progress")
+
+        etag = self.client.get("/api/leaderboard/")["ETag"]
+        rebuild_season_stats(self.league.season)  # rewrites UserSeasonStats, not Pick
+        self.assertEqual(self.client.get("/api/leaderboard/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_leaderboard_lists_the_same_members_as_the_dashboard(self):
+        newcomer = self.league.users[0].__class__.objects.create(username="aaa_newcomer")
+        Pick.objects.create(user=newcomer, tournament=self.league.upcoming[-1], primary_player="Anyone")
+
+        rows = self.client.get("/api/leaderboard/").json()["leaderboard"]
+        dashboard = self.client.get(reverse("core:dashboard")).context["leaderboard"]
+        self.assertEqual([r["username"] for r in rows], [r["user__username"] for r in dashboard])
+        row = next(r for r in rows if r["username"] == "aaa_newcomer")
+        self.assertEqual(Decimal(row["total_earnings"]), 0)
+        self.assertEqual(row["weeks_played"], 0)
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=30, tournaments=6, field_size=30, completed=4)
+        User = cls.league.users[0].__class__
+        cls.admin = User.objects.create_superuser("commish", "c@example.com", "x")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelists_take_a_fixed_number_of_queries(self):
+        for model in ("pick", "result", "tournamentfield", "userseasonstats"):
+            url = f"/admin/core/{model}/"
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            self.assertLessEqual(len(ctx.captured_queries), 10, model)
+
+    def test_pick_search_and_season_scoped_tournament_filter(self):
+        pick = Pick.objects.filter(season=self.league.season).first()
+        prefix = pick.active_player.split()[0].lower()  # "tiger" finds "Tiger Woods"
+        response = self.client.get("/admin/core/pick/", {"q": prefix})
+        self.assertEqual(response.status_code, 200)
+        shown = response.context["cl"].result_list
+        self.assertIn(pick, shown)
+        self.assertTrue(all(
+            p.active_player.lower().startswith(prefix)
+            or p.primary_player.lower().startswith(prefix)
+            or p.user.username.lower().startswith(prefix)
+            for p in shown
+        ))
+
+        result = Result.objects.filter(season=self.league.season).select_related("player").first()
+        response = self.client.get("/admin/core/result/", {"q": result.player.full_name[:4].lower()})
+        self.assertIn(result, response.context["cl"].result_list)
+
+        old = Season.objects.create(name="old", year=2000, is_active=False,
+                                    start_date=self.league.season.start_date,
+                                    end_date=self.league.season.end_date)
+        Tournament.objects.create(season=old, name="Old open", start_date=old.start_date,
+                                  end_date=old.end_date, pick_lock_datetime=timezone.now())
+        response = self.client.get("/admin/core/pick/")
+        choices = [c["display"] for c in response.context["cl"].filter_specs[1].choices(response.context["cl"])]
+        self.assertNotIn("Old open", choices)
+        self.assertIn(self.league.tournaments[0].name, choices)
+
+
+@modify_settings(MIDDLEWARE={"append": "core.middleware.ViewMetricsMiddleware"})
+@override_settings(CORE_VIEW_METRICS=True, TEMPLATES=PAGE_TEMPLATE_SETTINGS, ESPN_INLINE_FETCH=False)
+class ViewMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=5, tournaments=3, field_size=15, completed=2)
+        User = cls.league.users[0].__class__
+        cls.staff = User.objects.create_user("ops", password="x", is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        middleware.reset()
+        self.addCleanup(middleware.reset)
+        self.client.force_login(self.league.users[0])
+
+    def get(self, name):
+        with CaptureQueriesContext(connection) as ctx:
+            with self.assertLogs("core.metrics", "INFO") as logs:
+                response = self.client.get(reverse(f"core:{name}"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), logs.output
+
+    def test_records_queries_and_latency_per_view(self):
+        cold, logs = self.get("standings")
+        self.assertIn("view=standings status=200 queries=%d " % cold, logs[0])
+        warm, _ = self.get("standings")
+        self.get("my_picks")
+
+        stats = middleware.snapshot()
+        self.assertEqual(set(stats), {"standings", "my_picks"})
+        s = stats["standings"]
+        self.assertEqual(s["requests"], 2)
+        self.assertEqual(s["queries_total"], cold + warm)
+        self.assertEqual(s["queries_max"], max(cold, warm))
+        self.assertEqual(s["queries_avg"], (cold + warm) / 2)
+        self.assertEqual(sum(s["latency_buckets"].values()), 2)
+        self.assertGreater(s["latency_ms_max"], 0)
+        self.assertEqual(s["over_budget"], 0)
+        self.assertIsNone(s["query_budget"])
+
+    def test_http_time_attributed_to_the_request(self):
+        def view(request):
+            record_http(0.25)
+            request.resolver_match = resolve(reverse("core:rules"))
+            return HttpResponse()
+
+        with self.assertLogs("core.metrics", "INFO") as logs:
+            ViewMetricsMiddleware(view)(RequestFactory().get("/"))
+        self.assertIn("http_calls=1 http_ms=250.0", logs.output[0])
+        self.assertEqual(middleware.snapshot()["rules"]["http_ms_total"], 250.0)
+        record_http(1.0)  # outside a measured request: ignored
+        self.assertEqual(middleware.snapshot()["rules"]["http_ms_total"], 250.0)
+
+    @override_settings(CORE_QUERY_BUDGETS={"standings": 1}, CORE_DEFAULT_QUERY_BUDGET=100)
+    def test_over_budget_requests_logged_as_warnings(self):
+        with self.assertLogs("core.metrics", "WARNING") as logs:
+            self.client.get(reverse("core:standings"))
+        self.assertIn("OVER QUERY BUDGET (1)", logs.output[0])
+        self.get("rules")
+
+        stats = middleware.snapshot()
+        self.assertEqual(stats["standings"]["over_budget"], 1)
+        self.assertEqual(stats["standings"]["query_budget"], 1)
+        self.assertEqual(stats["rules"]["over_budget"], 0)
+        self.assertEqual(stats["rules"]["query_budget"], 100)
+
+    def test_metrics_endpoint(self):
+        queries, _ = self.get("rules")
+        self.assertEqual(self.client.get(reverse("core:view_metrics")).status_code, 302)  # staff only
+
+        self.client.force_login(self.staff)
+        with self.assertLogs("core.metrics", "INFO"):
+            data = self.client.get(reverse("core:view_metrics")).json()["views"]
+        rules = data["rules"]
+        self.assertEqual(rules["requests"], 1)
+        self.assertEqual(rules["queries_total"], queries)
+        self.assertEqual(list(rules["latency_buckets"])[-1], "inf")
+        self.assertEqual(sum(rules["latency_buckets"].values()), 1)
+        self.assertEqual(set(data), {"rules", "view_metrics"})  # the redirect counts too
+
+    @override_settings(CORE_VIEW_METRICS=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ViewMetricsMiddleware(lambda request: HttpResponse())
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_per_process_cache_rejected_for_deploy(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=locmem):
+            errors = checks.check_shared_cache(None)
+        self.assertEqual([e.id for e in errors], ["core.E001"])
+
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                             "LOCATION": "redis://127.0.0.1:6379"}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(checks.check_shared_cache(None), [])
+            self.assertEqual(season_cache._timeout(), season_cache.DEFAULT_TIMEOUT)
+
+    def test_season_cache_expires_quickly_on_a_per_process_backend(self):
+        # Another process's bumps never reach this cache: bound the staleness.
+        self.assertTrue(checks.local_cache())
+        self.assertEqual(season_cache._timeout(), season_cache.LOCAL_TIMEOUT)
+        with override_settings(SEASON_CACHE_TIMEOUT=5):
+            self.assertEqual(season_cache._timeout(), 5)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=6, tournaments=4, field_size=15, completed=3, pick_rate=1)
+        User = cls.league.users[0].__class__
+        cls.staff = User.objects.create_user("payouts", password="x", is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+
+    def _get(self, dataset, **params):
+        response = self.client.get(f"/exports/{dataset}/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv_and_jsonl_exports_stream_every_row(self):
+        season = self.league.season
+        picks = list(csv.DictReader(io.StringIO(self._get("picks"))))
+        self.assertEqual(len(picks), Pick.objects.filter(season=season).count())
+        self.assertEqual(set(picks[0]), set(exports.PICK_FIELDS))
+
+        results = [json.loads(line) for line in self._get("results", format="jsonl").splitlines()]
+        self.assertEqual(len(results), Result.objects.filter(season=season).count())
+        self.assertEqual(
+            sorted(r["earnings"] for r in results),
+            sorted(str(e) for e in Result.objects.filter(season=season).values_list("earnings", flat=True)),
+        )
+
+        standings = list(csv.DictReader(io.StringIO(self._get("standings", season=season.pk))))
+        self.assertEqual(
+            [(r["username"], r["points"]) for r in standings],
+            [(r["user"].username, str(r["points"])) for r in season_standings(season)],
+        )
+
+    def test_exports_are_staff_only_and_validate_params(self):
+        self.assertEqual(self.client.get("/exports/picks/", {"format": "xml"}).status_code, 404)
+        self.assertEqual(self.client.get("/exports/users/").status_code, 404)
+        self.client.force_login(self.league.users[0])
+        self.assertEqual(self.client.get("/exports/picks/").status_code, 302)
+
+    def test_command_exports_all_seasons(self):
+        out = io.StringIO()
+        call_command("export_season", "picks", "--all", "--format", "jsonl", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), Pick.objects.count())
+
+
+class FakeESPNMixin:
+    """Small league plus a local fake ESPN that ESPN_BASE_URL points at."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = build_league(users=5, tournaments=4, field_size=20, completed=3)
+
+    def setUp(self):
+        self.espn = FakeESPNServer().start()
+        self.addCleanup(self.espn.stop)
+        override = override_settings(ESPN_BASE_URL=self.espn.url)
+        override.enable()
+        self.addCleanup(override.disable)
+        for t in self.league.tournaments:
+            leaderboard_cache.invalidate(t)
+
+
+class ESPNFixtureTests(FakeESPNMixin, TestCase):
+    """Scrapers and the ingest worker against the synthetic fixture pages on a local fake ESPN."""
+
+    def test_scrapers_parse_fixture_pages(self):
+        t = self.league.completed[0]
+        self.espn.set_field_page(t.pga_tournament_id, load_espn_fixture("field"))
+        self.espn.set_page(t.pga_tournament_id, load_espn_fixture("final"))
+
+        field = views._scrape_espn_leaderboard(t)
+        final = views._scrape_espn_results(t)
+        self.assertEqual(len(field), 150)
+        self.assertEqual(len(final), 150)
+        self.assertTrue(final[0]["Earnings"].startswith("$"))
+
+        self.espn.set_page(t.pga_tournament_id, load_espn_fixture("live"))
+        live = views._scrape_current_leaderboard(t)
+        self.assertEqual(len(live), 150)
+        self.assertEqual([r["PLAYER"] for r in live], [r["Player"] for r in final])
+
+    def test_unchanged_page_is_revalidated_with_304(self):
+        t = self.league.completed[1]
+        self.espn.set_page(t.pga_tournament_id, load_espn_fixture("live"))
+
+        first = views._scrape_current_leaderboard(t)
+        second = views._scrape_current_leaderboard(t)
+        self.assertEqual(self.espn.not_modified, 1)
+        self.assertIs(second, first)  # served from the client memo, not re-parsed
+
+        self.espn.set_page(t.pga_tournament_id, load_espn_fixture("live").replace("-2<", "-3<", 1))
+        self.assertIsNot(views._scrape_current_leaderboard(t), first)
+
+    def test_ingest_persists_final_results_once(self):
+        t = self.league.completed[0]
+        Result.objects.filter(tournament__in=self.league.completed).delete()
+        rows = final_rows_for_field(self.league.fields[t.pk], 9_000_000, random.Random(1))
+        for c in self.league.completed:
+            self.espn.set_page(c.pga_tournament_id, render_final_page(rows, padding_kb=1))
+
+        scheduler = IngestScheduler(field_horizon_days=0)
+        self.assertEqual(scheduler.run_once()["final"], len(self.league.completed))
+        self.assertEqual(Result.objects.filter(tournament=t).count(), len(rows))
+
+        hits = len(self.espn.hits)
+        self.assertEqual(scheduler.run_once()["final"], 0)
+        self.assertEqual(len(self.espn.hits), hits)
+
+
+    def test_ingest_refetches_final_results_until_earnings_are_posted(self):
+        t = self.league.completed[-1]
+        Result.objects.filter(tournament=t).delete()
+        rows = final_rows_for_field(self.league.fields[t.pk], 9_000_000, random.Random(2))
+        self.espn.set_page(t.pga_tournament_id, render_final_page(
+            [dict(r, Earnings="--") for r in rows], padding_kb=1,
+        ))
+
+        scheduler = IngestScheduler(field_horizon_days=0, field_interval=0)
+        self.assertEqual(scheduler.run_once()["final"], 1)
+        self.assertFalse(Result.objects.filter(tournament=t, earnings__gt=0).exists())
+
+        # Earnings show up on a later fetch.
+        self.espn.set_page(t.pga_tournament_id, render_final_page(rows, padding_kb=1))
+        self.assertEqual(scheduler.run_once()["final"], 1)
+        winner = Result.objects.get(tournament=t, player__full_name=rows[0]["Player"])
+        self.assertEqual(f"${winner.earnings:,.0f}", rows[0]["Earnings"])
+        self.assertEqual(scheduler.run_once()["final"], 0)
+
+        # Within the grace window after end_date it is refetched regardless.
+        Tournament.objects.filter(pk=t.pk).update(end_date=timezone.localdate() - timedelta(days=1))
+        self.assertEqual(scheduler.run_once()["final"], 1)
+
+@override_settings(TEMPLATES=PAGE_TEMPLATE_SETTINGS)
+class FieldIngestTests(FakeESPNMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        t = self.league.completed[-1]
+        start = timezone.localdate() + timedelta(days=5)
+        self.tournament = Tournament.objects.create(
+            season=self.league.season, name="Next open", pga_tournament_id="next001",
+            start_date=start, end_date=start + timedelta(days=3),
+            pick_lock_datetime=timezone.now() + timedelta(days=5), purse=t.purse,
+        )
+        self.names = [p.full_name for p in self.league.fields[t.pk]]
+
+    def _field_page(self, rows):
+        self.espn.set_field_page(self.tournament.pga_tournament_id, render_field_page(rows, padding_kb=1))
+
+    def test_field_choices_appear_once_the_field_is_stored(self):
+        self.assertEqual(field_choices.get(self.tournament), [])  # page built before the scrape
+        self.assertIsNone(cache.get(field_choices._key(self.tournament.pk)))
+
+        views._upsert_field_from_rows(self.tournament, [{"player": n, "tee_time": ""} for n in self.names])
+        self.assertEqual(field_choices.get(self.tournament), sorted(self.names))
+
+    def test_withdrawal_seen_only_in_the_pre_lock_scrape_uses_the_backup(self):
+        views._upsert_field_from_rows(self.tournament, [{"player": n, "tee_time": ""} for n in self.names])
+        primary, backup = self.names[:2]
+        pick = Pick.objects.create(
+            user=self.league.users[0], tournament=self.tournament,
+            primary_player=primary, backup_player=backup,
+        )
+        Tournament.objects.filter(pk=self.tournament.pk).update(
+            pick_lock_datetime=timezone.now() - timedelta(minutes=1),
+        )
+        # The primary drops off ESPN's field after the last regular field pull.
+        self._field_page([{"player": n, "tee_time": ""} for n in self.names[1:]])
+
+        IngestScheduler().run_once()
+        pick.refresh_from_db()
+        self.assertEqual(
+            (pick.status, pick.reason, pick.active_player),
+            ("locked", "primary_wd_pre_start", backup),
+        )
+        self.assertEqual(
+            TournamentField.objects.get(tournament=self.tournament, player__full_name=primary).status, "wd",
+        )
+
+    def test_ingest_stores_field_and_picks_never_scrape(self):
+        rows = [{"player": n, "tee_time": "7:45 AM"} for n in self.names[:-1]]
+        rows.append({"player": self.names[-1], "tee_time": "WD"})
+        self._field_page(rows)
+
+        IngestScheduler().run_once()
+        field = dict(
+            TournamentField.objects.filter(tournament=self.tournament)
+            .values_list("player__full_name", "status")
+        )
+        self.assertEqual(len(field), len(self.names))
+        self.assertEqual(field[self.names[-1]], "wd")
+        entry = TournamentField.objects.get(tournament=self.tournament, player__full_name=self.names[0])
+        self.assertEqual(timezone.localtime(entry.tee_time).strftime("%H:%M"), "07:45")
+
+        # A golfer missing from two pulls in a row is withdrawn; listed again, back in.
+        def status_of(name):
+            return TournamentField.objects.get(tournament=self.tournament, player__full_name=name).status
+
+        summary = views._upsert_field_from_rows(self.tournament, rows[1:])
+        self.assertEqual(summary, {"created": 0, "updated": 0, "unchanged": len(rows) - 1, "withdrawn": 0})
+        self.assertEqual(status_of(self.names[0]), "in_field")
+        summary = views._upsert_field_from_rows(self.tournament, rows[1:])
+        self.assertEqual(summary, {"created": 0, "updated": 0, "unchanged": len(rows) - 1, "withdrawn": 1})
+        self.assertEqual(status_of(self.names[0]), "wd")
+        self.assertNotIn(self.names[0], field_choices.get(self.tournament))
+
+        views._upsert_field_from_rows(self.tournament, rows)
+        self.assertEqual(status_of(self.names[0]), "in_field")
+        self.assertEqual(status_of(self.names[-1]), "wd")  # ESPN's own WD sticks
+
+        # A truncated page withdraws nobody, however often it comes back.
+        for _ in range(3):
+            with self.assertLogs("core.views", "WARNING"):
+                summary = views._upsert_field_from_rows(self.tournament, rows[:2])
+            self.assertEqual(summary["withdrawn"], 0)
+        self.assertEqual(
+            TournamentField.objects.filter(tournament=self.tournament, status="in_field").count(),
+            len(rows) - 1,
+        )
+
+        hits = len(self.espn.hits)
+        user = self.league.users[0]
+        used = set(used_players.get(user.pk, self.league.season.pk))
+        primary, backup = [n for n in self.names[1:-1] if names_key(n) not in used][:2]
+        request = RequestFactory().get("/")
+        request.user = user
+        self.assertEqual(views.make_picks(request, self.tournament.pk).status_code, 200)
+
+        request = RequestFactory().post("/", {"primary_player": primary, "backup_player": backup})
+        request.user = user
+        self.assertEqual(views.make_picks(request, self.tournament.pk).status_code, 302)
+        self.assertEqual(len(self.espn.hits), hits)
+        self.assertEqual(Pick.objects.get(user=user, tournament=self.tournament).active_player, primary)
+
+        request = RequestFactory().post("/", {"primary_player": self.names[-1]})
+        request.user = self.league.users[1]
+        self.assertEqual(views.make_picks(request, self.tournament.pk).status_code, 200)  # WD: not a choice
+
+
+class ESPNParseTests(SimpleTestCase):
+    def test_backends_agree_on_fixture_pages(self):
+        for kind in FIXTURE_KINDS:
+            html = load_espn_fixture(kind)
+            with override_settings(ESPN_PARSER="html.parser"):
+                expected = espn_parse.table_rows(html)
+            self.assertEqual(len(expected), 150)
+
+            if espn_parse.lxml_html is not None:
+                with override_settings(ESPN_PARSER="lxml"):
+                    self.assertEqual(espn_parse.table_rows(html), expected, kind)
+
+    def test_falls_back_to_full_parse_when_table_cannot_be_sliced(self):
+        html = load_espn_fixture("final")
+        # Unterminated table: slicing fails, BeautifulSoup still recovers it.
+        broken = html.replace("</table>", "")
+        self.assertIsNone(espn_parse.extract_table(broken))
+        self.assertEqual(len(espn_parse.table_rows(broken)), 150)
+
+    def test_decoy_and_layout_tables_are_skipped(self):
+        # Regression: the class name inside an earlier nav table used to slice
+        # out the nav table, and lxml returned its rows.
+        html = (FIXTURE_DIR / "decoy_table.html").read_text(encoding="utf-8")
+        self.assertTrue(espn_parse.extract_table(html).startswith('<table class="Table Full__Table">'))
+        if espn_parse.lxml_html is not None:
+            nav = '<table class="GlobalNav"><tbody><tr><td>Menu</td></tr></tbody></table>'
+            self.assertIsNone(espn_parse._rows_lxml(nav))
+
+        for parser in ("html.parser", "lxml"):
+            with override_settings(ESPN_PARSER=parser):
+                rows = espn_parse.table_rows(html)
+            self.assertEqual([[c.text for c in cells][1:3] for cells in rows], [["1", "Scottie Scheffler"]], parser)
+            self.assertEqual(rows[0][2].player, "Scottie Scheffler")
+
+    def test_page_without_leaderboard_table(self):
+        self.assertEqual(espn_parse.table_rows("<html><body><p>No event</p></body></html>"), [])
+
+
+class LoaderStub:
+    """ESPN fetcher stand-in: returns (or raises) the queued results in turn, counting calls."""
+
+    def __init__(self, *results, gate=None):
+        self.results = list(results)
+        self.gate = gate
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class LeaderboardCacheTests(SimpleTestCase):
+    rows = [{"PLAYER": "Zed Aberg", "POS": "1"}]
+    new_rows = [{"PLAYER": "Zed Aberg", "POS": "2"}]
+
+    def setUp(self):
+        cache.clear()
+        self.tournament = Tournament(pga_tournament_id="401")
+        self.key = leaderboard_cache._key(self.tournament, "live")
+
+    def wait_for_refreshes(self):
+        for thread in threading.enumerate():
+            if thread.name.startswith("espn-refresh-"):
+                thread.join(5)
+
+    def get(self, loader):
+        return leaderboard_cache.get_rows(self.tournament, "live", loader)
+
+    def test_cold_fetch_then_fresh_hits(self):
+        loader = LoaderStub(self.rows)
+        self.assertEqual(self.get(loader), self.rows)
+        self.assertEqual(self.get(loader), self.rows)
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(cache.get(self.key)["ttl"], leaderboard_cache.DEFAULT_TTLS["live"])
+
+    @override_settings(ESPN_CACHE_TTLS={"live": 0})
+    def test_stale_entry_served_while_refreshed_in_background(self):
+        self.get(LoaderStub(self.rows))
+        loader = LoaderStub(self.new_rows)
+        self.assertEqual(self.get(loader), self.rows)
+        self.wait_for_refreshes()
+        self.assertEqual(loader.calls, 1)
+        self.assertEqual(leaderboard_cache.peek_rows(self.tournament, "live"), self.new_rows)
+        self.assertIsNone(cache.get(f"{self.key}:lock"))
+
+    @override_settings(ESPN_CACHE_TTLS={"live": 0})
+    def test_one_refresh_in_flight_per_page(self):
+        self.get(LoaderStub(self.rows))
+        gate = threading.Event()
+        loader = LoaderStub(self.new_rows, self.new_rows, gate=gate)
+        try:
+            for _ in range(3):
+                self.assertEqual(self.get(loader), self.rows)
+        finally:
+            gate.set()
+        self.wait_for_refreshes()
+        self.assertEqual(loader.calls, 1)
+
+        # Another worker holds the refresh lock: serve stale rows, don't fetch.
+        cache.add(f"{self.key}:lock", 1)
+        loader = LoaderStub(self.new_rows)
+        self.assertEqual(self.get(loader), self.new_rows)
+        self.wait_for_refreshes()
+        self.assertEqual(loader.calls, 0)
+        self.assertNotIn(self.key, leaderboard_cache._inflight)
+
+    def test_empty_page_cached_for_empty_ttl(self):
+        loader = LoaderStub([], self.rows)
+        self.assertEqual(self.get(loader), [])
+        self.assertEqual(cache.get(self.key)["ttl"], leaderboard_cache.EMPTY_TTL)
+        self.assertEqual(self.get(loader), [])
+        self.assertEqual(loader.calls, 1)
+
+    @override_settings(ESPN_CACHE_TTLS={"live": 0})
+    def test_failed_or_empty_refresh_keeps_serving_old_rows(self):
+        self.get(LoaderStub(self.rows))
+        for result, level in ((RuntimeError("ESPN down"), "ERROR"), ([], "WARNING")):
+            with self.assertLogs("core.leaderboard_cache", level):
+                self.assertEqual(self.get(LoaderStub(result)), self.rows)
+                self.wait_for_refreshes()
+            self.assertEqual(leaderboard_cache.peek_rows(self.tournament, "live"), self.rows)
+            self.assertIsNone(cache.get(f"{self.key}:lock"))
+            self.assertNotIn(self.key, leaderboard_cache._inflight)
+
+
+class BackfillTests(FakeESPNMixin, TestCase):
+    def test_backfill_fetches_concurrently_and_persists_each_tournament(self):
+        Result.objects.filter(tournament__in=self.league.completed).delete()
+        for t in self.league.completed:
+            rows = final_rows_for_field(self.league.fields[t.pk], 9_000_000, random.Random(t.pk))
+            self.espn.set_page(t.pga_tournament_id, render_final_page(rows, padding_kb=1))
+
+        seen = []
+        reports = backfill_results(self.league.completed, workers=3, rate=0, progress=seen.append)
+
+        self.assertEqual(len(seen), len(self.league.completed))
+        for r in reports:
+            self.assertIsNone(r["error"])
+            self.assertEqual(r["created"], r["rows"])
+            self.assertEqual(Result.objects.filter(tournament=r["tournament"]).count(), r["rows"])
+
+
+@override_settings(ADMIN_JOBS_BACKGROUND=False, ADMIN_JOBS_ESPN_RATE=0)
+class AdminJobTests(FakeESPNMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        User = self.league.users[0].__class__
+        self.client.force_login(User.objects.create_superuser("commish", "c@example.com", "x"))
+
+    def _run_action(self, action, tournaments):
+        response = self.client.post("/admin/core/tournament/", {
+            "action": action, "_selected_action": [t.pk for t in tournaments],
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        job_url = re.search(r'href="(/admin/core/tournament/jobs/\w+/)"', response.content.decode()).group(1)
+        return self.client.get(job_url).json()
+
+    def test_refresh_action_reports_per_tournament_timing(self):
+        Result.objects.filter(tournament__in=self.league.completed).delete()
+        for t in self.league.completed:
+            rows = final_rows_for_field(self.league.fields[t.pk], 9_000_000, random.Random(t.pk))
+            self.espn.set_page(t.pga_tournament_id, render_final_page(rows, padding_kb=1))
+
+        job = self._run_action("refresh_results", self.league.completed)
+        self.assertEqual((job["state"], job["total"], job["done"], job["failed"]),
+                         ("done", len(self.league.completed), len(self.league.completed), 0))
+        for report in job["reports"]:
+            self.assertEqual(report["created"], report["rows"])
+            self.assertGreaterEqual(report["seconds"], 0)
+            self.assertEqual(Result.objects.filter(tournament_id=report["tournament_id"]).count(), report["rows"])
+
+    def test_per_process_cache_is_flagged(self):
+        response = self.client.post("/admin/core/tournament/", {
+            "action": "recompute_earnings", "_selected_action": [self.league.completed[0].pk],
+        }, follow=True)
+        self.assertContains(response, "job progress is only visible from the worker that started it")
+        response = self.client.get("/admin/core/tournament/jobs/gone/")
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("per-process", response.json()["error"])
+
+    def test_recompute_action_fixes_pick_earnings(self):
+        t = self.league.completed[0]
+        pick = Pick.objects.filter(tournament=t, earnings__gt=0).first()
+        Pick.objects.filter(pk=pick.pk).update(earnings=1)
+
+        # Stats rows that drifted from the picks (e.g. an old hand fix).
+        UserSeasonStats.objects.filter(season=self.league.season).update(total_earnings=1, weekly_wins=9)
+
+        job = self._run_action("recompute_earnings", [t])
+        self.assertEqual(job["reports"][0]["changed"], 1)
+        self.assertEqual(Pick.objects.get(pk=pick.pk).earnings, pick.earnings)
+
+        expected = sorted(
+            (r["user"].pk, r["points"], r["majors"], r["events"], r["wins"], r["top5"], r["top10"], r["cashes"])
+            for r in season_standings(self.league.season)
+        )
+        self.assertEqual(_stats_rows(self.league.season), expected)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, exports, views
 
 app_name = "core"
 
@@ -13,5 +13,17 @@ urlpatterns = [
     path("standings/", views.standings, name="standings"),
     path("signup/", views.signup, name="signup"),
     path("tournaments/<int:pk>/results/", views.tournament_results, name="tournament_results"),
+    path("tournaments/<int:pk>/live/", views.live_leaderboard_stream, name="live_leaderboard_stream"),
+    path("tournaments/<int:pk>/live/changes/", views.leaderboard_changes, name="leaderboard_changes"),
     path("results/", views.results_overview, name="results_overview"),
+    path("metrics/", views.view_metrics, name="view_metrics"),
+
+    # Read-only JSON API
+    path("api/standings/", api.standings, name="api_standings"),
+    path("api/leaderboard/", api.leaderboard, name="api_leaderboard"),
+    path("api/tournaments/<int:pk>/results/", api.tournament_results, name="api_tournament_results"),
+    path("api/tournaments/<int:pk>/picks/", api.tournament_picks, name="api_tournament_picks"),
+
+    # Streaming CSV / JSON-lines exports (staff)
+    path("exports/<str:dataset>/", exports.export, name="export"),
 ]
@@ -0,0 +1,78 @@
+# core/used_players.py
+"""
+Per-user, per-season index of golfers already used in picks.
+
+The index maps each golfer the user has picked in the season (by names.key,
+so accent / suffix / alias spellings count as the same golfer) to the
+tournament id of that pick. It lives in Django's cache so the make_picks dropdown and
+pick validation cost one cache hit instead of a query per golfer. It is dropped by
+the Pick post_save / post_delete signals (see signals.py); code that changes
+active_player without saving through the ORM (queryset.update, bulk_update)
+must call invalidate() / invalidate_many() itself.
+
+The cache may be per process, so a pick saved by another worker can be
+missing from it: PickForm only trusts the cache to reject a golfer and
+confirms every accepted pick with get(..., fresh=True).
+"""
+from django.core.cache import cache
+from django.db.models import Q
+
+from . import names
+from .models import Pick
+
+
+# Entries are rebuilt on the next read after any pick change, so this only
+# bounds how long an idle user's index stays around.
+TTL = 24 * 60 * 60
+
+
+def _key(user_id, season_id) -> str:
+    return f"used-players:{season_id}:{user_id}"
+
+
+def get(user_id, season_id, fresh=False) -> dict:
+    """
+    {names.key(active_player): tournament_id} for the user's picks in the season.
+
+    fresh=True skips the cached copy and re-reads the picks (one query),
+    storing the result for later reads.
+    """
+    key = _key(user_id, season_id)
+    used = None if fresh else cache.get(key)
+    if used is None:
+        used = {
+            names.key(name): tournament_id
+            for name, tournament_id in (
+                Pick.objects
+                # Picks from before the season column was added have no season
+                # until backfill_season_keys runs; match those by tournament.
+                .filter(Q(season_id=season_id) | Q(season__isnull=True, tournament__season_id=season_id))
+                .filter(user_id=user_id)
+                .exclude(active_player__isnull=True)
+                .exclude(active_player="")
+                .values_list("active_player", "tournament_id")
+            )
+        }
+        cache.set(key, used, timeout=TTL)
+    return used
+
+
+def is_used(used: dict, name: str, tournament) -> bool:
+    """True if name was used in another tournament (re-saving this one is fine)."""
+    tournament_id = used.get(names.key(name))
+    return tournament_id is not None and tournament_id != tournament.pk
+
+
+def available(player_names, used: dict, tournament):
+    """player_names minus the golfers the user can no longer pick for tournament."""
+    return [name for name in player_names if not is_used(used, name, tournament)]
+
+
+def invalidate(user_id, season_id):
+    cache.delete(_key(user_id, season_id))
+
+
+def invalidate_many(user_ids, season_id):
+    keys = [_key(user_id, season_id) for user_id in user_ids]
+    if keys:
+        cache.delete_many(keys)
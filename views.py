@@ -1,24 +1,35 @@
+import logging
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
-from collections import Counter
 
 from decimal import Decimal
-from django.db.models import Sum
-from django.shortcuts import render
-from django.db.models import Q
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
-from django.db.models import Sum,Count
+from django.db import transaction
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from .services import sync_tournament_earnings
+from . import (
+    espn_client, espn_parse, field_choices, leaderboard_cache, live_stream, names, season_cache,
+    snapshots, used_players,
+)
+from .espn_parse import cell_text
+from .names import normalize_name
+from .middleware import snapshot as metrics_snapshot
+from .services import season_leaderboard, stored_standings, sync_tournament_earnings
 from .models import Season, Tournament, Pick, Player, Result
 from .forms import PickForm
 
+
+logger = logging.getLogger(__name__)
+
+
 def _day_suffix(day: int) -> str:
     if 11 <= day <= 13:
         return "th"
@@ -52,13 +63,42 @@ def _pretty_datetime(iso_str: str) -> str:
 
 @login_required
 def dashboard(request):
-    # Be a bit safer in case no active season
-    try:
-        season = Season.objects.get(is_active=True)
-    except Season.DoesNotExist:
-        season = None
+    """
+    Landing page. Fixed query budget regardless of league size:
+    1) active season + league counts, 2) next tournaments + this user's pick,
+    3) leaderboard (season pickers + UserSeasonStats; cached until the season changes).
+    """
     User = get_user_model()
 
+    # ----- Query 1: season, with league-size counts as scalar subqueries -----
+    season_pickers = (
+        Pick.objects
+        .filter(season=OuterRef("pk"))
+        .order_by()
+        .values("season")
+        .annotate(c=Count("user", distinct=True))
+        .values("c")
+    )
+    all_users = (
+        User.objects
+        .order_by()
+        .annotate(one=Value(1))
+        .values("one")
+        .annotate(c=Count("pk"))
+        .values("c")
+    )
+    # Be a bit safer in case no active season
+    season = (
+        Season.objects
+        .filter(is_active=True)
+        .annotate(
+            season_pickers=Subquery(season_pickers, output_field=IntegerField()),
+            user_count=Subquery(all_users, output_field=IntegerField()),
+        )
+        .order_by("-year")
+        .first()
+    )
+
     upcoming_tournaments = []
     total_earnings = 0
     leaderboard = []
@@ -67,30 +107,43 @@ def dashboard(request):
     pot_total = participants_count * 100
 
     if season:
-        # NEXT 3 UPCOMING TOURNAMENTS
-        upcoming_tournaments = (
+        # ----- Query 2: NEXT 3 UPCOMING TOURNAMENTS (+ this user's pick, pick counts) -----
+        user_pick = Pick.objects.filter(user=request.user, tournament=OuterRef("pk"))
+        pick_counts = (
+            Pick.objects
+            .filter(tournament=OuterRef("pk"))
+            .order_by()
+            .values("tournament")
+            .annotate(c=Count("user", distinct=True))
+            .values("c")
+        )
+        upcoming_tournaments = list(
             Tournament.objects
-            .filter(season=season, status="upcoming")
+            .filter(season=season)
+            .upcoming()
+            .annotate(
+                user_pick_player=Subquery(
+                    user_pick.annotate(
+                        name=Coalesce("active_player", "primary_player")
+                    ).values("name")[:1]
+                ),
+                user_backup_player=Subquery(user_pick.values("backup_player")[:1]),
+                user_has_pick=Exists(user_pick),
+                pickers=Coalesce(Subquery(pick_counts, output_field=IntegerField()), 0),
+            )
             .order_by("start_date")[:3]
         )
 
-        # all picks in this season
-        season_picks = Pick.objects.filter(tournament__season=season)
-        participants_count = User.objects.count()
+        participants_count = season.user_count or 0
 
-        # current user's season total (used by hero + KPI)
-        user_picks = season_picks.filter(user=request.user)
-        total_earnings = (
-            user_picks.aggregate(total=Sum("earnings"))["total"]
-            or 0
-        )
+        # ----- Query 3: leaderboard for all users this season (season cache) -----
+        # Everyone with a pick this season; nothing scored yet shows as 0.
+        leaderboard = season_cache.get_or_set(season.pk, "leaderboard", lambda: season_leaderboard(season))
 
-        # leaderboard for all users this season
-        leaderboard = (
-            season_picks
-            .values("user__username")
-            .annotate(total_earnings=Sum("earnings"))
-            .order_by("-total_earnings", "user__username")
+        # current user's season total (used by hero + KPI)
+        total_earnings = next(
+            (row["total_earnings"] for row in leaderboard if row["user_id"] == request.user.pk),
+            0,
         )
 
         # ----- KPI #3: Earnings Away From 1st -----
@@ -109,35 +162,13 @@ def dashboard(request):
 
         if current_tournament:
             # ----- KPI #1: Current Pick (+ Backup) -----
-            user_pick = (
-                Pick.objects
-                .filter(user=request.user, tournament=current_tournament)
-                .first()
-            )
-
-            # Try a few likely field names so it doesn't crash regardless of exact model
-            if user_pick:
-                current_pick_name = (
-                    getattr(user_pick, "player", None)
-                    or getattr(user_pick, "player_name", None)
-                    or getattr(user_pick, "pick", None)
-                )
-
-                current_backup_name = (
-                    getattr(user_pick, "backup_player", None)
-                    or getattr(user_pick, "backup_player_name", None)
-                    or getattr(user_pick, "backup", None)
-                )
+            if current_tournament.user_has_pick:
+                current_pick_name = current_tournament.user_pick_player
+                current_backup_name = current_tournament.user_backup_player
 
             # ----- KPI #4: Missing Picks (This Week) -----
-            participants_count = season_picks.values("user").distinct().count()
-            picks_this_event = (
-                Pick.objects
-                .filter(tournament=current_tournament)
-                .values("user")
-                .distinct()
-                .count()
-            )
+            participants_count = season.season_pickers or 0
+            picks_this_event = current_tournament.pickers
             missing_picks_this_week = max(participants_count - picks_this_event, 0)
 
         # build KPI dict for template
@@ -182,6 +213,7 @@ def signup(request):
 
     return render(request, "core/signup.html", {"form": form})
 
+
 @login_required
 def my_picks(request):
     season = (
@@ -203,51 +235,42 @@ def my_picks(request):
 
     if season:
         # All your picks in this season (for display)
-        picks = (
+        picks = list(
             Pick.objects
-            .filter(user=request.user, tournament__season=season)
+            .filter(season=season, user=request.user)
             .select_related("tournament")
             .order_by("tournament__start_date")
         )
 
-        # ALL league picks for ALL tournaments in the season
+        # ALL league picks for ALL tournaments in the season (lazy; the
+        # template iterates it)
         league_picks = (
             Pick.objects
-            .filter(tournament__season=season)
+            .filter(season=season)
             .select_related("tournament", "user")
             .order_by("tournament__start_date", "user__username")
         )
 
         # Tournaments that have results (i.e., scored events)
-        completed_events_qs = (
-            Tournament.objects
-            .filter(season=season, results__isnull=False)
+        completed_event_ids = season_cache.get_or_set(season.pk, "scored_tournaments", lambda: set(
+            Result.objects
+            .filter(season=season)
+            .order_by()
+            .values_list("tournament_id", flat=True)
             .distinct()
-        )
-        total_completed_events = completed_events_qs.count()
+        ))
+        total_completed_events = len(completed_event_ids)
 
-        # Your picks ONLY for tournaments that have results
-        completed_picks = (
-            picks.filter(tournament__in=completed_events_qs)
-            .order_by("tournament__start_date")
-        )
+        # Your picks ONLY for tournaments that have results (ordered ascending)
+        completed_picks = [p for p in picks if p.tournament_id in completed_event_ids]
 
         # Total Events Played (completed events where you actually picked)
-        total_events_played = (
-            completed_picks
-            .values("tournament")
-            .distinct()
-            .count()
-        )
+        total_events_played = len({p.tournament_id for p in completed_picks})
 
         # Total Cuts Made (completed events where earnings > 0)
-        total_cuts_made = (
-            completed_picks
-            .filter(earnings__gt=0)
-            .values("tournament")
-            .distinct()
-            .count()
-        )
+        total_cuts_made = len({
+            p.tournament_id for p in completed_picks if p.earnings and p.earnings > 0
+        })
 
         # Total Events Missed (completed events where you had NO pick)
         total_events_missed = max(
@@ -263,8 +286,7 @@ def my_picks(request):
 
         # Streak of Made Cuts (from most recent completed pick backwards)
         cut_streak = 0
-        completed_list = list(completed_picks)  # ordered ascending
-        for pick in reversed(completed_list):
+        for pick in reversed(completed_picks):
             if pick.earnings and pick.earnings > 0:
                 cut_streak += 1
             else:
@@ -293,11 +315,17 @@ def make_picks(request, pk):
     if timezone.now() >= tournament.pick_lock_datetime:
         return redirect("core:tournament_detail", pk=tournament.pk)
 
-    field_data = fetch_espn_leaderboard(tournament)
-    player_names = [row["player"] for row in field_data if row.get("player")]
+    # The field the ingest worker stored; scrape it only as a last resort.
+    player_names = field_choices.get(tournament)
+    if not player_names and _inline_fetch_enabled():
+        field_data = fetch_espn_leaderboard(tournament)
+        if field_data:
+            _upsert_field_from_rows(tournament, field_data)
+            player_names = field_choices.get(tournament)
 
-    # Convert list into Django "choices"
-    choices = [(name, name) for name in player_names]
+    # Hide golfers the user already used this season (PickForm.clean rejects them anyway)
+    used = used_players.get(request.user.pk, tournament.season_id)
+    player_names = used_players.available(player_names, used, tournament)
 
     existing_pick = Pick.objects.filter(user=request.user, tournament=tournament).first()
 
@@ -307,10 +335,8 @@ def make_picks(request, pk):
             user=request.user,
             tournament=tournament,
             instance=existing_pick,
-            )
-
-        form.fields["primary_player"].choices = choices
-        form.fields["backup_player"].choices = choices
+            player_names=player_names,
+        )
 
         if form.is_valid():
             pick = form.save(commit=False)
@@ -326,61 +352,97 @@ def make_picks(request, pk):
             user=request.user,
             tournament=tournament,
             instance=existing_pick,
+            player_names=player_names,
         )
 
-        form.fields["primary_player"].choices = choices
-        form.fields["backup_player"].choices = choices
-
-
     return render(
         request,
         "core/make_picks.html",
         {"tournament": tournament, "form": form},
     )
 
-def fetch_espn_leaderboard(tournament):
+def _espn_base_url() -> str:
+    """ESPN host; point ESPN_BASE_URL at a fake server in tests."""
+    return getattr(settings, "ESPN_BASE_URL", "https://www.espn.com").rstrip("/")
+
+
+def _inline_fetch_enabled() -> bool:
+    """
+    Views only read the cache / database unless ESPN_INLINE_FETCH is on.
+    The ingest_espn management command keeps that data fresh.
+    """
+    return getattr(settings, "ESPN_INLINE_FETCH", False)
+
+
+def fetch_espn_leaderboard(tournament, refresh=False, persist=False):
+    """
+    ESPN field for a given Tournament, served from the shared leaderboard cache.
+    Returns a list of dicts: {"player": ..., "tee_time": ...}
+    If persist=True, every fresh scrape is also written into TournamentField
+    (cache hits skip the write).
+    """
+    return leaderboard_cache.get_rows(
+        tournament, "field",
+        lambda: _scrape_espn_leaderboard(tournament, persist=persist),
+        refresh=refresh,
+    )
+
+
+def refresh_field_before_lock(tournament):
+    """
+    Re-scrape a tournament's ESPN field and store it just before its picks
+    lock. Golfers missing from this page count as withdrawn straight away
+    (not after FIELD_DROP_AFTER scrapes), so a WD in the hours before the
+    lock still swaps in the backup. On a failed or empty scrape the stored
+    field is left as is.
+    """
+    rows = _scrape_espn_leaderboard(tournament)
+    if not rows:
+        return
+    try:
+        _upsert_field_from_rows(tournament, rows, drop_after=1)
+    except Exception:
+        logger.exception("pre-lock field refresh for %s failed", tournament)
+        return
+    leaderboard_cache.put_rows(tournament, "field", rows)
+
+
+def _scrape_espn_leaderboard(tournament, persist=False):
     """
     Scrape ESPN leaderboard for a given Tournament using tournament.pga_tournament_id.
     Returns a list of dicts: {"player": ..., "tee_time": ...}
+    If persist=True, also upserts the field into TournamentField.
     """
     if not tournament.pga_tournament_id:
         return []
 
-    url = f"https://www.espn.com/golf/leaderboard?tournamentId={tournament.pga_tournament_id}"
+    url = f"{_espn_base_url()}/golf/leaderboard?tournamentId={tournament.pga_tournament_id}"
 
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=5,
-        )
-        resp.raise_for_status()
+        rows = espn_client.get_client().get_parsed(url, _parse_field_rows)
     except requests.RequestException:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    table = soup.select_one("table.Full__Table")
-    if not table:
-        return []
+    if persist and rows:
+        _upsert_field_from_rows(tournament, rows)
+
+    return rows
 
-    def safe_text(tds, idx):
-        return tds[idx].get_text(strip=True) if len(tds) > idx else ""
 
+def _parse_field_rows(html):
     rows = []
-    for tr in table.select("tbody tr"):
-        tds = tr.find_all("td")
+    for tds in espn_parse.table_rows(html):
         # skip garbage/short rows
         if len(tds) < 2:
             continue
 
         # Player name is in col 1
-        name_tag = tds[1].select_one("a.leaderboard_player_name")
-        player = name_tag.get_text(strip=True) if name_tag else safe_text(tds, 2)
+        player = tds[1].player or cell_text(tds, 2)
         if not player:
             continue
 
         # col 2 (idx 2) is usually tee time / score / status; safe if missing
-        tee_info = safe_text(tds, 1)
+        tee_info = cell_text(tds, 1)
 
         rows.append({
             "player": player,
@@ -389,7 +451,19 @@ def fetch_espn_leaderboard(tournament):
 
     return rows
 
-def fetch_espn_results(tournament, persist=False):
+def fetch_espn_results(tournament, persist=False, refresh=False):
+    """
+    ESPN final results for a completed tournament, served from the shared
+    leaderboard cache. If persist=True, every fresh scrape is also written
+    into Result and synced to Pick.earnings (cache hits skip the write).
+    """
+    def load():
+        return _scrape_espn_results(tournament, persist=persist)
+
+    return leaderboard_cache.get_rows(tournament, "final", load, refresh=refresh)
+
+
+def _scrape_espn_results(tournament, persist=False):
     """
     Scrape ESPN final results for a completed tournament.
     Uses the /_/tournamentId/{id} URL.
@@ -399,41 +473,34 @@ def fetch_espn_results(tournament, persist=False):
     if not tournament.pga_tournament_id:
         return []
 
-    url = f"https://www.espn.com/golf/leaderboard/_/tournamentId/{tournament.pga_tournament_id}"
+    url = f"{_espn_base_url()}/golf/leaderboard/_/tournamentId/{tournament.pga_tournament_id}"
 
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=5,
-        )
-        resp.raise_for_status()
+        rows = espn_client.get_client().get_parsed(url, _parse_result_rows)
     except requests.RequestException:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    table = soup.select_one("table.Full__Table")
-    if not table:
-        return []
+    if persist:
+        _upsert_results_from_rows(tournament, rows)
+
+    return rows
 
-    def safe(tds, idx):
-        return tds[idx].get_text(strip=True) if len(tds) > idx else ""
 
+def _parse_result_rows(html):
     rows = []
-    for tr in table.select("tbody tr"):
-        tds = tr.find_all("td")
+    for tds in espn_parse.table_rows(html):
         if len(tds) < 3:
             continue
 
-        pos = safe(tds, 1)
-        player = safe(tds, 2)
+        pos = cell_text(tds, 1)
+        player = cell_text(tds, 2)
 
-        r1 = safe(tds, 4)
-        r2 = safe(tds, 5)
-        r3 = safe(tds, 6)
-        r4 = safe(tds, 7)
-        total = safe(tds, 8)
-        earnings = safe(tds, 9)
+        r1 = cell_text(tds, 4)
+        r2 = cell_text(tds, 5)
+        r3 = cell_text(tds, 6)
+        r4 = cell_text(tds, 7)
+        total = cell_text(tds, 8)
+        earnings = cell_text(tds, 9)
 
         rows.append({
             "Player": player,
@@ -446,13 +513,22 @@ def fetch_espn_results(tournament, persist=False):
             "Earnings": earnings,
         })
 
-    if persist:
-        _upsert_results_from_rows(tournament, rows)
-
     return rows
 
 
-def fetch_current_leaderboard(tournament):
+def fetch_current_leaderboard(tournament, refresh=False):
+    """
+    ESPN's current leaderboard for an in-progress tournament, served from the
+    shared leaderboard cache (short TTL, refreshed in the background).
+    """
+    return leaderboard_cache.get_rows(
+        tournament, "live",
+        lambda: _scrape_current_leaderboard(tournament),
+        refresh=refresh,
+    )
+
+
+def _scrape_current_leaderboard(tournament):
     """
     Scrape ESPN's current leaderboard for an in-progress tournament.
     Returns list of dicts with:
@@ -461,43 +537,31 @@ def fetch_current_leaderboard(tournament):
     if not tournament.pga_tournament_id:
         return []
 
-    url = f"https://www.espn.com/golf/leaderboard/_/tournamentId/{tournament.pga_tournament_id}"
+    url = f"{_espn_base_url()}/golf/leaderboard/_/tournamentId/{tournament.pga_tournament_id}"
 
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=5,
-        )
-        resp.raise_for_status()
+        return espn_client.get_client().get_parsed(url, _parse_live_rows)
     except requests.RequestException:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    table = soup.select_one("table.Full__Table")
-    if not table:
-        return []
-
-    def safe(tds, idx):
-        return tds[idx].get_text(strip=True) if len(tds) > idx else ""
 
+def _parse_live_rows(html):
     rows = []
-    for tr in table.select("tbody tr"):
-        tds = tr.find_all("td")
+    for tds in espn_parse.table_rows(html):
         if len(tds) < 5:
             continue
 
-        pos = safe(tds, 1)
-        player = safe(tds, 3)
-        score = safe(tds, 4)
-        today = safe(tds, 5)
-        thru = safe(tds, 6)
+        pos = cell_text(tds, 1)
+        player = cell_text(tds, 3)
+        score = cell_text(tds, 4)
+        today = cell_text(tds, 5)
+        thru = cell_text(tds, 6)
 
-        r1 = safe(tds, 7)
-        r2 = safe(tds, 8)
-        r3 = safe(tds, 9    )
-        r4 = safe(tds, 10)
-        total = safe(tds, 11)
+        r1 = cell_text(tds, 7)
+        r2 = cell_text(tds, 8)
+        r3 = cell_text(tds, 9    )
+        r4 = cell_text(tds, 10)
+        total = cell_text(tds, 11)
 
         rows.append({
             "POS": pos,
@@ -532,12 +596,53 @@ def tournament_results(request, pk):
         },
     )
 
+@login_required
+def live_leaderboard_stream(request, pk):
+    """
+    Server-Sent Events: live leaderboard deltas for an in-progress tournament
+    (see live_stream). 204 once the event isn't live, which tells
+    EventSource to stop reconnecting; 503 + Retry-After when this process
+    already serves LIVE_STREAM_MAX_CLIENTS streams (poll leaderboard_changes).
+    Each stream holds a worker thread: needs a threaded or async worker.
+    """
+    tournament = get_object_or_404(Tournament, pk=pk)
+    if tournament.status != "in_progress":
+        return HttpResponse(status=204)
+
+    messages = live_stream.open_stream(tournament, last_event_id=request.headers.get("Last-Event-ID"))
+    if messages is None:
+        response = HttpResponse("Too many live streams; poll the changes endpoint.", status=503)
+        response["Retry-After"] = "30"
+        return response
+
+    response = StreamingHttpResponse(messages, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
+
+
+@login_required
+def leaderboard_changes(request, pk):
+    """
+    JSON: live board changes after snapshot ?since=N (see snapshots.changes_since);
+    the full board when since is missing or was pruned.
+    """
+    tournament = get_object_or_404(Tournament, pk=pk)
+    try:
+        since = int(request.GET.get("since") or 0)
+    except ValueError:
+        since = 0
+    return JsonResponse(snapshots.changes_since(tournament, since or None))
+
+
 def get_espn_leaderboard_for_tournament(tournament):
-    if (tournament.status or "").lower().strip() == "cancelled":
+    # Stored status, kept current by services.sync_tournament_statuses.
+    status = tournament.status
+    if status == "cancelled":
         return "field", []
 
-    status = tournament.status_auto
-    print("DEBUG status_auto:", status, "id:", tournament.id)
+    if not _inline_fetch_enabled():
+        return _stored_leaderboard_for_tournament(tournament, status)
 
     if status == "in_progress":
         mode = "live"
@@ -553,6 +658,77 @@ def get_espn_leaderboard_for_tournament(tournament):
     return mode, results
 
 
+def _stored_leaderboard_for_tournament(tournament, status):
+    """
+    Same contract as get_espn_leaderboard_for_tournament, but only reads what
+    the ingest worker stored: the leaderboard cache, then the database (the
+    worker's cache entries may live in another process). An empty cache
+    entry (an ESPN response that parsed to nothing) counts as a miss.
+    """
+    if status == "in_progress":
+        rows = leaderboard_cache.peek_rows(tournament, "live")
+        if not rows:
+            snapshot = snapshots.latest(tournament)
+            rows = snapshots.unpack(snapshot.rows) if snapshot else []
+        return "live", rows
+
+    if status == "completed":
+        rows = leaderboard_cache.peek_rows(tournament, "final")
+        if not rows:
+            rows = _result_rows_from_db(tournament)
+        return "final", rows
+
+    rows = leaderboard_cache.peek_rows(tournament, "field")
+    if not rows:
+        rows = _field_rows_from_db(tournament)
+    return "field", rows
+
+
+def _field_rows_from_db(tournament):
+    """Rebuild fetch_espn_leaderboard-shaped rows from the stored TournamentField."""
+    from .models import TournamentField  # local import to avoid cycles
+
+    entries = (
+        TournamentField.objects
+        .filter(tournament=tournament)
+        .select_related("player")
+        .order_by("tee_time", "player__full_name")
+    )
+    rows = []
+    for entry in entries:
+        if entry.status != "in_field":
+            tee_info = entry.status.upper()  # "WD" / "DQ", as ESPN shows them
+        elif entry.tee_time:
+            tee_info = f"{timezone.localtime(entry.tee_time):%I:%M %p}".lstrip("0")
+        else:
+            tee_info = ""
+        rows.append({"player": entry.player.full_name, "tee_time": tee_info})
+    return rows
+
+
+def _result_rows_from_db(tournament):
+    """Rebuild fetch_espn_results-shaped rows from persisted Results."""
+    results = (
+        Result.objects
+        .filter(tournament=tournament)
+        .select_related("player")
+        .order_by("-earnings", "player__full_name")
+    )
+    return [
+        {
+            "Player": r.player.full_name,
+            "Pos": r.position,
+            "R1": "",
+            "R2": "",
+            "R3": "",
+            "R4": "",
+            "Total": "" if r.made_cut else r.position,
+            "Earnings": f"${r.earnings:,.0f}" if r.earnings else "--",
+        }
+        for r in results
+    ]
+
+
 @login_required
 def tournament_list(request):
     """
@@ -616,16 +792,183 @@ def _parse_earnings(val: str) -> Decimal:
         return Decimal("0")
 
 
+def _result_fingerprint(position, made_cut, earnings):
+    """Comparable snapshot of the Result columns ESPN controls."""
+    return (position or "", bool(made_cut), Decimal(earnings or 0).quantize(Decimal("0.01")))
+
+
+def _player_ids_for(player_names):
+    """
+    {name: Player id} for ESPN spellings, creating Players for the ones no
+    Player / PlayerAlias matches. Call inside the caller's transaction.
+    """
+    from .models import PlayerAlias  # local import to avoid cycles
+
+    player_ids = names.resolve_many(player_names)
+    missing = [name for name in player_names if name not in player_ids]
+    if missing:
+        # One new Player per normalized name; other spellings become aliases.
+        spellings = {}
+        for name in missing:
+            spellings.setdefault(normalize_name(name), []).append(name)
+
+        new_players = []
+        for name, *_ in spellings.values():
+            first, *rest = name.split()
+            new_players.append(Player(
+                full_name=name,
+                normalized_name=normalize_name(name),  # bulk_create skips save()
+                first_name=first,
+                last_name=" ".join(rest) or None,
+            ))
+        Player.objects.bulk_create(new_players, ignore_conflicts=True)
+        # ignore_conflicts doesn't hand back pks on every backend; re-read.
+        created = dict(
+            Player.objects
+            .filter(full_name__in=[p.full_name for p in new_players])
+            .values_list("full_name", "id")
+        )
+
+        aliases = []
+        for name, *others in spellings.values():
+            player_id = created[name]
+            for spelling in (name, *others):
+                player_ids[spelling] = player_id
+            aliases.extend(
+                PlayerAlias(player_id=player_id, name=other, normalized_name=normalize_name(other))
+                for other in others
+            )
+            names.index.add(player_id, name, *others)
+        if aliases:
+            PlayerAlias.objects.bulk_create(aliases, ignore_conflicts=True)
+    return player_ids
+
+
+def _parse_tee_time(tournament, text):
+    """ESPN's "7:45 AM" as an aware datetime on the first round's day, else None."""
+    try:
+        clock = datetime.strptime((text or "").strip().upper(), "%I:%M %p").time()
+    except ValueError:
+        return None
+    return timezone.make_aware(datetime.combine(tournament.start_date, clock))
+
+
+# A golfer missing from this many scrapes in a row is marked withdrawn.
+FIELD_DROP_AFTER = 2
+# A page listing fewer than this share of the stored field is treated as
+# truncated: nobody is counted as missing from it.
+FIELD_PARTIAL_RATIO = 0.5
+
+
+def _upsert_field_from_rows(tournament, rows, drop_after=FIELD_DROP_AFTER):
+    """
+    Take rows from fetch_espn_leaderboard and upsert them into TournamentField.
+
+    Golfers ESPN lists as WD / DQ get that status. An in-field golfer who is
+    missing from drop_after scrapes in a row is marked withdrawn, and
+    that automatic withdrawal is cleared again if ESPN lists them later; a
+    page much smaller than the stored field counts as partial and drops
+    nobody. Only rows that changed are written, with bulk_create /
+    bulk_update in one transaction.
+
+    Returns {"created": n, "updated": n, "unchanged": n, "withdrawn": n}.
+    """
+    from .models import TournamentField  # local import to avoid cycles
+
+    parsed = {}
+    for row in rows:
+        name = (row.get("player") or "").strip()
+        if not name:
+            continue
+        tee_info = (row.get("tee_time") or "").strip()
+        status = {"WD": "wd", "DQ": "dq"}.get(tee_info.upper(), "in_field")
+        parsed[name] = (_parse_tee_time(tournament, tee_info), status)
+
+    summary = {"created": 0, "updated": 0, "unchanged": 0, "withdrawn": 0}
+    if not parsed:
+        return summary
+
+    with transaction.atomic():
+        player_ids = _player_ids_for(parsed)
+
+        # Two spellings of one golfer are one row; the first ESPN lists wins.
+        by_player = {}
+        for name, values in parsed.items():
+            by_player.setdefault(player_ids[name], values)
+
+        existing = {
+            f.player_id: f
+            for f in TournamentField.objects.filter(tournament=tournament)
+        }
+
+        to_create = {}
+        to_update = {}
+        for player_id, (tee_time, status) in by_player.items():
+            entry = existing.get(player_id)
+            if entry is None:
+                to_create[player_id] = TournamentField(
+                    tournament=tournament, player_id=player_id, tee_time=tee_time, status=status,
+                )
+                continue
+
+            auto_wd = entry.status == "wd" and entry.missed_scrapes >= 1
+            if entry.status != "in_field" and not auto_wd:
+                status = entry.status  # ESPN's or the admin's WD / DQ sticks
+            tee_time = tee_time or entry.tee_time
+            if (entry.tee_time, entry.status, entry.missed_scrapes) == (tee_time, status, 0):
+                summary["unchanged"] += 1
+                continue
+            entry.tee_time, entry.status, entry.missed_scrapes = tee_time, status, 0
+            to_update[player_id] = entry
+        updated = len(to_update)
+
+        missing = [f for pid, f in existing.items() if pid not in by_player and f.status == "in_field"]
+        in_field = sum(1 for f in existing.values() if f.status == "in_field")
+        withdrawn = 0
+        if len(by_player) >= in_field * FIELD_PARTIAL_RATIO:
+            for entry in missing:
+                entry.missed_scrapes += 1
+                if entry.missed_scrapes >= drop_after:
+                    entry.status = "wd"
+                    withdrawn += 1
+                to_update[entry.player_id] = entry
+        else:
+            logger.warning(
+                "field page for %s lists %d of %d golfers; not treating the rest as withdrawn",
+                tournament, len(by_player), in_field,
+            )
+
+        if to_create:
+            TournamentField.objects.bulk_create(to_create.values(), batch_size=500)
+        if to_update:
+            TournamentField.objects.bulk_update(
+                to_update.values(), ["tee_time", "status", "missed_scrapes"], batch_size=500,
+            )
+
+        summary["created"] = len(to_create)
+        summary["updated"] = updated
+        summary["withdrawn"] = withdrawn
+        if to_create or to_update:
+            field_choices.invalidate(tournament.pk)  # bulk writes send no signals
+
+    return summary
+
+
 def _upsert_results_from_rows(tournament, rows):
     """
     Take rows from fetch_espn_results and upsert into Result,
     then sync Pick.earnings.
 
+    Loads the tournament's Players/Results once, skips rows whose fingerprint
+    (position, made_cut, earnings) is unchanged and writes the rest with
+    bulk_create / bulk_update inside one transaction.
+
     IMPORTANT:
     - Do NOT overwrite a non-zero manual earning with 0 from ESPN.
-    """
-    from .models import Player, Result  # local import to avoid cycles
 
+    Returns {"created": n, "updated": n, "unchanged": n, "picks_changed": n}.
+    """
+    parsed = {}
     for row in rows:
         name = (row.get("Player") or "").strip()
         if not name:
@@ -638,40 +981,76 @@ def _upsert_results_from_rows(tournament, rows):
         # crude made_cut flag: MC/WD/DQ treated as missed
         made_cut = total not in {"MC", "WD", "DQ", ""}
 
-        first, *rest = name.split()
-        last = " ".join(rest) or None
+        parsed[name] = (pos or total, earnings, made_cut)
 
-        player, _ = Player.objects.get_or_create(
-            full_name=name,
-            defaults={
-                "first_name": first,
-                "last_name": last,
-            },
-        )
+    summary = {"created": 0, "updated": 0, "unchanged": 0, "picks_changed": 0}
 
-        result, created = Result.objects.get_or_create(
-            tournament=tournament,
-            player=player,
-            defaults={
-                "position": pos or total or "",
-                "earnings": earnings,
-                "made_cut": made_cut,
-            },
-        )
+    with transaction.atomic():
+        player_ids = _player_ids_for(parsed)
 
-        if not created:
-            # Always update position / made_cut
-            result.position = pos or total or result.position
-            result.made_cut = made_cut
+        # Key by golfer: two spellings of one player (accents, alias) are one
+        # Result; the first row ESPN lists wins.
+        by_player = {}
+        for name, values in parsed.items():
+            by_player.setdefault(player_ids[name], values)
 
+        existing = {
+            r.player_id: r
+            for r in Result.objects.filter(tournament=tournament)
+        }
+
+        now = timezone.now()
+        to_create = {}
+        to_update = {}
+        for player_id, (position, earnings, made_cut) in by_player.items():
+            result = existing.get(player_id)
+
+            if result is None:
+                to_create[player_id] = Result(
+                    tournament=tournament,
+                    season_id=tournament.season_id,  # bulk_create skips save()
+                    player_id=player_id,
+                    position=position or "",
+                    earnings=earnings,
+                    made_cut=made_cut,
+                )
+                continue
+
+            new_position = position or result.position
+            new_earnings = earnings
             # If ESPN says 0 but we already have a non-zero value, keep the manual value.
-            if not (earnings == Decimal("0") and result.earnings and result.earnings > 0):
-                result.earnings = earnings
+            if earnings == Decimal("0") and result.earnings and result.earnings > 0:
+                new_earnings = result.earnings
+
+            before = _result_fingerprint(result.position, result.made_cut, result.earnings)
+            after = _result_fingerprint(new_position, made_cut, new_earnings)
+            if before == after:
+                summary["unchanged"] += 1
+                continue
+
+            result.position = new_position
+            result.made_cut = made_cut
+            result.earnings = new_earnings
+            result.updated_at = now  # bulk_update skips auto_now
+            to_update[player_id] = result
+
+        if to_create:
+            Result.objects.bulk_create(to_create.values(), batch_size=500)
+        if to_update:
+            Result.objects.bulk_update(
+                to_update.values(), ["position", "made_cut", "earnings", "updated_at"], batch_size=500,
+            )
 
-            result.save()
+        summary["created"] = len(to_create)
+        summary["updated"] = len(to_update)
+        if to_create or to_update:
+            season_cache.bump(tournament.season_id)  # bulk writes send no signals
 
-    # After results are saved, push earnings into Pick.earnings
-    sync_tournament_earnings(tournament)
+        # After results are saved, push earnings into Pick.earnings
+        # Players created above only reach names.index on commit; pass their ids.
+        summary["picks_changed"] = sync_tournament_earnings(tournament, player_ids)["changed"]
+
+    return summary
 
 
 @login_required
@@ -687,115 +1066,10 @@ def standings(request):
     }
 
     if season:
-        picks_qs = (
-            Pick.objects
-            .filter(tournament__season=season)
-            .select_related("user", "tournament")
-        )
-
-        # ---------- KPI #3: Most Picked Golfer (across all events) ----------
-        primary_names = [
-            p.primary_player
-            for p in picks_qs
-            if getattr(p, "primary_player", None)
-        ]
-
-        most_picked_golfer = None
-        most_picked_golfer_count = 0
-        if primary_names:
-            counter = Counter(primary_names)
-            most_picked_golfer, most_picked_golfer_count = counter.most_common(1)[0]
-
-        # ---------- Per-user standings + league-level stats ----------
-        by_tournament = {}
-        for p in picks_qs:
-            by_tournament.setdefault(p.tournament_id, []).append(p)
-
-        stats = {}  # user_id -> dict
-
-        league_total_earnings = 0.0           # KPI #2
-        league_total_picks_scored = 0         # for cut rate
-        league_cashes = 0                     # picks with earnings > 0
-
-        for tournament_id, picks in by_tournament.items():
-            # skip tournaments that have not been scored (all zero / None earnings)
-            if not any((p.earnings or 0) > 0 for p in picks):
-                continue
-
-            # Only scored events reach here
-            ranked = sorted(
-                picks,
-                key=lambda p: (-(p.earnings or 0), p.user.username),
-            )
-
-            for idx, p in enumerate(ranked):
-                rank = idx + 1
-                earnings = float(p.earnings or 0)
-
-                # league totals for KPIs
-                league_total_earnings += earnings
-                league_total_picks_scored += 1
-                if earnings > 0:
-                    league_cashes += 1
-
-                user_id = p.user_id
-                s = stats.setdefault(user_id, {
-                    "user": p.user,
-                    "points": 0.0,
-                    "wins": 0,
-                    "top5": 0,
-                    "top10": 0,
-                    "cashes": 0,
-                    "events": 0,
-                })
-
-                # Events = scored events where user had a pick
-                s["events"] += 1
-                s["points"] += earnings
-
-                if earnings > 0:
-                    s["cashes"] += 1
-                if rank == 1:
-                    s["wins"] += 1
-                if rank <= 5:
-                    s["top5"] += 1
-                if rank <= 10:
-                    s["top10"] += 1
-
-        rows = list(stats.values())
-        rows.sort(
-            key=lambda r: (
-                -r["points"],
-                -r["wins"],
-                -r["top5"],
-                -r["top10"],
-                r["user"].username,
-            )
+        rows, kpis = season_cache.get_or_set(
+            season.pk, "standings", lambda: _season_standings_and_kpis(season),
         )
 
-        # ---------- KPIs ----------
-
-        # KPI #1: Avg Earnings Per User (only users with at least one scored event)
-        user_count = len(stats)
-        if user_count > 0:
-            avg_earnings_per_user = league_total_earnings / user_count
-        else:
-            avg_earnings_per_user = 0
-
-        # KPI #4: League Cut Rate % (scored picks with earnings > 0)
-        if league_total_picks_scored > 0:
-            cut_rate = (league_cashes / league_total_picks_scored) * 100
-        else:
-            cut_rate = None
-
-        kpis = {
-            "avg_earnings_per_user": avg_earnings_per_user,
-            "total_earnings": league_total_earnings,
-            "most_picked_golfer": most_picked_golfer,
-            "most_picked_golfer_count": most_picked_golfer_count,
-            "cut_rate": cut_rate,
-        }
-
     context = {
         "season": season,
         "rows": rows,
@@ -804,11 +1078,70 @@ def standings(request):
     return render(request, "core/standings.html", context)
 
 
+def _season_standings_and_kpis(season):
+    """(standings rows, league KPIs) for the standings page."""
+    rows = []
+
+    # ---------- KPI #3: Most Picked Golfer (across all events) ----------
+    most_picked = (
+        Pick.objects
+        .filter(season=season)
+        .exclude(primary_player="")
+        .values("primary_player")
+        .annotate(n=Count("id"))
+        .order_by("-n", "primary_player")
+        .first()
+    )
+    most_picked_golfer = most_picked["primary_player"] if most_picked else None
+    most_picked_golfer_count = most_picked["n"] if most_picked else 0
+
+    # ---------- Per-user standings (UserSeasonStats) ----------
+    league_total_earnings = 0.0           # KPI #2
+    league_total_picks_scored = 0         # for cut rate
+    league_cashes = 0                     # picks with earnings > 0
+
+    for r in stored_standings(season):
+        r["points"] = float(r["points"])
+        rows.append(r)
+        league_total_earnings += r["points"]
+        league_total_picks_scored += r["events"]
+        league_cashes += r["cashes"]
+
+    # ---------- KPIs ----------
+
+    # KPI #1: Avg Earnings Per User (only users with at least one scored event)
+    user_count = len(rows)
+    if user_count > 0:
+        avg_earnings_per_user = league_total_earnings / user_count
+    else:
+        avg_earnings_per_user = 0
+
+    # KPI #4: League Cut Rate % (scored picks with earnings > 0)
+    if league_total_picks_scored > 0:
+        cut_rate = (league_cashes / league_total_picks_scored) * 100
+    else:
+        cut_rate = None
+
+    kpis = {
+        "avg_earnings_per_user": avg_earnings_per_user,
+        "total_earnings": league_total_earnings,
+        "most_picked_golfer": most_picked_golfer,
+        "most_picked_golfer_count": most_picked_golfer_count,
+        "cut_rate": cut_rate,
+    }
+    return rows, kpis
+
+
 @login_required
 def results_overview(request):
-    completed = Tournament.objects.filter(status="completed").order_by("-start_date")
+    completed = Tournament.objects.completed().order_by("-start_date")
     return render(request, "core/results_overview.html", {"tournaments": completed})
 
 def rules(request):
     return render(request, "core/rules.html")
 
+
+@staff_member_required
+def view_metrics(request):
+    """Per-view query / latency histograms collected by ViewMetricsMiddleware."""
+    return JsonResponse({"views": metrics_snapshot()})